@@ -0,0 +1,236 @@
+# -*- coding: cp1252 -*-
+# Archivo de Sudokus de ancho fijo
+#
+# Para archivos con millones de Sudokus, leerlos lnea por lnea (readPuzzles)
+# crea una cadena por lnea y obliga a recorrer todo el archivo para llegar a
+# un Sudoku en particular. PuzzleArchive mapea en memoria (mmap) un archivo en
+# el que cada Sudoku ocupa un registro de ancho fijo: 81 caracteres, fila por
+# fila, seguidos del fin de lnea ("\n" o "\r\n", el mismo en todo el archivo;
+# el ltimo registro puede no tenerlo). Cualquier caracter que no sea un
+# nmero del 1 al 9 es una casilla vacia.
+#
+# Como todos los registros tienen el mismo ancho, el Sudoku nmero i empieza
+# en la posicin i * ancho, y se puede leer sin leer los anteriores. Los
+# valores se leen directamente del mapa con struct.unpack_from, sin crear una
+# cadena por Sudoku, y se cargan en un CompactBoard. Las pginas del archivo
+# solo se leen del disco cuando se usan, por lo que abrir el archivo no
+# depende de su tamao.
+#
+# Para resolver en varios procesos, el archivo se divide en rangos (getShard)
+# y cada proceso mapea el archivo por su cuenta y resuelve su rango, de modo
+# que los Sudokus no pasan de un proceso a otro. Cada proceso escribe sus
+# soluciones en un archivo aparte, y al final se unen en el orden del archivo
+# original, en el formato de Batch.py.
+#
+# Uso:
+#   python Archive.py Sudokus.txt --convert Sudokus.dat
+#   python Archive.py Sudokus.dat [Soluciones.txt] [-p procesos] [-n rangos]
+#                     [-m compact|dlx|phases] [--start i] [--stop j]
+#   python Archive.py Sudokus.dat --get i
+# --convert escribe los Sudokus de cualquier archivo que acepte Batch.py en un
+# archivo de ancho fijo, y --get imprime el Sudoku nmero i (desde 0).
+#
+
+import argparse
+import mmap
+import multiprocessing
+import os
+import shutil
+import struct
+import time
+
+from Classes import *
+from Batch import Methods, readPuzzles
+
+# Valor de cada byte de un registro: el nmero para "1" a "9" y 0 para
+# cualquier otro caracter
+ByteValues = [0]*256
+for d in range(1,10):
+    ByteValues[ord(str(d))] = d
+
+# Formato de los 81 bytes de un registro
+Record = struct.Struct("81B")
+
+
+class PuzzleArchive(object):
+
+    # Constructor de la clase. Mapea el archivo indicado y calcula el ancho de
+    # los registros a partir de la primera lnea. Si la primera lnea no tiene
+    # 81 caracteres se lanza ValueError
+    def __init__(self,path):
+        self.Path = path
+        self.File = open(path,"rb")
+        self.Map = None
+        self.Width = 82
+        self.Count = 0
+        size = os.fstat(self.File.fileno()).st_size
+        if size == 0:
+            return
+        self.Map = mmap.mmap(self.File.fileno(),0,access=mmap.ACCESS_READ)
+        end = self.Map.find("\n",0,83)
+        if end == -1 and size == 81:
+            end = 81
+        if end == 82 and self.Map[81] == "\r":
+            self.Width = 83
+        elif end != 81:
+            self.close()
+            raise ValueError(path + " no es un archivo de ancho fijo (la primera linea debe tener 81 caracteres)")
+        self.Count = (size + self.Width - 81) // self.Width
+
+    # Cantidad de Sudokus del archivo
+    def __len__(self):
+        return self.Count
+
+    # Retorna los 81 bytes del Sudoku indicado (desde 0), ledos del mapa
+    def getValues(self,index):
+        if index < 0 or index >= self.Count:
+            raise IndexError("no existe el Sudoku " + str(index))
+        return Record.unpack_from(self.Map,index * self.Width)
+
+    # Retorna el Sudoku indicado como un CompactBoard
+    def getBoard(self,index):
+        Sudoku = CompactBoard()
+        Values = self.getValues(index)
+        for cell in range(81):
+            value = ByteValues[Values[cell]]
+            if value != 0:
+                Sudoku.setCell(cell,value)
+        return Sudoku
+
+    # Retorna el Sudoku indicado como una cadena de 81 caracteres, tal como
+    # est en el archivo
+    def getPuzzle(self,index):
+        if index < 0 or index >= self.Count:
+            raise IndexError("no existe el Sudoku " + str(index))
+        return self.Map[index * self.Width:index * self.Width + 81]
+
+    # Devuelve los Sudokus del rango [start, stop) uno a uno, como
+    # [nmero, CompactBoard]
+    def iterBoards(self,start=0,stop=None):
+        if stop is None or stop > self.Count:
+            stop = self.Count
+        for index in xrange(start,stop):
+            yield [index,self.getBoard(index)]
+
+    # Retorna el rango [start, stop) que le corresponde a la parte shard
+    # (desde 0) al dividir los Sudokus del rango [start, stop) en shards
+    # partes de tamao similar
+    def getShard(self,shard,shards,start=0,stop=None):
+        if stop is None or stop > self.Count:
+            stop = self.Count
+        total = max(stop - start,0)
+        return [start + total * shard // shards,start + total * (shard + 1) // shards]
+
+    # Libera el mapa y cierra el archivo
+    def close(self):
+        if self.Map is not None:
+            self.Map.close()
+            self.Map = None
+        if self.File is not None:
+            self.File.close()
+            self.File = None
+
+
+# Escribe los Sudokus (cadenas de 81 caracteres) en un archivo de ancho fijo.
+# Retorna la cantidad de Sudokus escritos
+def writeArchive(Puzzles,path):
+    InfoFile = open(path,"wb",1048576)
+    count = 0
+    for Puzzle in Puzzles:
+        InfoFile.write(Puzzle + "\n")
+        count = count + 1
+    InfoFile.close()
+    return count
+
+
+# Resuelve, dentro de un proceso, los Sudokus del rango [start, stop) del
+# archivo y escribe las soluciones en el archivo output, en el formato de
+# Batch.py. Devuelve [Sudokus, resueltos, tiempo]
+def solveRange(path,Range,output,method="compact"):
+    start = time.time()
+    Archive = PuzzleArchive(path)
+    InfoFile = open(output,"w",1048576)
+    total = 0
+    solved = 0
+    for Entry in Archive.iterBoards(Range[0],Range[1]):
+        Sudoku = Methods[method](Entry[1])
+        total = total + 1
+        if Sudoku is None:
+            InfoFile.write(Archive.getPuzzle(Entry[0]) + " -\n")
+        else:
+            solved = solved + 1
+            InfoFile.write(Archive.getPuzzle(Entry[0]) + " " + Sudoku.toString() + "\n")
+    InfoFile.close()
+    Archive.close()
+    return [total,solved,time.time() - start]
+
+
+# Resuelve los Sudokus del rango [start, stop) del archivo dividindolos en
+# shards rangos, repartidos en un grupo de procesos, y escribe las soluciones
+# en el archivo indicado, en el orden del archivo original. Devuelve
+# [Sudokus, resueltos]
+def solveArchive(path,solutions,processes=None,shards=None,method="compact",start=0,stop=None):
+    Archive = PuzzleArchive(path)
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if shards is None:
+        shards = 4 * processes
+    Ranges = [Archive.getShard(shard,shards,start,stop) for shard in range(shards)]
+    Archive.close()
+    Parts = [solutions + ".part" + str(shard) for shard in range(shards)]
+    Pool = multiprocessing.Pool(processes)
+    try:
+        Results = [Pool.apply_async(solveRange,(path,Ranges[shard],Parts[shard],method)) for shard in range(shards)]
+        Count = [0,0]
+        InfoFile = open(solutions,"w")
+        for shard in range(shards):
+            Result = Results[shard].get()
+            Count[0] = Count[0] + Result[0]
+            Count[1] = Count[1] + Result[1]
+            PartFile = open(Parts[shard],"r")
+            shutil.copyfileobj(PartFile,InfoFile)
+            PartFile.close()
+            os.remove(Parts[shard])
+        InfoFile.close()
+        Pool.close()
+    finally:
+        Pool.terminate()
+        Pool.join()
+    return Count
+
+
+if __name__ == "__main__":
+    Parser = argparse.ArgumentParser(description="Archivo de Sudokus de ancho fijo")
+    Parser.add_argument("file",help="archivo de ancho fijo (o, con --convert, cualquier archivo de Sudokus)")
+    Parser.add_argument("solutions",nargs="?",help="archivo donde se escriben las soluciones")
+    Parser.add_argument("--convert",metavar="DESTINO",help="escribe los Sudokus en un archivo de ancho fijo")
+    Parser.add_argument("--get",type=int,metavar="I",help="imprime el Sudoku numero I (desde 0)")
+    Parser.add_argument("-p","--processes",type=int,default=None,help="cantidad de procesos (por defecto, uno por procesador)")
+    Parser.add_argument("-n","--shards",type=int,default=None,help="cantidad de rangos (por defecto, cuatro por proceso)")
+    Parser.add_argument("-m","--method",choices=sorted(Methods.keys()),default="compact",help="metodo de solucion")
+    Parser.add_argument("--start",type=int,default=0,help="primer Sudoku a resolver")
+    Parser.add_argument("--stop",type=int,default=None,help="Sudoku donde se deja de resolver (sin incluirlo)")
+    Arguments = Parser.parse_args()
+
+    FileName = Arguments.file
+    if Arguments.convert is not None:
+        start = time.time()
+        count = writeArchive(readPuzzles(FileName),Arguments.convert)
+        print "Sudokus escritos: " + str(count) + " (%.3f s)" % (time.time() - start)
+    elif Arguments.get is not None:
+        Archive = PuzzleArchive(FileName)
+        try:
+            print Archive.getPuzzle(Arguments.get)
+        except IndexError as Error:
+            Parser.error(str(Error))
+        Archive.close()
+    else:
+        SolutionName = Arguments.solutions
+        if SolutionName is None:
+            SolutionName = os.path.splitext(FileName)[0] + "Solutions.txt"
+        start = time.time()
+        Count = solveArchive(FileName,SolutionName,Arguments.processes,Arguments.shards,Arguments.method,Arguments.start,Arguments.stop)
+        elapsed = time.time() - start
+        print "Sudokus procesados: " + str(Count[0]) + ", resueltos: " + str(Count[1])
+        print "Tiempo: %.3f s (%.1f Sudokus/s)" % (elapsed,Count[0] / max(elapsed,1e-9))
+        print "Las soluciones estan registradas en el archivo " + SolutionName
@@ -0,0 +1,201 @@
+# -*- coding: cp1252 -*-
+# Solucionador de Sudokus por lotes
+#
+# Resuelve todos los Sudokus contenidos en un solo archivo, sin tener que
+# ejecutar el programa principal una vez por cada Sudoku. El archivo se lee
+# lnea por lnea y cada Sudoku se resuelve y se escribe en cuanto se termina
+# de leer, por lo que el archivo puede ser tan grande como se quiera.
+#
+# Formatos aceptados (pueden mezclarse en un mismo archivo):
+#  1. Una lnea de 81 caracteres por Sudoku, fila por fila. Las casillas vacias
+#     pueden ser "*", ".", "-" o "0".
+#       **6******2***38347****56*5**2*7*3*6****8**9*3************65*9****8**7**2*****8***
+#  2. El formato de Board: nueve lneas con los valores separados por comas.
+#       *,*,6,*,*,*,*,*,*;
+#  Las lneas vacias y las que comienzan con "#" se ignoran.
+# Una lnea sin comas que no tenga exactamente 81 caracteres, una lnea con
+# comas que no tenga nueve valores de un caracter, o un Sudoku con comas que
+# quede incompleto (al final del archivo o antes de una lnea de 81
+# caracteres) se ignoran, avisando en la salida de errores con el nmero de
+# lnea; as un error en una lnea no corre los Sudokus siguientes.
+#
+# El archivo con las soluciones tiene una lnea por Sudoku, en el mismo orden
+# del archivo original, con el Sudoku y su solucin separados por un espacio.
+# Si el Sudoku no tiene solucin, en lugar de la solucin se escribe "-".
+#
+# Uso:
+#   python Batch.py Sudokus.txt [Soluciones.txt] [-m compact|dlx|phases] [-t Trazas.txt]
+#                   [--cache N] [--cache-file Cache.db]
+#   python Batch.py Sudokus.txt [Resultados.txt] --check
+# El mtodo "compact" (por defecto) aplica las fases I a III con bsqueda en
+# profundidad; "dlx" resuelve por cobertura exacta, ms rpido para los
+# Sudokus que requieren muchas suposiciones; "phases" usa las cuatro fases del
+# programa principal. Con -t se escribe adems la traza compacta de cada
+# solucin (ver Trace.py).
+#
+# Con --cache se pone delante del mtodo un cache de soluciones por forma
+# cannica (ver Cache.py) con N formas en memoria, de modo que los Sudokus
+# repetidos o equivalentes no se vuelven a resolver; con --cache-file las
+# soluciones se guardan adems en un archivo que se conserva entre
+# ejecuciones.
+#
+# Con --check no se escriben soluciones sino la revisin de cada Sudoku: si
+# tiene solucin nica ("unique"), varias ("multiple") o ninguna ("none"),
+# seguido de los nodos y retrocesos que necesit la bsqueda.
+# Si no se indica el archivo de soluciones, se crea uno con el nombre del
+# archivo original concatenado con la palabra "Solutions".
+#
+
+import argparse
+import sys
+import time
+
+from Classes import *
+from Main import solveBoard, solveCompact, solveCompactExactCover
+from Cache import SolutionCache
+from Search import checkUniqueness
+from Trace import TraceWriter
+
+
+# Resuelve el Sudoku ingresado (CompactBoard) con las cuatro fases del
+# programa principal. Devuelve el Board solucionado o None (tambin si el
+# Sudoku tiene nmeros repetidos, como Main.solve)
+def solvePhases(Sudoku):
+    Sudoku = Sudoku.toBoard()
+    if Sudoku.isValid() == 0:
+        return None
+    return solveBoard(Sudoku)
+
+
+# Mtodos de solucin disponibles, sobre CompactBoard
+Methods = {"compact": solveCompact, "dlx": solveCompactExactCover, "phases": solvePhases}
+
+
+# Avisa en la salida de errores que se ignora la lnea indicada del archivo
+def reportLine(path,number,message):
+    sys.stderr.write(path + ", linea " + str(number) + ": " + message + "; se ignora\n")
+
+
+# Lee los Sudokus del archivo indicado y los devuelve uno a uno como cadenas
+# de 81 caracteres. Las lneas que no tienen el formato esperado se ignoran
+# (ver reportLine), sin afectar a los Sudokus siguientes
+def readPuzzles(path):
+    InfoFile = open(path,"r")
+    Cells = []
+    start = 0
+    number = 0
+    for linea in InfoFile:
+        number = number + 1
+        linea = linea.strip()
+        if linea == "" or linea[0] == "#":
+            continue
+        if "," in linea:
+            Values = [value.strip() for value in linea.replace(";",",").split(",") if value.strip() != ""]
+            if len(Values) != 9 or max([len(value) for value in Values]) != 1:
+                reportLine(path,number,"se esperaban 9 valores de un caracter y hay " + str(len(Values)))
+                continue
+            if len(Cells) == 0:
+                start = number
+            Cells.extend(Values)
+            if len(Cells) == 81:
+                yield "".join(Cells)
+                Cells = []
+            continue
+        if len(Cells) > 0:
+            reportLine(path,start,"Sudoku incompleto (" + str(len(Cells)) + " casillas)")
+            Cells = []
+        if len(linea) != 81:
+            reportLine(path,number,"se esperaban 81 caracteres y hay " + str(len(linea)))
+            continue
+        yield linea
+    if len(Cells) > 0:
+        reportLine(path,start,"Sudoku incompleto (" + str(len(Cells)) + " casillas)")
+    InfoFile.close()
+
+
+# Resuelve los Sudokus a medida que se van leyendo, con el mtodo indicado.
+# Devuelve, por cada uno, el Sudoku y su solucin (None si no tiene solucin).
+# Si se ingresa un TraceWriter, en l se escribe la traza de cada solucin, y
+# si se ingresa un SolutionCache, los Sudokus se resuelven a travs de l
+def solvePuzzles(Puzzles,method="compact",Traces=None,Cache=None):
+    for Puzzle in Puzzles:
+        if Cache is not None:
+            Sudoku = Cache.solve(Puzzle)
+        else:
+            Sudoku = Methods[method](CompactBoard().fromString(Puzzle))
+        if Sudoku is None:
+            yield [Puzzle,None]
+        else:
+            if Traces is not None:
+                Traces.write(Sudoku)
+            yield [Puzzle,Sudoku.toString()]
+
+
+# Revisa si cada Sudoku tiene solucin nica, a medida que se van leyendo.
+# Devuelve, por cada uno, el Sudoku y el resultado de la revisin
+def checkPuzzles(Puzzles):
+    for Puzzle in Puzzles:
+        Check = checkUniqueness(CompactBoard().fromString(Puzzle))
+        yield [Puzzle,Check[0] + " " + str(Check[1].Nodes) + " " + str(Check[1].Backtracks)]
+
+
+# Escribe las soluciones en el archivo indicado a medida que se generan.
+# Devuelve la cantidad de Sudokus procesados y la cantidad de resueltos
+def writeSolutions(Results,path):
+    InfoFile = open(path,"w")
+    total = 0
+    solved = 0
+    for Result in Results:
+        total = total + 1
+        if Result[1] is None:
+            InfoFile.write(Result[0] + " -\n")
+        else:
+            solved = solved + 1
+            InfoFile.write(Result[0] + " " + Result[1] + "\n")
+    InfoFile.close()
+    return [total,solved]
+
+
+if __name__ == "__main__":
+    Parser = argparse.ArgumentParser(description="Solucionador de Sudokus por lotes")
+    Parser.add_argument("file",help="archivo con los Sudokus")
+    Parser.add_argument("solutions",nargs="?",help="archivo donde se escriben las soluciones")
+    Parser.add_argument("-m","--method",choices=sorted(Methods.keys()),default="compact",help="metodo de solucion")
+    Parser.add_argument("-t","--traces",help="archivo donde se escriben las trazas compactas")
+    Parser.add_argument("--check",action="store_true",help="revisa si cada Sudoku tiene solucion unica")
+    Parser.add_argument("--cache",type=int,default=0,help="formas canonicas guardadas en memoria (0 sin cache)")
+    Parser.add_argument("--cache-file",help="archivo donde se guardan las soluciones del cache")
+    Arguments = Parser.parse_args()
+
+    FileName = Arguments.file
+    SolutionName = Arguments.solutions
+    if SolutionName is None:
+        if FileName[len(FileName) - 4:len(FileName)] == ".txt":
+            SolutionName = FileName[0:len(FileName) - 4] + "Solutions.txt"
+        else:
+            SolutionName = FileName + "Solutions.txt"
+    Traces = None
+    if Arguments.traces is not None:
+        Traces = TraceWriter(Arguments.traces)
+    Cache = None
+    if Arguments.cache > 0 or Arguments.cache_file is not None:
+        Cache = SolutionCache(max(Arguments.cache,1),Arguments.cache_file,Arguments.method)
+    start = time.time()
+    if Arguments.check:
+        Count = writeSolutions(checkPuzzles(readPuzzles(FileName)),SolutionName)
+    else:
+        Count = writeSolutions(solvePuzzles(readPuzzles(FileName),Arguments.method,Traces,Cache),SolutionName)
+    if Traces is not None:
+        Traces.close()
+    if Cache is not None:
+        Cache.close()
+        print "Cache: " + str(Cache.Hits) + " en memoria, " + str(Cache.StoreHits) + " en archivo, " + str(Cache.Misses) + " resueltos"
+    if Arguments.check:
+        print "Sudokus revisados: " + str(Count[0])
+    else:
+        print "Sudokus procesados: " + str(Count[0]) + ", resueltos: " + str(Count[1])
+    print "Tiempo: %.3f s" % (time.time() - start)
+    if Arguments.check:
+        print "Los resultados estan registrados en el archivo " + SolutionName
+    else:
+        print "Las soluciones estan registradas en el archivo " + SolutionName
@@ -0,0 +1,351 @@
+# -*- coding: cp1252 -*-
+# Banco de pruebas de rendimiento
+#
+# Resuelve un conjunto fijo de Sudokus con cada mtodo de solucin y registra,
+# por cada mtodo y cada grupo de Sudokus:
+#  - El tiempo de cada Sudoku (total, promedio y mximo del grupo).
+#  - Los nmeros ubicados por cada fase (I, II-A, II-B, III, IV), contados
+#    sobre los pasos registrados en el tablero resuelto.
+#  - Las alternativas de la fase IV que se probaron (branches) y, si el mtodo
+#    los cuenta, los retrocesos (backtracks).
+#  - La memoria mxima del proceso (en KB). Cada grupo se resuelve en un
+#    proceso aparte para que la memoria de un grupo no se sume a la de otro.
+#
+# Los grupos son los Sudokus incluidos con el programa (sudoku1.txt,
+# sudoku2.txt y AlEscargot.txt) y cuatro niveles de dificultad: "easy" (se
+# resuelven sin suposiciones), "medium" (pocas suposiciones), "hard" y
+# "alescargot" (cientos de suposiciones con las fases). Cada nivel parte de
+# unos Sudokus semilla y se completa con Sudokus equivalentes, obtenidos al
+# permutar los nmeros, las bandas, las filas dentro de cada banda, las pilas,
+# las columnas dentro de cada pila y al trasponer el tablero. Estas
+# transformaciones no cambian la dificultad, y como se generan con una semilla
+# fija, los grupos son iguales en todas las versiones del programa. Con -f se
+# agregan grupos ledos de archivos (por ejemplo, los creados con
+# Generator.py), con el nombre del archivo como nombre del grupo.
+#
+# Los resultados se escriben en formato JSON, de modo que se pueden comparar
+# los de dos versiones:
+#   python Bench.py [-o Benchmark.json] [-n 10] [-m phases,compact,dlx]
+#                   [-f Generados.txt ...]
+#   python Bench.py --compare Anterior.json Nuevo.json [--threshold 0.1]
+# La comparacin muestra, por cada grupo y mtodo, el tiempo y las
+# alternativas de ambas versiones, y termina con cdigo 1 si algn tiempo
+# empeor ms que el umbral indicado.
+#
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from Classes import *
+from Main import solveBoard
+from Stats import SolveStats
+from Techniques import TechniqueNames
+from Search import DepthFirstSearch
+from DLX import ExactCover
+from Batch import readPuzzles
+
+# Mtodos que se pueden medir: las cuatro fases (copiando el tablero en la fase
+# IV, con la traza de deshacer o con todas las tcnicas de eliminacin), la
+# bsqueda en profundidad sobre CompactBoard y la cobertura exacta
+BenchMethods = ["phases","trail","techniques","compact","dlx"]
+
+# Archivos incluidos con el programa
+Bundled = ["sudoku1.txt","sudoku2.txt","AlEscargot.txt"]
+
+# Sudokus semilla de cada nivel de dificultad
+Grades = [["easy",["..3.2.6..9..3.5..1..18.64....81.29..7.......8..67.82....26.95..8..2.3..9..5.1.3..",
+                   "2...8.3...6..7..84.3.5..2.9...1.54.8.........4.27.6...3.1..7.4.72..4..6...4.1...3",
+                   "......9.7...42.18....7.5.261..9.4....5.....4....5.7..992.1.8....34.59...5.7......",
+                   ".3..5..4...8.1.5..46.....12.7.5.2.8....6.3....4.1.9.3.25.....98..1.2.6...8..6..2.",
+                   "...1254....84.....42.8......3.....95.6.9.2.1.51.....6......3.49.....72....1298..."]],
+          ["medium",["1..92....524.1...........7..5...81.2.........4.27...9..6...........3.945....71..6",
+                     ".43.8.25.6.............1.949....4.7....6.8....1.2....382.5.............5.34.9.71.",
+                     "..19....39..7..16..3...5..7.5......9..43.26..2......7.6..1...3..42..7..65....68.."]],
+          ["hard",["52...6.........7.13...........4..8..6......5...........418.........3..2...87.....",
+                   "48.3............71.2.......7.5....6....2..8.............1.76...3.....4......5....",
+                   "....14....3....2...7..........9...3.6.1.............8.2.....1.4....5.6.....7.8...",
+                   "..53.....8......2..7..1.5..4....53...1..7...6..32...8..6.5....9..4....3......97.."]],
+          ["alescargot",["1....7.9..3..2...8..96..5....53..9...1..8...26....4...3......1..4......7..7...3..",
+                         "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4..",
+                         "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"]]]
+
+
+# Devuelve un Sudoku equivalente al ingresado (cadena de 81 caracteres),
+# permutando nmeros, bandas, filas, pilas y columnas, y trasponiendo el
+# tablero segn el generador de nmeros aleatorios ingresado
+def shufflePuzzle(Puzzle,Random):
+    Digits = list("123456789")
+    Random.shuffle(Digits)
+    Lines = []
+    for k in range(2):
+        Bands = [0,1,2]
+        Random.shuffle(Bands)
+        Order = []
+        for band in Bands:
+            Inner = [0,1,2]
+            Random.shuffle(Inner)
+            for i in Inner:
+                Order.append(3 * band + i)
+        Lines.append(Order)
+    Rows = Lines[0]
+    Columns = Lines[1]
+    transpose = Random.randint(0,1)
+    Cells = []
+    for row in range(9):
+        for column in range(9):
+            if transpose == 1:
+                value = Puzzle[9 * Rows[column] + Columns[row]]
+            else:
+                value = Puzzle[9 * Rows[row] + Columns[column]]
+            if value in Bits:
+                Cells.append(Digits[int(value) - 1])
+            else:
+                Cells.append("*")
+    return "".join(Cells)
+
+
+# Construye los grupos de Sudokus: los archivos incluidos y, por cada nivel de
+# dificultad, las semillas completadas con Sudokus equivalentes hasta tener
+# size Sudokus. Devuelve una lista de [nombre, Sudokus]
+def buildCorpora(size=10,seed=2007):
+    Random = random.Random(seed)
+    Puzzles = []
+    for path in Bundled:
+        Puzzles.extend(readPuzzles(path))
+    Corpora = [["bundled",Puzzles]]
+    for Grade in Grades:
+        Seeds = Grade[1]
+        Puzzles = []
+        i = 0
+        while len(Puzzles) < size:
+            if i < len(Seeds):
+                Puzzles.append(Seeds[i])
+            else:
+                Puzzles.append(shufflePuzzle(Seeds[i % len(Seeds)],Random))
+            i = i + 1
+        Corpora.append([Grade[0],Puzzles])
+    return Corpora
+
+
+# Cuenta los nmeros ubicados por cada fase en el tablero resuelto (Board o
+# CompactBoard). Devuelve un diccionario con el nombre de la fase como llave
+def countPlacements(Sudoku):
+    Counts = {}
+    for Name in PhaseNames:
+        Counts[Name] = 0
+    if isinstance(Sudoku,Board):
+        for i in range(Sudoku.Top + 1):
+            Counts[PhaseNames[Sudoku.Stack[i][3]]] = Counts[PhaseNames[Sudoku.Stack[i][3]]] + 1
+    else:
+        for Step in Sudoku.Steps:
+            Counts[PhaseNames[(Step >> 4) & 7]] = Counts[PhaseNames[(Step >> 4) & 7]] + 1
+    return Counts
+
+
+# Resuelve un Sudoku con el mtodo indicado. Devuelve un diccionario con el
+# tiempo, si se resolvi, los nmeros ubicados por fase, las alternativas
+# probadas y los retrocesos (None si el mtodo no los cuenta). Con las fases
+# se incluyen tambin las estadsticas de cada fase (SolveStats)
+def benchPuzzle(Puzzle,method):
+    backtracks = None
+    Stats = None
+    start = time.time()
+    if method == "phases" or method == "trail" or method == "techniques":
+        Stats = SolveStats()
+        if method == "trail":
+            Sudoku = solveBoard(Board().fromString(Puzzle),1,Stats)
+        elif method == "techniques":
+            Sudoku = solveBoard(Board().fromString(Puzzle),0,Stats,TechniqueNames)
+        else:
+            Sudoku = solveBoard(Board().fromString(Puzzle),0,Stats)
+        branches = Stats.Branches
+        backtracks = Stats.Backtracks
+    elif method == "compact":
+        Search = DepthFirstSearch(CompactBoard().fromString(Puzzle))
+        Sudoku = Search.solve()
+        branches = Search.Nodes - 1
+        backtracks = Search.Backtracks
+    else:
+        Sudoku = CompactBoard().fromString(Puzzle)
+        Cover = ExactCover(Sudoku.Cells)
+        Steps = Cover.solve()
+        if Steps is None:
+            Sudoku = None
+        else:
+            for Step in Steps:
+                Sudoku.placeValue(Step[0],Step[1])
+        branches = Cover.Nodes
+        backtracks = Cover.Backtracks
+    elapsed = time.time() - start
+    Record = {"puzzle": Puzzle,"time": elapsed,"solved": 0,"branches": branches,"backtracks": backtracks}
+    if Stats is not None:
+        Record["stats"] = Stats.toDict()
+    if Sudoku is not None:
+        Record["solved"] = Sudoku.isSolved()
+        Record["placements"] = countPlacements(Sudoku)
+    return Record
+
+
+# Retorna la memoria mxima usada hasta ahora por el proceso, en KB (None si el
+# sistema no tiene el mdulo resource)
+def getPeakMemory():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+# Resuelve todos los Sudokus del grupo con el mtodo indicado, repitiendo cada
+# uno repeat veces y tomando el menor tiempo. Devuelve el resumen del grupo
+# con el detalle de cada Sudoku
+def benchCorpus(name,Puzzles,method,repeat=1):
+    base = getPeakMemory()
+    Records = []
+    for Puzzle in Puzzles:
+        Record = benchPuzzle(Puzzle,method)
+        for i in range(repeat - 1):
+            Record["time"] = min(Record["time"],benchPuzzle(Puzzle,method)["time"])
+        Records.append(Record)
+    peak = getPeakMemory()
+    Summary = {"corpus": name,"method": method,"puzzles": len(Records),"solved": 0,
+               "time": 0.0,"mean_time": 0.0,"max_time": 0.0,"branches": 0,"max_branches": 0,"backtracks": None,
+               "placements": {},"peak_memory_kb": peak,"memory_growth_kb": None,"records": Records}
+    for Name in PhaseNames:
+        Summary["placements"][Name] = 0
+    if peak is not None:
+        Summary["memory_growth_kb"] = peak - base
+    for Record in Records:
+        Summary["solved"] = Summary["solved"] + Record["solved"]
+        Summary["time"] = Summary["time"] + Record["time"]
+        Summary["max_time"] = max(Summary["max_time"],Record["time"])
+        Summary["branches"] = Summary["branches"] + Record["branches"]
+        Summary["max_branches"] = max(Summary["max_branches"],Record["branches"])
+        if Record["backtracks"] is not None:
+            Summary["backtracks"] = (Summary["backtracks"] or 0) + Record["backtracks"]
+        if "placements" in Record:
+            for Name in PhaseNames:
+                Summary["placements"][Name] = Summary["placements"][Name] + Record["placements"][Name]
+    if len(Records) > 0:
+        Summary["mean_time"] = Summary["time"] / len(Records)
+    return Summary
+
+
+# Ejecuta benchCorpus en un proceso aparte y enva el resumen por la cola
+def benchCorpusWorker(Queue,name,Puzzles,method,repeat):
+    Queue.put(benchCorpus(name,Puzzles,method,repeat))
+
+
+# Mide todos los grupos con los mtodos indicados. Si isolate es 1, cada grupo
+# se resuelve en un proceso nuevo. Devuelve la lista de resmenes
+def runBenchmark(Corpora,Methods,repeat=1,isolate=1):
+    Results = []
+    for Corpus in Corpora:
+        for method in Methods:
+            if isolate == 1:
+                Queue = multiprocessing.Queue()
+                Worker = multiprocessing.Process(target=benchCorpusWorker,args=(Queue,Corpus[0],Corpus[1],method,repeat))
+                Worker.start()
+                Summary = Queue.get()
+                Worker.join()
+            else:
+                Summary = benchCorpus(Corpus[0],Corpus[1],method,repeat)
+            Results.append(Summary)
+            print "%-10s %-10s %3d/%-3d %9.3f s %8d alternativas %10s KB" % (Corpus[0],method,Summary["solved"],Summary["puzzles"],Summary["time"],Summary["branches"],str(Summary["peak_memory_kb"]))
+    return Results
+
+
+# Retorna la revisin de git del directorio actual, o None si no se puede leer
+def getRevision():
+    try:
+        Process = subprocess.Popen(["git","rev-parse","HEAD"],stdout=subprocess.PIPE,stderr=subprocess.PIPE)
+        output = Process.communicate()[0].strip()
+    except OSError:
+        return None
+    if Process.returncode != 0 or output == "":
+        return None
+    return output
+
+
+# Compara dos archivos de resultados. Imprime, por cada grupo y mtodo que
+# est en ambos, el tiempo y las alternativas de cada uno. Retorna la cantidad
+# de mediciones cuyo tiempo empeor ms que el umbral
+def compareResults(OldPath,NewPath,threshold=0.1):
+    InfoFile = open(OldPath,"r")
+    Old = json.load(InfoFile)
+    InfoFile.close()
+    InfoFile = open(NewPath,"r")
+    New = json.load(InfoFile)
+    InfoFile.close()
+    print "Anterior: " + str(Old.get("revision")) + "  Nuevo: " + str(New.get("revision"))
+    Previous = {}
+    for Summary in Old["results"]:
+        Previous[(Summary["corpus"],Summary["method"])] = Summary
+    regressions = 0
+    for Summary in New["results"]:
+        key = (Summary["corpus"],Summary["method"])
+        if key not in Previous:
+            continue
+        Before = Previous[key]
+        ratio = 0.0
+        if Before["time"] > 0:
+            ratio = Summary["time"] / Before["time"]
+        mark = ""
+        if ratio > 1 + threshold:
+            mark = " <- peor"
+            regressions = regressions + 1
+        print "%-10s %-10s %9.3f s %9.3f s  x%.2f  %8d -> %-8d%s" % (key[0],key[1],Before["time"],Summary["time"],ratio,Before["branches"],Summary["branches"],mark)
+    return regressions
+
+
+if __name__ == "__main__":
+    Parser = argparse.ArgumentParser(description="Banco de pruebas de rendimiento")
+    Parser.add_argument("-o","--output",default="Benchmark.json",help="archivo JSON donde se escriben los resultados")
+    Parser.add_argument("-n","--size",type=int,default=10,help="Sudokus por nivel de dificultad")
+    Parser.add_argument("-m","--methods",default=",".join(BenchMethods),help="metodos a medir, separados por comas")
+    Parser.add_argument("-g","--grades",help="grupos a medir, separados por comas (por defecto todos)")
+    Parser.add_argument("-r","--repeat",type=int,default=1,help="repeticiones por Sudoku (se toma el menor tiempo)")
+    Parser.add_argument("-s","--seed",type=int,default=2007,help="semilla de los Sudokus equivalentes")
+    Parser.add_argument("-f","--file",action="append",default=[],help="agrega un grupo con los Sudokus del archivo")
+    Parser.add_argument("--no-isolate",action="store_true",help="mide todos los grupos en el mismo proceso")
+    Parser.add_argument("--compare",nargs=2,metavar=("ANTERIOR","NUEVO"),help="compara dos archivos de resultados")
+    Parser.add_argument("--threshold",type=float,default=0.1,help="aumento de tiempo tolerado en la comparacion")
+    Arguments = Parser.parse_args()
+
+    if Arguments.compare is not None:
+        if compareResults(Arguments.compare[0],Arguments.compare[1],Arguments.threshold) > 0:
+            sys.exit(1)
+        sys.exit(0)
+
+    Methods = Arguments.methods.split(",")
+    for method in Methods:
+        if method not in BenchMethods:
+            Parser.error("metodo desconocido: " + method)
+    Corpora = buildCorpora(Arguments.size,Arguments.seed)
+    if Arguments.grades is not None:
+        Names = Arguments.grades.split(",")
+        Corpora = [Corpus for Corpus in Corpora if Corpus[0] in Names]
+    for path in Arguments.file:
+        Corpora.append([os.path.basename(path),list(readPuzzles(path))])
+    isolate = 1
+    if Arguments.no_isolate:
+        isolate = 0
+    start = time.time()
+    Results = runBenchmark(Corpora,Methods,Arguments.repeat,isolate)
+    Report = {"revision": getRevision(),"python": sys.version.split()[0],
+              "date": time.strftime("%Y-%m-%d %H:%M:%S"),"size": Arguments.size,
+              "seed": Arguments.seed,"repeat": Arguments.repeat,"results": Results}
+    InfoFile = open(Arguments.output,"w")
+    json.dump(Report,InfoFile,indent=1,sort_keys=True)
+    InfoFile.close()
+    print "Tiempo: %.3f s" % (time.time() - start)
+    print "Los resultados estan registrados en el archivo " + Arguments.output
@@ -0,0 +1,221 @@
+# -*- coding: cp1252 -*-
+# Cache de soluciones por forma cannica
+#
+# Muchos Sudokus son el mismo Sudoku con otra apariencia: los nmeros
+# cambiados entre s, las filas intercambiadas dentro de una banda, las
+# columnas dentro de una pila, las bandas o las pilas entre s, o el tablero
+# traspuesto. Todos ellos tienen la misma solucin, transformada de la misma
+# manera, y requieren el mismo trabajo de la fase IV.
+#
+# Forma cannica: de todos los Sudokus equivalentes se escoge el menor al
+# escribirlo como cadena de 81 caracteres, fila por fila, con "0" en las
+# casillas vacias y los nmeros renombrados en el orden en que aparecen (el
+# primero que aparece es 1, el segundo 2, etc.). La bsqueda se hace fila por
+# fila: para la primera fila se prueban todas las filas del tablero (con y sin
+# trasponer) con todos los rdenes de columnas, y se conservan solo las
+# transformaciones que dan la menor primera fila; para cada una de ellas se
+# prueban las filas que pueden ir a continuacin, y as sucesivamente. Si un
+# Sudoku tiene demasiadas transformaciones empatadas (por ejemplo, uno casi
+# vacio) solo se conservan las primeras, con lo cual la forma sigue siendo
+# vlida aunque dos Sudokus equivalentes podran no coincidir.
+#
+# SolutionCache guarda, por cada forma cannica, la solucin y los pasos de la
+# solucin (casilla, nmero y fase) escritos en la forma cannica. Al pedir un
+# Sudoku equivalente se transforma la solucin guardada con la transformacin
+# inversa, en lugar de volver a resolverlo. En memoria se guardan hasta size
+# formas, descartando la menos usada recientemente, y opcionalmente todas se
+# guardan tambin en un archivo (anydbm) que se conserva entre ejecuciones.
+#
+# Calcular la forma cannica toma unas decenas de milisegundos, por lo que el
+# cache conviene con las cuatro fases (mtodo "phases"), cuya fase IV puede
+# tomar segundos, y no con los mtodos "compact" o "dlx".
+#
+# La forma cannica solo est definida para Sudokus de 9 x 9; los de otros
+# tamaos (16 x 16, 25 x 25, ...) se resuelven sin pasar por el cache.
+#
+
+import anydbm
+import collections
+import itertools
+
+from Classes import *
+from Main import solve, loadBoard
+
+# Todos los rdenes de las columnas que conservan las pilas: primero el orden
+# de las pilas y luego el de las columnas dentro de cada pila
+ColumnOrders = []
+for Stacks in itertools.permutations(range(3)):
+    for Inner in itertools.product(list(itertools.permutations(range(3))),repeat=3):
+        ColumnOrders.append(tuple([3 * Stacks[k] + Inner[k][i] for k in range(3) for i in range(3)]))
+
+
+# Escribe la fila indicada en el orden de columnas Columns, renombrando los
+# nmeros con Labels (la lista se modifica con los nmeros nuevos). Devuelve
+# la fila y la cantidad de nmeros ya renombrados
+def relabelRow(Row,Columns,Labels,count):
+    Key = []
+    for column in Columns:
+        value = Row[column]
+        if value != 0:
+            if Labels[value] == 0:
+                count = count + 1
+                Labels[value] = count
+            value = Labels[value]
+        Key.append(value)
+    return [Key,count]
+
+
+# Calcula la forma cannica del Sudoku (cadena de 81 caracteres, cualquier
+# caracter que no sea un nmero es una casilla vacia). Devuelve [forma,
+# transformacin], donde la transformacin es [Casillas, Nmeros]: Casillas[i]
+# es la casilla del Sudoku original que qued en la casilla i de la forma, y
+# Nmeros[v] es el nmero de la forma que corresponde al nmero v original.
+# limit es la cantidad mxima de transformaciones empatadas que se conservan.
+# Si el Sudoku no tiene 81 casillas se lanza ValueError
+def canonicalForm(Puzzle,limit=5000):
+    if len(Puzzle) != 81:
+        raise ValueError("la forma canonica solo existe para Sudokus de 9 x 9")
+    Grid = [[0]*9 for i in range(9)]
+    for i in range(81):
+        if Puzzle[i] in Bits:
+            Grid[i // 9][i % 9] = int(Puzzle[i])
+    Grids = [Grid,[[Grid[column][row] for column in range(9)] for row in range(9)]]
+    # Cada estado es [traspuesto, filas escogidas, orden de columnas, nombres,
+    # cantidad de nmeros renombrados]
+    States = []
+    Best = None
+    for transpose in range(2):
+        for row in range(9):
+            for Columns in ColumnOrders:
+                Labels = [0]*10
+                Result = relabelRow(Grids[transpose][row],Columns,Labels,0)
+                if Best is None or Result[0] < Best:
+                    Best = Result[0]
+                    States = []
+                if Result[0] == Best and len(States) < limit:
+                    States.append([transpose,[row],Columns,Labels,Result[1]])
+    Form = Best[:]
+    for level in range(1,9):
+        New = []
+        Best = None
+        for State in States:
+            Rows = State[1]
+            if level % 3 != 0:
+                band = Rows[-1] // 3
+                Next = [row for row in range(3 * band,3 * band + 3) if row not in Rows]
+            else:
+                Next = [row for row in range(9) if row // 3 not in [r // 3 for r in Rows]]
+            for row in Next:
+                Labels = State[3][:]
+                Result = relabelRow(Grids[State[0]][row],State[2],Labels,State[4])
+                if Best is None or Result[0] < Best:
+                    Best = Result[0]
+                    New = []
+                if Result[0] == Best and len(New) < limit:
+                    New.append([State[0],Rows + [row],State[2],Labels,Result[1]])
+        States = New
+        Form.extend(Best)
+    State = States[0]
+    Cells = [0]*81
+    for i in range(9):
+        for j in range(9):
+            if State[0] == 0:
+                Cells[9 * i + j] = 9 * State[1][i] + State[2][j]
+            else:
+                Cells[9 * i + j] = 9 * State[2][j] + State[1][i]
+    Labels = State[3]
+    count = State[4]
+    for value in range(1,10):
+        if Labels[value] == 0:
+            count = count + 1
+            Labels[value] = count
+    return ["".join([str(value) for value in Form]),[Cells,Labels]]
+
+
+class SolutionCache(object):
+
+    # Constructor de la clase. size es la cantidad de formas que se guardan en
+    # memoria; si se indica path, las soluciones tambin se guardan en ese
+    # archivo. method es el mtodo de solucin usado cuando no est en cache
+    def __init__(self,size=1024,path=None,method="phases"):
+        self.Size = size
+        self.Method = method
+        self.Entries = collections.OrderedDict()
+        self.Store = None
+        if path is not None:
+            self.Store = anydbm.open(path,"c")
+        self.Hits = 0
+        self.StoreHits = 0
+        self.Misses = 0
+
+    # Busca la forma cannica en memoria y luego en el archivo. Devuelve la
+    # entrada guardada (solucin y pasos, o "-" si no tiene solucin) o None
+    def lookup(self,Form):
+        if Form in self.Entries:
+            Entry = self.Entries.pop(Form)
+            self.Entries[Form] = Entry
+            self.Hits = self.Hits + 1
+            return Entry
+        if self.Store is not None and Form in self.Store:
+            Entry = self.Store[Form]
+            self.remember(Form,Entry)
+            self.StoreHits = self.StoreHits + 1
+            return Entry
+        return None
+
+    # Guarda la entrada en memoria, descartando la menos usada si se llega al
+    # lmite
+    def remember(self,Form,Entry):
+        self.Entries[Form] = Entry
+        while len(self.Entries) > self.Size:
+            self.Entries.popitem(False)
+
+    # Resuelve el Sudoku (en cualquiera de los formatos de Main.solve).
+    # Devuelve el tablero solucionado (Board, con los pasos de la solucin) o
+    # None si no tiene solucin, igual que Main.solve. Los Sudokus que no son
+    # de 9 x 9 se resuelven directamente, sin usar el cache ni contarse
+    def solve(self,grid):
+        Sudoku = loadBoard(grid)
+        if Sudoku.Size != 9:
+            return solve(Sudoku,self.Method)
+        Result = canonicalForm(Sudoku.toString())
+        Form = Result[0]
+        Cells = Result[1][0]
+        Labels = Result[1][1]
+        Entry = self.lookup(Form)
+        if Entry is None:
+            self.Misses = self.Misses + 1
+            Solved = solve(Sudoku,self.Method)
+            if Solved is None:
+                Entry = "-"
+            else:
+                Position = [0]*81
+                for i in range(81):
+                    Position[Cells[i]] = i
+                Steps = []
+                for i in range(Solved.Top + 1):
+                    Step = Solved.Stack[i]
+                    Steps.append(str(Position[9 * Step[0] + Step[1]] * 128 + Step[3] * 16 + Labels[Step[2]]))
+                Entry = ",".join(Steps)
+            self.remember(Form,Entry)
+            if self.Store is not None:
+                self.Store[Form] = Entry
+            return Solved
+        if Entry == "-":
+            return None
+        Values = [0]*10
+        for value in range(1,10):
+            Values[Labels[value]] = value
+        if Entry != "":
+            for Step in Entry.split(","):
+                Step = int(Step)
+                cell = Cells[Step >> 7]
+                Sudoku.setValueAt(cell // 9,cell % 9,str(Values[Step & 15]))
+                Sudoku.inputStackValue(cell // 9,cell % 9,Values[Step & 15],(Step >> 4) & 7)
+        return Sudoku
+
+    # Cierra el archivo de soluciones, si hay uno
+    def close(self):
+        if self.Store is not None:
+            self.Store.close()
+            self.Store = None
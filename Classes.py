@@ -28,6 +28,8 @@
 #     en cualquier computador que tenga instalado Python.
 #
 
+from array import array
+
 
 # Clase Board
 #
@@ -40,86 +42,368 @@
 #
 # Para poder generar el archivo con la solucin paso a paso del Sudoku, se hace
 # uso de una arreglo donde se van adicionando los valores a los que se le ha
-# encontrado la ubicacin exacta.
+# encontrado la ubicacin exacta. Cada paso guarda la fila, la columna, el
+# nmero y la fase que lo ubic (ver PhaseNames).
+#
+# Para que las preguntas de pertenencia (est el nmero en la fila, columna o
+# cuadrante?) no tengan que recorrer las celdas, el tablero mantiene una
+# mscara de 9 bits (N bits en tableros de N x N) por cada fila, columna y
+# cuadrante. El bit k-1 de la
+# mscara est encendido si el nmero k se encuentra en dicha unidad. Las
+# mscaras se actualizan en cada llamado a setValueAt.
+#
+# El tablero tambin mantiene los candidatos de cada celda vacia (mscara de
+# los nmeros que an pueden ir en ella). Al ubicar un nmero solo se quita de
+# los candidatos de las 20 celdas vecinas, de modo que las fases que expanden
+# celdas leen los candidatos sin tener que calcularlos de nuevo.
+#
+# El tablero es de 9 x 9 por defecto, pero puede tener cuadrantes de cualquier
+# tamao (ver Geometry). El tamao se toma de la cantidad de valores en la
+# primera lnea del archivo, o de la cantidad de valores de fromString.
+#
+# Opcionalmente el tablero puede llevar un rastro (enableTrail) con el valor
+# anterior de cada celda modificada y los candidatos del tablero antes de
+# ubicar cada nmero. Con el rastro, la fase de multiplicidad
+# mnima por suposicin puede retroceder deshaciendo asignaciones (undo) en
+# lugar de guardar una copia completa del tablero por cada alternativa, y los
+# candidatos quedan exactamente como estaban en la marca (incluyendo los que
+# quitaron las tcnicas de eliminacin), en lugar de recalcularse.
+#
+# Para que las fases no tengan que recorrer todo el tablero en cada pasada, el
+# tablero lleva una lista de trabajo: Dirty tiene, por cada unidad (las filas,
+# luego las columnas y luego los cuadrantes, como en Geometry.UnitCells), la
+# mscara de los nmeros cuya proyeccin sobre la unidad (fases I y II) pudo
+# cambiar desde la ltima vez que se examin, y DirtySingles indica por cada
+# cuadrante si los candidatos de sus celdas (fase III) pudieron cambiar.
+# setValueAt y removeCandidates las marcan (ver markCell), undo las deja como
+# estaban en la marca, y las fases las borran al examinar.
+
+# Bit que representa a cada nmero dentro de las mscaras de las unidades.
+# Cualquier otro valor (casillas vacias o marcas del agente) no tiene bit.
+Bits = {"1":1,"2":2,"3":4,"4":8,"5":16,"6":32,"7":64,"8":128,"9":256}
+
+# Tablas de posiciones: fila, columna y cuadrante de cada celda, y celdas que
+# componen cada cuadrante (en orden de izquierda a derecha y de arriba a abajo)
+CellRow = [i // 9 for i in range(81)]
+CellColumn = [i % 9 for i in range(81)]
+CellQuadrant = [(i // 27) * 3 + (i % 9) // 3 for i in range(81)]
+QuadrantCells = [[i for i in range(81) if CellQuadrant[i] == q] for q in range(9)]
+
+# Filas y columnas del tablero que cruza cada cuadrante, y cuadrantes que cruza
+# cada fila y cada columna (numerados desde 0). Las columnas de los primeros
+# cuadrantes (QuadrantColumns[0] a QuadrantColumns[2]) son tambin las
+# posiciones de cada sector de una fila o columna
+QuadrantRows = [[3 * (q // 3) + i for i in range(3)] for q in range(9)]
+QuadrantColumns = [[3 * (q % 3) + i for i in range(3)] for q in range(9)]
+RowQuadrants = [[3 * (r // 3) + i for i in range(3)] for r in range(9)]
+ColumnQuadrants = [[3 * i + c // 3 for i in range(3)] for c in range(9)]
+
+# Celdas de cada unidad: filas (0 a 8), columnas (9 a 17) y cuadrantes (18 a
+# 26), con la misma numeracin de las mscaras de CompactBoard
+UnitCells = [[9 * r + c for c in range(9)] for r in range(9)] + [[9 * r + c for r in range(9)] for c in range(9)] + QuadrantCells
+
+# Vecinos de cada celda: las 20 celdas que comparten con ella fila, columna o
+# cuadrante
+CellPeers = [[j for j in range(81) if j != i and (CellRow[j] == CellRow[i] or CellColumn[j] == CellColumn[i] or CellQuadrant[j] == CellQuadrant[i])] for i in range(81)]
+
+# Letras con las que se nombran las filas del tablero (A a I)
+Letters = ["A","B","C","D","E","F","G","H","I"]
+
+# Nombre de la fase que ubic cada paso de la solucin. El 0 se usa para los
+# pasos que no provienen de ninguna fase (por ejemplo, de la cobertura exacta)
+PhaseNames = ["-","I","II-A","II-B","III","IV"]
+
+# Cantidad de nmeros y lista de nmeros presentes en cada mscara de 9 bits
+BitCount = [bin(m).count("1") for m in range(512)]
+BitDigits = [[d for d in range(1,10) if m & (1 << (d - 1))] for m in range(512)]
+BitText = ["".join([str(d) for d in BitDigits[m]]) for m in range(512)]
+
+
+# Clase Geometry
+#
+# Tablas de posiciones de un tablero de N x N celdas compuesto por cuadrantes
+# de n x n celdas (N = n * n): 9 x 9 con cuadrantes de 3 x 3, 16 x 16 con
+# cuadrantes de 4 x 4, 25 x 25 con cuadrantes de 5 x 5, etc. Los nmeros van
+# de 1 a N y se escriben en decimal, por lo que pueden tener ms de un
+# caracter. Cada tabla se calcula una sola vez por tamao (ver getGeometry) y
+# la comparten todos los tableros de ese tamao; las de 9 x 9 son las mismas
+# tablas del mdulo.
+#
+# Las mscaras tienen N bits, el bit k-1 corresponde al nmero k. Para contar
+# los bits de una mscara se usa una tabla cuando N es de hasta 16 bits.
+
+class Geometry(object):
+
+    # Constructor de la clase. Recibe el tamao n de los cuadrantes
+    def __init__(self,box=3):
+        size = box * box
+        cells = size * size
+        self.Box = box
+        self.Size = size
+        self.Cells = cells
+        self.Full = (1 << size) - 1
+        self.Digits = [str(d) for d in range(1,size + 1)]
+        if box == 3:
+            self.Bits = Bits
+            self.CellRow = CellRow
+            self.CellColumn = CellColumn
+            self.CellQuadrant = CellQuadrant
+            self.QuadrantCells = QuadrantCells
+            self.QuadrantRows = QuadrantRows
+            self.QuadrantColumns = QuadrantColumns
+            self.RowQuadrants = RowQuadrants
+            self.ColumnQuadrants = ColumnQuadrants
+            self.UnitCells = UnitCells
+            self.CellPeers = CellPeers
+            self.Letters = Letters
+            self.BitCount = BitCount
+            return
+        self.Bits = {}
+        for d in range(size):
+            self.Bits[self.Digits[d]] = 1 << d
+        self.CellRow = [i // size for i in range(cells)]
+        self.CellColumn = [i % size for i in range(cells)]
+        self.CellQuadrant = [(i // (size * box)) * box + (i % size) // box for i in range(cells)]
+        self.QuadrantCells = [[] for q in range(size)]
+        for i in range(cells):
+            self.QuadrantCells[self.CellQuadrant[i]].append(i)
+        self.QuadrantRows = [[box * (q // box) + i for i in range(box)] for q in range(size)]
+        self.QuadrantColumns = [[box * (q % box) + i for i in range(box)] for q in range(size)]
+        self.RowQuadrants = [[box * (r // box) + i for i in range(box)] for r in range(size)]
+        self.ColumnQuadrants = [[box * i + c // box for i in range(box)] for c in range(size)]
+        self.UnitCells = [[size * r + c for c in range(size)] for r in range(size)] + [[size * r + c for r in range(size)] for c in range(size)] + self.QuadrantCells
+        self.CellPeers = []
+        for i in range(cells):
+            Peers = set(self.QuadrantCells[self.CellQuadrant[i]])
+            Peers.update([size * self.CellRow[i] + c for c in range(size)])
+            Peers.update([size * r + self.CellColumn[i] for r in range(size)])
+            Peers.discard(i)
+            self.CellPeers.append(sorted(Peers))
+        self.Letters = [chr(ord("A") + r) for r in range(size)]
+        self.BitCount = None
+        if size <= 16:
+            self.BitCount = [bin(m).count("1") for m in range(1 << size)]
+
+    # Retorna la cantidad de nmeros en la mscara indicada
+    def countBits(self,mask):
+        if self.BitCount is not None:
+            return self.BitCount[mask]
+        return bin(mask).count("1")
+
+    # Retorna los nmeros de la mscara indicada, de menor a mayor
+    def getDigits(self,mask):
+        Digits = []
+        d = 0
+        while mask != 0:
+            if mask & 1:
+                Digits.append(self.Digits[d])
+            mask = mask >> 1
+            d = d + 1
+        return Digits
+
+
+# Geometras ya calculadas, por tamao de cuadrante
+Geometries = {}
+
+
+# Retorna la geometra de los tableros con cuadrantes de box x box celdas
+def getGeometry(box=3):
+    if box not in Geometries:
+        Geometries[box] = Geometry(box)
+    return Geometries[box]
+
+
+# Retorna el tamao de los cuadrantes de un tablero de size x size celdas.
+# Si size no es el cuadrado de un entero mayor que 1 se lanza ValueError
+def getBoxSize(size):
+    box = int(round(size ** 0.5))
+    if box < 2 or box * box != size:
+        raise ValueError("el tablero debe tener n * n filas, tiene " + str(size))
+    return box
+
+
+# Separa los valores de una lnea del archivo de un Sudoku (separados por
+# comas, con la lnea terminada en ";")
+def splitValues(linea):
+    return [value.strip() for value in linea.strip().rstrip(";").split(",")]
 
 class Board:
 
     # Constructor de la clase. Recibe por parmetro la direccin donde se
     # encuentra el archivo que contiene al Sudoku, y se llena con los datos
-    # encontrados.
-    def __init__(self,path):
-        self.Matrix = [["*"]*9 for i in range(9)]
-        self.Original = [["*"]*9 for i in range(9)]
-        self.Stack = [[0]*3 for i in range(81)]
-        self.Top = -1
-        self.BlankSpaces = 81
+    # encontrados. Si no se indica la direccin el tablero queda vacio (de
+    # box * box filas). Las casillas vacias pueden escribirse con cualquier
+    # valor que no sea un nmero (por ejemplo "*" o "-").
+    def __init__(self,path=None,box=3):
         self.Path = path
         self.SolutionPath = path
+        self.resize(box)
+        if path is None:
+            return
         if self.SolutionPath[len(self.SolutionPath) - 4:len(self.SolutionPath)] == ".txt":
             self.SolutionPath = self.SolutionPath[0:len(self.SolutionPath) - 4]
         InfoFile = open(path,"r")
-        for i in range(9):
-          linea = InfoFile.readline()
-          for j in range(9):
-            self.Matrix[i][j] = linea[2 * j]
-            self.Original[i][j] = linea[2 * j]
-            if self.Matrix[i][j] != "*":
-                self.BlankSpaces = self.BlankSpaces - 1
+        linea = InfoFile.readline()
+        Values = splitValues(linea)
+        if len(Values) != self.Size:
+            self.resize(getBoxSize(len(Values)))
+        for i in range(self.Size):
+          if i > 0:
+              Values = splitValues(InfoFile.readline())
+          for j in range(self.Size):
+            self.setOriginalValueAt(i,j,Values[j])
         InfoFile.close()
 
-    # Devuelve una copia de si mismo a otro apuntador del tipo Board
+    # Deja el tablero vacio, con cuadrantes de box x box celdas
+    def resize(self,box):
+        Geometry = getGeometry(box)
+        size = Geometry.Size
+        self.Geometry = Geometry
+        self.Size = size
+        self.Bits = Geometry.Bits
+        self.Matrix = [["*"]*size for i in range(size)]
+        self.Original = [["*"]*size for i in range(size)]
+        self.Stack = [[0]*4 for i in range(Geometry.Cells)]
+        self.RowMask = [0]*size
+        self.ColumnMask = [0]*size
+        self.QuadrantMask = [0]*size
+        self.Candidates = [Geometry.Full]*Geometry.Cells
+        self.Dirty = [Geometry.Full]*(3 * size)
+        self.DirtySingles = [1]*size
+        self.Trail = None
+        self.Top = -1
+        self.BlankSpaces = Geometry.Cells
+
+    # Devuelve una copia de si mismo a otro apuntador del tipo Board. La copia
+    # se hace en memoria, sin volver a leer el archivo, y no hereda el rastro
     def copy(self):
-        Copy = Board(self.Path)
-        for i in range(9):
-            for j in range(9):
-                Copy.setValueAt(i,j,self.Matrix[i][j])
-        for i in range(self.Top + 1):
-            Copy.inputStackValue(self.Stack[i][0],self.Stack[i][1],self.Stack[i][2])
+        Copy = Board(None,self.Geometry.Box)
+        Copy.Matrix = [Row[:] for Row in self.Matrix]
+        Copy.Original = [Row[:] for Row in self.Original]
+        Copy.Stack = [Step[:] for Step in self.Stack]
+        Copy.RowMask = self.RowMask[:]
+        Copy.ColumnMask = self.ColumnMask[:]
+        Copy.QuadrantMask = self.QuadrantMask[:]
+        Copy.Candidates = self.Candidates[:]
+        Copy.Dirty = self.Dirty[:]
+        Copy.DirtySingles = self.DirtySingles[:]
+        Copy.Top = self.Top
+        Copy.BlankSpaces = self.BlankSpaces
+        Copy.Path = self.Path
+        Copy.SolutionPath = self.SolutionPath
         return Copy
 
+    # Estado del tablero para enviarlo a otro proceso (pickle). La geometra
+    # no se enva, sino el tamao de los cuadrantes, y al recibir el tablero se
+    # toma la geometra ya calculada en ese proceso
+    def __getstate__(self):
+        State = self.__dict__.copy()
+        del State["Geometry"]
+        del State["Bits"]
+        State["Box"] = self.Geometry.Box
+        return State
+
+    # Recupera el tablero enviado desde otro proceso (ver __getstate__)
+    def __setstate__(self,State):
+        State = State.copy()
+        Geometry = getGeometry(State.pop("Box"))
+        self.__dict__.update(State)
+        self.Geometry = Geometry
+        self.Bits = Geometry.Bits
+
+    # Carga un Sudoku escrito como una cadena de 81 caracteres (fila por fila).
+    # Cualquier caracter que no sea un nmero del 1 al 9 es una casilla vacia.
+    # Tambin se acepta una lista de N * N valores, con la cual el tablero toma
+    # el tamao que corresponda (por ejemplo, 256 valores para 16 x 16)
+    def fromString(self,text):
+        if len(text) != self.Geometry.Cells:
+            self.resize(getBoxSize(int(round(len(text) ** 0.5))))
+        size = self.Size
+        for i in range(len(text)):
+            self.setOriginalValueAt(i // size,i % size,text[i])
+        return self
+
+    # Ubica en la celda indicada un nmero del Sudoku original. Cualquier valor
+    # que no sea un nmero del tablero (por ejemplo "*", "-", "." o "0") es una
+    # casilla vacia y se ignora
+    def setOriginalValueAt(self,row,column,value):
+        if value in self.Bits:
+            self.setValueAt(row,column,value)
+            self.Original[row][column] = value
+            self.BlankSpaces = self.BlankSpaces - 1
+
+    # Devuelve el tablero como una cadena de 81 caracteres, con "*" en las
+    # casillas vacias. En tableros mayores a 9 x 9 los valores se separan con
+    # comas
+    def toString(self):
+        separator = ""
+        if self.Size > 9:
+            separator = ","
+        return separator.join([separator.join([v if v in self.Bits else "*" for v in Row]) for Row in self.Matrix])
+
+    # Activa el rastro de asignaciones, necesario para poder usar undo
+    def enableTrail(self):
+        self.Trail = []
+
+    # Devuelve una marca del estado actual del tablero, a la cual se puede
+    # regresar luego con undo. Incluye la lista de trabajo, pues al volver a la
+    # marca el tablero queda igual y lo que no estaba marcado sigue sin cambios
+    def getMark(self):
+        return [len(self.Trail),self.Top,self.BlankSpaces,self.Dirty[:],self.DirtySingles[:]]
+
+    # Retorna la mscara de candidatos de la celda indicada (0 si la celda ya
+    # tiene un nmero)
+    def getCandidates(self,row,column):
+        return self.Candidates[self.Size * row + column]
+
     # Retorna el nmero indicado por la fila y columna ingresadas
     def getValueAt(self,row,column):
         return self.Matrix[row][column]
 
+    # Retorna la cantidad total de candidatos de las casillas vacias
+    def countCandidates(self):
+        total = 0
+        for Mask in self.Candidates:
+            total = total + self.Geometry.countBits(Mask)
+        return total
+
     # Ingresa un nuevo valor en el arreglo para la generacin del archivo con la
-    # solucin paso a paso
-    def inputStackValue(self,row,column,value):
+    # solucin paso a paso, junto con la fase que lo ubic
+    def inputStackValue(self,row,column,value,phase=0):
         self.Top = self.Top + 1
         self.Stack[self.Top][0] = row
         self.Stack[self.Top][1] = column
         self.Stack[self.Top][2] = value
+        self.Stack[self.Top][3] = phase
         self.BlankSpaces = self.BlankSpaces - 1
 
     # Pregunta si el nmero ingresado se encuentra en la fila indicada
     def isElementInRow(self,row,element):
-        sw = 0
-        i = 0
-        while i < 9 and sw == 0:
-            if self.Matrix[row][i] == element:
-                sw = 1
-            else:
-                i = i + 1
-        return sw
+        if self.RowMask[row] & self.Bits.get(element,0):
+            return 1
+        return 0
 
     # Pregunta si el nmero ingresado se encuentra en la columna indicada
     def isElementInColumn(self,column,element):
-        sw = 0
-        i = 0
-        while i < 9 and sw == 0:
-            if self.Matrix[i][column] == element:
-                sw = 1
-            else:
-                i = i + 1
-        return sw
+        if self.ColumnMask[column] & self.Bits.get(element,0):
+            return 1
+        return 0
+
+    # Pregunta si el nmero ingresado se encuentra en el cuadrante indicado
+    # (numerados desde 1, de izquierda a derecha y de arriba a abajo)
+    def isElementInQuadrant(self,quadrant,element):
+        if self.QuadrantMask[quadrant - 1] & self.Bits.get(element,0):
+            return 1
+        return 0
 
     # Indica si el Soduko est solucionado, su respuesta se basa en el nmero de
     # casillas en blanco que halla en el tablero
     def isSolved(self):
         sw = 1
         i = 0
-        while i < 9 and sw == 1:
+        while i < self.Size and sw == 1:
             j = 0
-            while j < 9 and sw == 1:
+            while j < self.Size and sw == 1:
                 if self.Matrix[i][j] == "*":
                     sw = 0
                 else:
@@ -127,20 +411,61 @@ class Board:
             i = i + 1
         return sw
 
+    # Revisa que ningn nmero est repetido en una fila, columna o cuadrante.
+    # Retorna 1 si el tablero es vlido
+    def isValid(self):
+        Geometry = self.Geometry
+        total = 0
+        for i in range(self.Size):
+            total = total + Geometry.countBits(self.RowMask[i]) + Geometry.countBits(self.ColumnMask[i]) + Geometry.countBits(self.QuadrantMask[i])
+        if total == 3 * (Geometry.Cells - self.BlankSpaces):
+            return 1
+        return 0
+
     # Imprime el tablero por pantalla
     def printMatrix(self):
+        width = len(str(self.Size))
+        Line = "+" + ("-" * (width + 2) + "+") * self.Size + "\n"
         t = ""
-        for i in range(9):
-            t = t + "+---+---+---+---+---+---+---+---+---+\n"
-            for j in range(9):
+        for i in range(self.Size):
+            t = t + Line
+            for j in range(self.Size):
                 if self.Matrix[i][j] == "*":
-                    t = t + "|   "
+                    t = t + "|" + " " * (width + 2)
                 else:
-                    t = t + "| " + str(self.Matrix[i][j]) + " "
+                    t = t + "| " + str(self.Matrix[i][j]).rjust(width) + " "
             t = t + "|\n"
-        t = t + "+---+---+---+---+---+---+---+---+---+\n"
+        t = t + Line
         print t
 
+    # Genera el texto de la solucin paso a paso, un paso a la vez: cada
+    # elemento es el bloque con el nmero adicionado, su posicin y el tablero
+    # hasta ese paso. Los bloques solo se arman a medida que se piden.
+    def iterSolution(self):
+        Letters = self.Geometry.Letters
+        width = len(str(self.Size))
+        Header = ("   " + "".join(["  " + str(k + 1).rjust(width) + " " for k in range(self.Size)])).rstrip() + "\n"
+        Line = "   +" + ("-" * (width + 2) + "+") * self.Size + "\n"
+        Blank = "|" + " " * (width + 2)
+        Grid = [Row[:] for Row in self.Original]
+        for i in range(self.Top + 1):
+            Grid[self.Stack[i][0]][self.Stack[i][1]] = str(self.Stack[i][2])
+            t = ["\n\n\n------------------------------------------\n"]
+            t.append("Numero adicionado: " + str(self.Stack[i][2]) + "\n")
+            t.append("Posicion: " + Letters[self.Stack[i][0]] + str(self.Stack[i][1] + 1) + "\n\n")
+            t.append(Header)
+            t.append(Line)
+            for j in range(self.Size):
+                t.append(" " + Letters[j] + " ")
+                for k in range(self.Size):
+                    if Grid[j][k] == "*":
+                        t.append(Blank)
+                    else:
+                        t.append("| " + Grid[j][k].rjust(width) + " ")
+                t.append("|\n")
+                t.append(Line)
+            yield "".join(t)
+
     # Genera el archivo con la solucin paso a paso. Toda solucin tendr el
     # nombre del archivo original concatenado con la palabra "Solution".
     # Ejemplo: Si el nombre es Sudoku1.txt, el archivo generado ser
@@ -148,34 +473,168 @@ class Board:
     # La solucin se guardar en la misma carpeta donde se encuentre el Sudoku
     # leido.
     def printSolution(self):
-        InfoFile = open(self.SolutionPath + "Solution.txt","w")
+        InfoFile = open(self.SolutionPath + "Solution.txt","w",65536)
         InfoFile.write("Solucion paso a paso\n")
         InfoFile.write("Solucion realizada por el algoritmo codificado por:\n")
         InfoFile.write("   ->Andres Mauricio Bejarano Posada\n   ->Leyla Mlayes Haddad\n")
-        Letters = ["A","B","C","D","E","F","G","H","I"]
-        i = 0
-        while i <= self.Top:
-            InfoFile.write("\n\n\n------------------------------------------\n")
-            InfoFile.write("Numero adicionado: " + str(self.Stack[i][2]) + "\n")
-            InfoFile.write("Posicion: " + Letters[self.Stack[i][0]] + str(self.Stack[i][1] + 1) + "\n\n")
-            self.Original[self.Stack[i][0]][self.Stack[i][1]] = str(self.Stack[i][2])
-            InfoFile.write("     1   2   3   4   5   6   7   8   9\n")
-            InfoFile.write("   +---+---+---+---+---+---+---+---+---+\n")
-            for j in range(9):
-                InfoFile.write(" " + Letters[j] + " ")
-                for k in range(9):
-                    if self.Original[j][k] == "*":
-                        InfoFile.write("|   ")
-                    else:
-                        InfoFile.write("| " + str(self.Original[j][k]) + " ")
-                InfoFile.write("|\n")
-                InfoFile.write("   +---+---+---+---+---+---+---+---+---+\n")
-            i = i + 1
+        for Block in self.iterSolution():
+            InfoFile.write(Block)
         InfoFile.close()
 
-    # Ingresa un valor en la fila y columna indicada
+    # Devuelve la traza compacta de la solucin: una primera lnea con el
+    # Sudoku original (81 caracteres, "*" en las casillas vacias; separados
+    # por comas en tableros mayores a 9 x 9) y una lnea por paso con la
+    # posicin, el nmero y la fase. Ejemplo: "G6 2 III"
+    def getTrace(self):
+        Letters = self.Geometry.Letters
+        separator = ""
+        if self.Size > 9:
+            separator = ","
+        t = [separator.join([separator.join(Row) for Row in self.Original]) + "\n"]
+        for i in range(self.Top + 1):
+            Step = self.Stack[i]
+            t.append(Letters[Step[0]] + str(Step[1] + 1) + " " + str(Step[2]) + " " + PhaseNames[Step[3]] + "\n")
+        return "".join(t)
+
+    # Genera el archivo con la traza compacta de la solucin. Tendr el nombre
+    # del archivo original concatenado con la palabra "Trace".
+    def printTrace(self):
+        InfoFile = open(self.SolutionPath + "Trace.txt","w")
+        InfoFile.write(self.getTrace())
+        InfoFile.close()
+
+    # Ingresa un valor en la fila y columna indicada, actualizando las mscaras
+    # de la fila, columna y cuadrante que contienen a la celda
     def setValueAt(self,row,column,value):
+        if self.Matrix[row][column] == value:
+            return
+        Step = None
+        if self.Trail is not None:
+            Step = [row,column,self.Matrix[row][column]]
+            self.Trail.append(Step)
+        old = self.Bits.get(self.Matrix[row][column],0)
+        new = self.Bits.get(value,0)
         self.Matrix[row][column] = value
+        if old != new:
+            cell = self.Size * row + column
+            quadrant = self.Geometry.CellQuadrant[cell]
+            if old == 0:
+                self.markCell(cell,new)
+            else:
+                self.markAll()
+            if old:
+                self.RowMask[row] = self.RowMask[row] & ~old
+                self.ColumnMask[column] = self.ColumnMask[column] & ~old
+                self.QuadrantMask[quadrant] = self.QuadrantMask[quadrant] & ~old
+            if new:
+                self.RowMask[row] = self.RowMask[row] | new
+                self.ColumnMask[column] = self.ColumnMask[column] | new
+                self.QuadrantMask[quadrant] = self.QuadrantMask[quadrant] | new
+            if old == 0:
+                Candidates = self.Candidates
+                if Step is not None:
+                    # Candidatos antes de ubicar el nmero, para que undo los
+                    # restaure
+                    Step.append(Candidates[:])
+                Candidates[cell] = 0
+                for peer in self.Geometry.CellPeers[cell]:
+                    Candidates[peer] = Candidates[peer] & ~new
+            else:
+                self.updateCandidates(cell)
+                for peer in self.Geometry.CellPeers[cell]:
+                    self.updateCandidates(peer)
+
+    # Marca en la lista de trabajo lo que cambia al ubicar el nmero de la
+    # mscara bit en la celda vacia indicada: las tres unidades de la celda con
+    # todos los nmeros (la celda deja de ser una posicin libre), y las
+    # unidades de cada vecino vacio que poda tener el nmero segn las
+    # mscaras con ese nmero, junto con su cuadrante para la fase III. Se
+    # llama antes de agregar el nmero a las mscaras
+    def markCell(self,cell,bit):
+        Geometry = self.Geometry
+        size = self.Size
+        Dirty = self.Dirty
+        Singles = self.DirtySingles
+        CellRow = Geometry.CellRow
+        CellColumn = Geometry.CellColumn
+        CellQuadrant = Geometry.CellQuadrant
+        Dirty[CellRow[cell]] = Geometry.Full
+        Dirty[size + CellColumn[cell]] = Geometry.Full
+        Dirty[2 * size + CellQuadrant[cell]] = Geometry.Full
+        Singles[CellQuadrant[cell]] = 1
+        for peer in Geometry.CellPeers[cell]:
+            row = CellRow[peer]
+            column = CellColumn[peer]
+            quadrant = CellQuadrant[peer]
+            if (self.RowMask[row] | self.ColumnMask[column] | self.QuadrantMask[quadrant]) & bit == 0 and self.Matrix[row][column] not in self.Bits:
+                Dirty[row] = Dirty[row] | bit
+                Dirty[size + column] = Dirty[size + column] | bit
+                Dirty[2 * size + quadrant] = Dirty[2 * size + quadrant] | bit
+                Singles[quadrant] = 1
+
+    # Marca todas las unidades y cuadrantes en la lista de trabajo
+    def markAll(self):
+        self.Dirty = [self.Geometry.Full]*(3 * self.Size)
+        self.DirtySingles = [1]*self.Size
+
+    # Vuelve a calcular los candidatos de la celda indicada a partir de las
+    # mscaras. Solo es necesario cuando se borra un nmero del tablero
+    def updateCandidates(self,cell):
+        Geometry = self.Geometry
+        row = Geometry.CellRow[cell]
+        column = Geometry.CellColumn[cell]
+        if self.Matrix[row][column] in self.Bits:
+            self.Candidates[cell] = 0
+        else:
+            self.Candidates[cell] = Geometry.Full & ~(self.RowMask[row] | self.ColumnMask[column] | self.QuadrantMask[Geometry.CellQuadrant[cell]])
+
+    # Quita de los candidatos de la celda indicada los nmeros de la mscara
+    # (sin ubicar ningn nmero). Si el rastro est activo se registra la
+    # mscara anterior, con columna -1, para que undo la restaure. Retorna la
+    # cantidad de candidatos quitados
+    def removeCandidates(self,cell,mask):
+        old = self.Candidates[cell]
+        if old & mask == 0:
+            return 0
+        if self.Trail is not None:
+            self.Trail.append([cell,-1,old])
+        self.Candidates[cell] = old & ~mask
+        self.DirtySingles[self.Geometry.CellQuadrant[cell]] = 1
+        return self.Geometry.countBits(old & mask)
+
+    # Deshace todas las asignaciones hechas despus de la marca indicada,
+    # incluyendo los pasos registrados para la solucin, los candidatos
+    # quitados con removeCandidates y la lista de trabajo
+    def undo(self,mark):
+        Trail = self.Trail
+        self.Trail = None
+        while len(Trail) > mark[0]:
+            Step = Trail.pop()
+            if Step[1] == -1:
+                self.Candidates[Step[0]] = Step[2]
+            elif len(Step) == 4:
+                self.restoreValueAt(Step)
+            else:
+                self.setValueAt(Step[0],Step[1],Step[2])
+        self.Trail = Trail
+        self.Top = mark[1]
+        self.BlankSpaces = mark[2]
+        self.Dirty = mark[3][:]
+        self.DirtySingles = mark[4][:]
+
+    # Deshace un nmero ubicado en una celda vacia, segn el paso del rastro
+    # [fila, columna, valor anterior, candidatos anteriores]: quita el nmero
+    # de las mscaras y devuelve los candidatos guardados, sin recalcularlos
+    def restoreValueAt(self,Step):
+        row = Step[0]
+        column = Step[1]
+        new = self.Bits[self.Matrix[row][column]]
+        quadrant = self.Geometry.CellQuadrant[self.Size * row + column]
+        self.Matrix[row][column] = Step[2]
+        self.RowMask[row] = self.RowMask[row] & ~new
+        self.ColumnMask[column] = self.ColumnMask[column] & ~new
+        self.QuadrantMask[quadrant] = self.QuadrantMask[quadrant] & ~new
+        self.Candidates[:] = Step[3]
 
 
 
@@ -201,72 +660,65 @@ class Board:
 class Agent:
 
     # Constructor de la clase. Recibe por parmetro el Sudoku que va a resolver.
+    # El cuadrante es de n x n y el vector de N casillas, segn el tamao del
+    # Sudoku. Las posiciones se leen de las tablas de la geometra del Sudoku
     def __init__(self,Board):
         self.Enviroment = Board
-        self.Quadrant = [["-"]*3 for i in range(3)]
-        self.Vector = ["-"]*9
+        self.Geometry = Board.Geometry
+        self.Box = Board.Geometry.Box
+        self.Size = Board.Size
+        self.Quadrant = [["-"]*self.Box for i in range(self.Box)]
+        self.Vector = ["-"]*self.Size
         self.SelectedQuadrant = 0
+        self.SelectedCells = []
         self.SelectedRow = 0
         self.SelectedColumn = 0
 
-    #Carga el cuadrante indicado
+    #Carga el cuadrante indicado. SelectedCells guarda las celdas del tablero
+    #que lo componen, en el mismo orden del cuadrante
     def loadQuadrant(self,Number):
+        CellRow = self.Geometry.CellRow
+        CellColumn = self.Geometry.CellColumn
         self.SelectedQuadrant = Number
-        for i in range(3):
-            for j in range(3):
-                if Number == 1:
-                    self.Quadrant[i][j] = self.Enviroment.getValueAt(i,j)
-                elif Number == 2:
-                    self.Quadrant[i][j] = self.Enviroment.getValueAt(i,j + 3)
-                elif Number == 3:
-                    self.Quadrant[i][j] = self.Enviroment.getValueAt(i,j + 6)
-                elif Number == 4:
-                    self.Quadrant[i][j] = self.Enviroment.getValueAt(i + 3,j)
-                elif Number == 5:
-                    self.Quadrant[i][j] = self.Enviroment.getValueAt(i + 3,j + 3)
-                elif Number == 6:
-                    self.Quadrant[i][j] = self.Enviroment.getValueAt(i + 3,j + 6)
-                elif Number == 7:
-                    self.Quadrant[i][j] = self.Enviroment.getValueAt(i + 6,j)
-                elif Number == 8:
-                    self.Quadrant[i][j] = self.Enviroment.getValueAt(i + 6,j + 3)
-                else:
-                    self.Quadrant[i][j] = self.Enviroment.getValueAt(i + 6,j + 6)
+        self.SelectedCells = self.Geometry.QuadrantCells[Number - 1]
+        k = 0
+        for i in range(self.Box):
+            for j in range(self.Box):
+                cell = self.SelectedCells[k]
+                self.Quadrant[i][j] = self.Enviroment.getValueAt(CellRow[cell],CellColumn[cell])
+                k = k + 1
 
-    #Indica si el numero ingresado se encuentra en el cuadrante
+    #Indica si el numero ingresado se encuentra en el cuadrante. La consulta se
+    #hace sobre la mscara del tablero, por lo que el cuadrante cargado debe
+    #estar aplicado (applyQuadrant) antes de preguntar
     def isElementInQuadrant(self,number):
-        sw = 0
-        for i in range(3):
-            for j in range(3):
-                if self.Quadrant[i][j] == number:
-                    sw = 1
-        return sw
+        return self.Enviroment.isElementInQuadrant(self.SelectedQuadrant,number)
 
     #Escribe el cuadrante por pantalla
     def printQuadrant(self):
         t = "|"
-        for i in range(3):
-            for j in range(3):
+        for i in range(self.Box):
+            for j in range(self.Box):
                 t = t + str(self.Quadrant[i][j]) + "|"
             t = t + "\n"
         print t
 
     #Llena la fila indicada del cuadrante con afirmaciones (!)
     def fillQuadrantRow(self,Row):
-        for i in range(3):
+        for i in range(self.Box):
             if self.Quadrant[Row][i] == "*":
                 self.Quadrant[Row][i] = "!"
 
     #Llena la columna indicada del cuadrante con admiraciones (!)
     def fillQuadrantColumn(self,Column):
-        for i in range(3):
+        for i in range(self.Box):
             if self.Quadrant[i][Column] == "*":
                 self.Quadrant[i][Column] = "!"
 
     #Limpia el cuadrante de smbolos
     def clearQuadrant(self):
-        for i in range(3):
-            for j in range(3):
+        for i in range(self.Box):
+            for j in range(self.Box):
                 if  self.Quadrant[i][j] == "!":
                     self.Quadrant[i][j] = "*"
                 elif self.Quadrant[i][j][0] == "*" and len(self.Quadrant[i][j]) > 1:
@@ -275,8 +727,8 @@ class Agent:
     #Cuenta los guiones que hayan en el cuadrante
     def countQuadrantDash(self):
         cont = 0
-        for i in range(3):
-            for j in range(3):
+        for i in range(self.Box):
+            for j in range(self.Box):
                 if self.Quadrant[i][j] == "*":
                     cont = cont + 1
         return cont
@@ -285,123 +737,56 @@ class Agent:
     def writeNumberInQuadrant(self,Number):
         i = 0
         sw = 0
-        while i < 3 and sw == 0:
+        while i < self.Box and sw == 0:
             j = 0
-            while j < 3 and sw == 0:
+            while j < self.Box and sw == 0:
                 if self.Quadrant[i][j] == "*":
                     self.Quadrant[i][j] = Number
                     sw = 1
-                    if self.SelectedQuadrant == 1:
-                        self.Enviroment.inputStackValue(i,j,int(Number))
-                    elif self.SelectedQuadrant == 2:
-                        self.Enviroment.inputStackValue(i,j + 3,int(Number))
-                    elif self.SelectedQuadrant == 3:
-                        self.Enviroment.inputStackValue(i,j + 6,int(Number))
-                    elif self.SelectedQuadrant == 4:
-                        self.Enviroment.inputStackValue(i + 3,j,int(Number))
-                    elif self.SelectedQuadrant == 5:
-                        self.Enviroment.inputStackValue(i + 3,j + 3,int(Number))
-                    elif self.SelectedQuadrant == 6:
-                        self.Enviroment.inputStackValue(i + 3,j + 6,int(Number))
-                    elif self.SelectedQuadrant == 7:
-                        self.Enviroment.inputStackValue(i + 6,j,int(Number))
-                    elif self.SelectedQuadrant == 8:
-                        self.Enviroment.inputStackValue(i + 6,j + 3,int(Number))
-                    else:
-                        self.Enviroment.inputStackValue(i + 6,j + 6,int(Number))
+                    cell = self.SelectedCells[self.Box * i + j]
+                    self.Enviroment.inputStackValue(self.Geometry.CellRow[cell],self.Geometry.CellColumn[cell],int(Number),1)
                 else:
                     j = j + 1
             i = i + 1
 
     #Aplica los cambios hechos en el cuadrante al Sudoku
     def applyQuadrant(self):
-        for i in range(3):
-            for j in range(3):
-                if self.SelectedQuadrant == 1:
-                    self.Enviroment.setValueAt(i,j,self.Quadrant[i][j])
-                elif self.SelectedQuadrant == 2:
-                    self.Enviroment.setValueAt(i,j+3,self.Quadrant[i][j])
-                elif self.SelectedQuadrant == 3:
-                    self.Enviroment.setValueAt(i,j+6,self.Quadrant[i][j])
-                elif self.SelectedQuadrant == 4:
-                    self.Enviroment.setValueAt(i+3,j,self.Quadrant[i][j])
-                elif self.SelectedQuadrant == 5:
-                    self.Enviroment.setValueAt(i+3,j+3,self.Quadrant[i][j])
-                elif self.SelectedQuadrant == 6:
-                    self.Enviroment.setValueAt(i+3,j+6,self.Quadrant[i][j])
-                elif self.SelectedQuadrant == 7:
-                    self.Enviroment.setValueAt(i+6,j,self.Quadrant[i][j])
-                elif self.SelectedQuadrant == 8:
-                    self.Enviroment.setValueAt(i+6,j+3,self.Quadrant[i][j])
-                else:
-                    self.Enviroment.setValueAt(i+6,j+6,self.Quadrant[i][j])
+        CellRow = self.Geometry.CellRow
+        CellColumn = self.Geometry.CellColumn
+        k = 0
+        for i in range(self.Box):
+            for j in range(self.Box):
+                cell = self.SelectedCells[k]
+                self.Enviroment.setValueAt(CellRow[cell],CellColumn[cell],self.Quadrant[i][j])
+                k = k + 1
 
     #Hace las proyecciones sobre el cuadrante con respecto al numero ingresado
     def proyectQuadrant(self,Number):
-        for i in range(3):
-            if self.SelectedQuadrant == 1:
-                if self.Enviroment.isElementInRow(i,Number):
-                    self.fillQuadrantRow(i)
-                if self.Enviroment.isElementInColumn(i,Number):
-                    self.fillQuadrantColumn(i)
-            elif self.SelectedQuadrant == 2:
-                if self.Enviroment.isElementInRow(i,Number):
-                    self.fillQuadrantRow(i)
-                if self.Enviroment.isElementInColumn(i+3,Number):
-                    self.fillQuadrantColumn(i)
-            elif self.SelectedQuadrant == 3:
-                if self.Enviroment.isElementInRow(i,Number):
-                    self.fillQuadrantRow(i)
-                if self.Enviroment.isElementInColumn(i+6,Number):
-                    self.fillQuadrantColumn(i)
-            elif self.SelectedQuadrant == 4:
-                if self.Enviroment.isElementInRow(i+3,Number):
-                    self.fillQuadrantRow(i)
-                if self.Enviroment.isElementInColumn(i,Number):
-                    self.fillQuadrantColumn(i)
-            elif self.SelectedQuadrant == 5:
-                if self.Enviroment.isElementInRow(i+3,Number):
-                    self.fillQuadrantRow(i)
-                if self.Enviroment.isElementInColumn(i+3,Number):
-                    self.fillQuadrantColumn(i)
-            elif self.SelectedQuadrant == 6:
-                if self.Enviroment.isElementInRow(i+3,Number):
-                    self.fillQuadrantRow(i)
-                if self.Enviroment.isElementInColumn(i+6,Number):
-                    self.fillQuadrantColumn(i)
-            elif self.SelectedQuadrant == 7:
-                if self.Enviroment.isElementInRow(i+6,Number):
-                    self.fillQuadrantRow(i)
-                if self.Enviroment.isElementInColumn(i,Number):
-                    self.fillQuadrantColumn(i)
-            elif self.SelectedQuadrant == 8:
-                if self.Enviroment.isElementInRow(i+6,Number):
-                    self.fillQuadrantRow(i)
-                if self.Enviroment.isElementInColumn(i+3,Number):
-                    self.fillQuadrantColumn(i)
-            else:
-                if self.Enviroment.isElementInRow(i+6,Number):
-                    self.fillQuadrantRow(i)
-                if self.Enviroment.isElementInColumn(i+6,Number):
-                    self.fillQuadrantColumn(i)
+        Rows = self.Geometry.QuadrantRows[self.SelectedQuadrant - 1]
+        Columns = self.Geometry.QuadrantColumns[self.SelectedQuadrant - 1]
+        for i in range(self.Box):
+            if self.Enviroment.isElementInRow(Rows[i],Number):
+                self.fillQuadrantRow(i)
+            if self.Enviroment.isElementInColumn(Columns[i],Number):
+                self.fillQuadrantColumn(i)
 
     # Carga la fila indicada en el vector
     def loadRow(self,Number):
         self.SelectedRow = Number
-        for i in range(9):
+        for i in range(self.Size):
             self.Vector[i] = self.Enviroment.getValueAt(Number,i)
 
     # Carga la columna indicada en el vector
     def loadColumn(self,Number):
         self.SelectedColumn = Number
-        for i in range(9):
+        for i in range(self.Size):
             self.Vector[i] = self.Enviroment.getValueAt(i,Number)
 
     # Indica si el elemento ingresado se encuentra en el vector
     def isElementInVector(self,Number):
         sw = 0
         i = 0
-        while sw == 0 and i < 9:
+        while sw == 0 and i < self.Size:
             if self.Vector[i] == Number:
                 sw = 1
             else:
@@ -410,25 +795,25 @@ class Agent:
 
     # Aplica el vector a la solucin del Sudoku como fila
     def applyRow(self):
-        for i in range(9):
+        for i in range(self.Size):
             self.Enviroment.setValueAt(self.SelectedRow,i,self.Vector[i])
 
     # Aplica el vector a la solucin del Sudoku como columna
     def applyColumn(self):
-        for i in range(9):
+        for i in range(self.Size):
             self.Enviroment.setValueAt(i,self.SelectedColumn,self.Vector[i])
 
     # Cuenta el nmero de "-" que hay en el vector
     def countVectorDash(self):
         cont = 0
-        for i in range(9):
+        for i in range(self.Size):
             if self.Vector[i] == "*":
                 cont = cont + 1
         return cont
 
     # Limpia el vector
     def clearVector(self):
-        for i in range(9):
+        for i in range(self.Size):
             if self.Vector[i] == "!":
                 self.Vector[i] = "*"
 
@@ -442,101 +827,84 @@ class Agent:
                 self.Vector[i] = Number
                 sw = 1
                 if value == 0:
-                    self.Enviroment.inputStackValue(self.SelectedRow,i,int(Number))
+                    self.Enviroment.inputStackValue(self.SelectedRow,i,int(Number),2)
                 else:
-                    self.Enviroment.inputStackValue(i,self.SelectedColumn,int(Number))
+                    self.Enviroment.inputStackValue(i,self.SelectedColumn,int(Number),3)
             else:
                 i = i + 1
 
-    # Llena el sector indicado con "!"
+    # Llena el sector indicado (desde 1; cada sector son n casillas) con "!".
+    # Las posiciones del sector son las columnas del cuadrante Sector - 1
     def fillVector(self,Sector):
-        if Sector == 1:
-            for i in range(3):
-                if self.Vector[i] == "*":
-                    self.Vector[i] = "!"
-        elif Sector == 2:
-            for i in range(3):
-                if self.Vector[i+3] == "*":
-                    self.Vector[i+3] = "!"
-        else:
-            for i in range(3):
-                if self.Vector[i+6] == "*":
-                    self.Vector[i+6] = "!"
+        for i in self.Geometry.QuadrantColumns[Sector - 1]:
+            if self.Vector[i] == "*":
+                self.Vector[i] = "!"
 
     # Realiza la proyeccin del Sudoku sobre la fila almacenada en el vector
     def proyectRow(self,Number):
-        for i in range(9):
+        for i in range(self.Size):
             if self.Vector[i] == "*" and self.Enviroment.isElementInColumn(i,Number):
                 self.Vector[i] = "!"
-        if self.SelectedRow == 0 or self.SelectedRow == 1 or self.SelectedRow == 2:
-            for i in range(3):
-                self.loadQuadrant(i+1)
-                if self.isElementInQuadrant(Number):
-                    self.fillVector(i+1)
-        elif self.SelectedRow == 3 or self.SelectedRow == 4 or self.SelectedRow == 5:
-            for i in range(3):
-                self.loadQuadrant(i+4)
-                if self.isElementInQuadrant(Number):
-                    self.fillVector(i+1)
-        else:
-            for i in range(3):
-                self.loadQuadrant(i+7)
-                if self.isElementInQuadrant(Number):
-                    self.fillVector(i+1)
+        Quadrants = self.Geometry.RowQuadrants[self.SelectedRow]
+        for i in range(self.Box):
+            if self.Enviroment.isElementInQuadrant(Quadrants[i] + 1,Number):
+                self.fillVector(i + 1)
 
     # Realiza la proyeccin del Sudoku sobre la columna almacenada en el vector
     def proyectColumn(self,Number):
-        for i in range(9):
+        for i in range(self.Size):
             if self.Vector[i] == "*" and self.Enviroment.isElementInRow(i,Number):
                 self.Vector[i] = "!"
-        if self.SelectedColumn == 0 or self.SelectedColumn == 1 or self.SelectedColumn == 2:
-            for i in range(3):
-                self.loadQuadrant(3*i+1)
-                if self.isElementInQuadrant(Number):
-                    self.fillVector(i+1)
-        elif self.SelectedColumn == 3 or self.SelectedColumn == 4 or self.SelectedColumn == 5:
-            for i in range(3):
-                self.loadQuadrant(3*i+2)
-                if self.isElementInQuadrant(Number):
-                    self.fillVector(i+1)
-        else:
-            for i in range(3):
-                self.loadQuadrant(3*i+3)
-                if self.isElementInQuadrant(Number):
-                    self.fillVector(i+1)
+        Quadrants = self.Geometry.ColumnQuadrants[self.SelectedColumn]
+        for i in range(self.Box):
+            if self.Enviroment.isElementInQuadrant(Quadrants[i] + 1,Number):
+                self.fillVector(i + 1)
 
-    # Expande el cuadrante de acuerdo al nmero ingresado
+    # Expande el cuadrante de acuerdo al nmero ingresado, consultando los
+    # candidatos que mantiene el tablero
     def expand(self,Number):
-        for i in range(3):
-            for j in range(3):
-                if self.Quadrant[i][j][0] == "*":
-                    if self.SelectedQuadrant == 1:
-                        if self.Enviroment.isElementInRow(i,Number) == 0 and self.Enviroment.isElementInColumn(j,Number) == 0:
-                            self.Quadrant[i][j] = self.Quadrant[i][j] + Number
-                    elif self.SelectedQuadrant == 2:
-                        if self.Enviroment.isElementInRow(i,Number) == 0 and self.Enviroment.isElementInColumn(j+3,Number) == 0:
-                            self.Quadrant[i][j] = self.Quadrant[i][j] + Number
-                    elif self.SelectedQuadrant == 3:
-                        if self.Enviroment.isElementInRow(i,Number) == 0 and self.Enviroment.isElementInColumn(j+6,Number) == 0:
-                            self.Quadrant[i][j] = self.Quadrant[i][j] + Number
-                    elif self.SelectedQuadrant == 4:
-                        if self.Enviroment.isElementInRow(i+3,Number) == 0 and self.Enviroment.isElementInColumn(j,Number) == 0:
-                            self.Quadrant[i][j] = self.Quadrant[i][j] + Number
-                    elif self.SelectedQuadrant == 5:
-                        if self.Enviroment.isElementInRow(i+3,Number) == 0 and self.Enviroment.isElementInColumn(j+3,Number) == 0:
-                            self.Quadrant[i][j] = self.Quadrant[i][j] + Number
-                    elif self.SelectedQuadrant == 6:
-                        if self.Enviroment.isElementInRow(i+3,Number) == 0 and self.Enviroment.isElementInColumn(j+6,Number) == 0:
-                            self.Quadrant[i][j] = self.Quadrant[i][j] + Number
-                    elif self.SelectedQuadrant == 7:
-                        if self.Enviroment.isElementInRow(i+6,Number) == 0 and self.Enviroment.isElementInColumn(j,Number) == 0:
-                            self.Quadrant[i][j] = self.Quadrant[i][j] + Number
-                    elif self.SelectedQuadrant == 8:
-                        if self.Enviroment.isElementInRow(i+6,Number) == 0 and self.Enviroment.isElementInColumn(j+3,Number) == 0:
-                            self.Quadrant[i][j] = self.Quadrant[i][j] + Number
+        Cells = self.SelectedCells
+        bit = self.Enviroment.Bits[Number]
+        for i in range(self.Box):
+            for j in range(self.Box):
+                if self.Quadrant[i][j][0] == "*" and self.Enviroment.Candidates[Cells[self.Box * i + j]] & bit:
+                    self.Quadrant[i][j] = self.Quadrant[i][j] + Number
+
+    # Expande todas las celdas vacias del cuadrante con sus candidatos (el
+    # resultado es el mismo de llamar expand con cada nmero que no est en el
+    # cuadrante). En Sudokus mayores a 9 x 9 los candidatos se separan con
+    # comas
+    def expandQuadrant(self):
+        Geometry = self.Geometry
+        Cells = self.SelectedCells
+        for i in range(self.Box):
+            for j in range(self.Box):
+                if self.Quadrant[i][j] == "*":
+                    Candidates = self.Enviroment.Candidates[Cells[self.Box * i + j]]
+                    if self.Size == 9:
+                        self.Quadrant[i][j] = "*" + BitText[Candidates]
                     else:
-                        if self.Enviroment.isElementInRow(i+6,Number) == 0 and self.Enviroment.isElementInColumn(j+6,Number) == 0:
-                            self.Quadrant[i][j] = self.Quadrant[i][j] + Number
+                        self.Quadrant[i][j] = "*" + ",".join(Geometry.getDigits(Candidates))
+
+    # Escribe en el cuadrante el nmero de cada celda vacia que tenga un solo
+    # candidato. Los candidatos son los del tablero, por lo que los nmeros
+    # escritos no se tienen en cuenta hasta aplicar el cuadrante; por eso se
+    # lleva la cuenta de los nmeros escritos, para no escribir dos veces el
+    # mismo (lo cual solo ocurre en un tablero sin solucin). Retorna 1 si
+    # escribi algn nmero
+    def writeSinglesInQuadrant(self):
+        Geometry = self.Geometry
+        Cells = self.SelectedCells
+        Written = 0
+        sw = 0
+        for i in range(self.Box):
+            for j in range(self.Box):
+                Candidates = self.Enviroment.Candidates[Cells[self.Box * i + j]]
+                if self.Quadrant[i][j] == "*" and Candidates != 0 and Candidates & (Candidates - 1) == 0 and Candidates & Written == 0:
+                    self.setQuadrantValueAt(i,j,Geometry.getDigits(Candidates)[0])
+                    Written = Written | Candidates
+                    sw = 1
+        return sw
 
     # Obtiene el valor del cuadrante en la fila y columna indicada
     def getQuadrantValueAt(self,row,column):
@@ -545,21 +913,274 @@ class Agent:
     # Asigna un valor en el cuadrante con la fila y columna indicada
     def setQuadrantValueAt(self,row,column,Number):
         self.Quadrant[row][column] = Number
-        if self.SelectedQuadrant == 1:
-            self.Enviroment.inputStackValue(row,column,int(Number))
-        elif self.SelectedQuadrant == 2:
-            self.Enviroment.inputStackValue(row,column + 3,int(Number))
-        elif self.SelectedQuadrant == 3:
-            self.Enviroment.inputStackValue(row,column + 6,int(Number))
-        elif self.SelectedQuadrant == 4:
-            self.Enviroment.inputStackValue(row + 3,column,int(Number))
-        elif self.SelectedQuadrant == 5:
-            self.Enviroment.inputStackValue(row + 3,column + 3,int(Number))
-        elif self.SelectedQuadrant == 6:
-            self.Enviroment.inputStackValue(row + 3,column + 6,int(Number))
-        elif self.SelectedQuadrant == 7:
-            self.Enviroment.inputStackValue(row + 6,column,int(Number))
-        elif self.SelectedQuadrant == 8:
-            self.Enviroment.inputStackValue(row + 6,column + 3,int(Number))
-        else:
-            self.Enviroment.inputStackValue(row + 6,column + 6,int(Number))
+        cell = self.SelectedCells[self.Box * row + column]
+        self.Enviroment.inputStackValue(self.Geometry.CellRow[cell],self.Geometry.CellColumn[cell],int(Number),4)
+
+
+
+# Clases CompactBoard y CompactAgent
+#
+# Representacin compacta del tablero para cuando se requiere mantener muchos
+# Sudokus en memoria (por ejemplo, al resolver lotes de Sudokus). Las 81
+# celdas se guardan en un bytearray plano (0 es una casilla vacia), las
+# mscaras de las 27 unidades en un arreglo de enteros cortos (filas 0 a 8,
+# columnas 9 a 17 y cuadrantes 18 a 26) y los pasos de la solucin en un
+# arreglo empaquetado donde cada paso ocupa un solo entero:
+# celda * 128 + fase * 16 + valor.
+#
+# CompactAgent trabaja directamente sobre el arreglo de celdas, sin cargar ni
+# aplicar cuadrantes o vectores, y expone cada fase del programa principal
+# como un solo recorrido sobre el tablero. Los recorridos siguen el mismo
+# orden que las fases de Agent, por lo que ambos agentes ubican los mismos
+# nmeros en el mismo orden.
+
+class CompactBoard(object):
+
+    __slots__ = ("Cells","Masks","Steps","BlankSpaces","Path","SolutionPath")
+
+    # Constructor de la clase. Recibe la direccin del archivo con el Sudoku,
+    # en el mismo formato que Board. Si no se indica, el tablero queda vacio.
+    def __init__(self,path=None):
+        self.Cells = bytearray(81)
+        self.Masks = array("H",[0]*27)
+        self.Steps = array("H")
+        self.BlankSpaces = 81
+        self.Path = path
+        self.SolutionPath = path
+        if path is None:
+            return
+        if self.SolutionPath[len(self.SolutionPath) - 4:len(self.SolutionPath)] == ".txt":
+            self.SolutionPath = self.SolutionPath[0:len(self.SolutionPath) - 4]
+        InfoFile = open(path,"r")
+        for i in range(9):
+            linea = InfoFile.readline()
+            for j in range(9):
+                if linea[2 * j] in Bits:
+                    self.setCell(9 * i + j,int(linea[2 * j]))
+        InfoFile.close()
+
+    # Devuelve una copia de si mismo
+    def copy(self):
+        Copy = CompactBoard()
+        Copy.Cells[:] = self.Cells
+        Copy.Masks = array("H",self.Masks)
+        Copy.Steps = array("H",self.Steps)
+        Copy.BlankSpaces = self.BlankSpaces
+        Copy.Path = self.Path
+        Copy.SolutionPath = self.SolutionPath
+        return Copy
+
+    # Carga un Sudoku escrito como una cadena de 81 caracteres (fila por fila).
+    # Cualquier caracter que no sea un nmero del 1 al 9 es una casilla vacia
+    def fromString(self,text):
+        for i in range(81):
+            if text[i] in Bits:
+                self.setCell(i,int(text[i]))
+        return self
+
+    # Devuelve el tablero como una cadena de 81 caracteres, con "*" en las
+    # casillas vacias
+    def toString(self):
+        return "".join([str(v) if v != 0 else "*" for v in self.Cells])
+
+    # Carga el contenido de un Board (celdas y pasos registrados)
+    def fromBoard(self,board):
+        self.Path = board.Path
+        self.SolutionPath = board.SolutionPath
+        for i in range(9):
+            for j in range(9):
+                if board.Original[i][j] in Bits:
+                    self.setCell(9 * i + j,int(board.Original[i][j]))
+        for i in range(board.Top + 1):
+            self.placeValue(9 * board.Stack[i][0] + board.Stack[i][1],board.Stack[i][2],board.Stack[i][3])
+        return self
+
+    # Devuelve un Board equivalente, con el que se puede imprimir la solucin
+    def toBoard(self):
+        Copy = Board()
+        Copy.Path = self.Path
+        Copy.SolutionPath = self.SolutionPath
+        Solved = [0]*81
+        for Step in self.Steps:
+            Solved[Step >> 7] = 1
+        for i in range(81):
+            if self.Cells[i] != 0:
+                Copy.setValueAt(CellRow[i],CellColumn[i],str(self.Cells[i]))
+                if Solved[i] == 0:
+                    Copy.Original[CellRow[i]][CellColumn[i]] = str(self.Cells[i])
+        for Step in self.Steps:
+            Copy.inputStackValue(CellRow[Step >> 7],CellColumn[Step >> 7],Step & 15,(Step >> 4) & 7)
+        Copy.BlankSpaces = self.BlankSpaces
+        return Copy
+
+    # Devuelve la traza compacta de la solucin, en el mismo formato de
+    # Board.getTrace
+    def getTrace(self):
+        Original = self.Cells[:]
+        for Step in self.Steps:
+            Original[Step >> 7] = 0
+        t = ["".join([str(v) if v != 0 else "*" for v in Original]) + "\n"]
+        for Step in self.Steps:
+            t.append(Letters[CellRow[Step >> 7]] + str(CellColumn[Step >> 7] + 1) + " " + str(Step & 15) + " " + PhaseNames[(Step >> 4) & 7] + "\n")
+        return "".join(t)
+
+    # Retorna el nmero indicado por la fila y columna ingresadas (0 si la
+    # casilla est vacia)
+    def getValueAt(self,row,column):
+        return self.Cells[9 * row + column]
+
+    # Devuelve la mscara de nmeros que an pueden ir en la celda indicada
+    def getCandidates(self,cell):
+        Masks = self.Masks
+        return 511 & ~(Masks[CellRow[cell]] | Masks[9 + CellColumn[cell]] | Masks[18 + CellQuadrant[cell]])
+
+    # Pregunta si el nmero ingresado se encuentra en la unidad indicada
+    def isElementInUnit(self,unit,value):
+        if self.Masks[unit] & (1 << (value - 1)):
+            return 1
+        return 0
+
+    # Indica si el Sudoku est solucionado
+    def isSolved(self):
+        if self.BlankSpaces == 0:
+            return 1
+        return 0
+
+    # Indica si el tablero no tiene nmeros repetidos en ninguna unidad. Cada
+    # celda llena aporta un bit a tres mscaras, salvo que el nmero ya
+    # estuviera en alguna de sus unidades
+    def isValid(self):
+        total = 0
+        for Mask in self.Masks:
+            total = total + BitCount[Mask]
+        if total == 3 * (81 - self.BlankSpaces):
+            return 1
+        return 0
+
+    # Ingresa un valor en la celda indicada, actualizando las mscaras
+    def setCell(self,cell,value):
+        bit = 1 << (value - 1)
+        Masks = self.Masks
+        self.Cells[cell] = value
+        Masks[CellRow[cell]] = Masks[CellRow[cell]] | bit
+        Masks[9 + CellColumn[cell]] = Masks[9 + CellColumn[cell]] | bit
+        Masks[18 + CellQuadrant[cell]] = Masks[18 + CellQuadrant[cell]] | bit
+        self.BlankSpaces = self.BlankSpaces - 1
+
+    # Ingresa un valor en la celda indicada y lo registra como paso de la
+    # solucin, junto con la fase que lo ubic
+    def placeValue(self,cell,value,phase=0):
+        self.setCell(cell,value)
+        self.Steps.append(cell * 128 + phase * 16 + value)
+
+
+
+class CompactAgent(object):
+
+    __slots__ = ("Enviroment",)
+
+    # Constructor de la clase. Recibe por parmetro el CompactBoard a resolver.
+    def __init__(self,board):
+        self.Enviroment = board
+
+    # Fase I: proyeccin sobre cuadrantes. Retorna 1 si ubic algn nmero
+    def projectQuadrants(self):
+        Cells = self.Enviroment.Cells
+        Masks = self.Enviroment.Masks
+        placed = 0
+        for q in range(9):
+            for d in range(1,10):
+                bit = 1 << (d - 1)
+                if Masks[18 + q] & bit == 0:
+                    found = -1
+                    count = 0
+                    for cell in QuadrantCells[q]:
+                        if Cells[cell] == 0 and (Masks[CellRow[cell]] | Masks[9 + CellColumn[cell]]) & bit == 0:
+                            if count == 0:
+                                found = cell
+                            count = count + 1
+                    if count == 1:
+                        self.Enviroment.placeValue(found,d,1)
+                        placed = 1
+        return placed
+
+    # Fase II-A: proyeccin sobre filas. Retorna 1 si ubic algn nmero
+    def projectRows(self):
+        Cells = self.Enviroment.Cells
+        Masks = self.Enviroment.Masks
+        placed = 0
+        for r in range(9):
+            for d in range(1,10):
+                bit = 1 << (d - 1)
+                if Masks[r] & bit == 0:
+                    found = -1
+                    count = 0
+                    for cell in range(9 * r,9 * r + 9):
+                        if Cells[cell] == 0 and (Masks[9 + CellColumn[cell]] | Masks[18 + CellQuadrant[cell]]) & bit == 0:
+                            if count == 0:
+                                found = cell
+                            count = count + 1
+                    if count == 1:
+                        self.Enviroment.placeValue(found,d,2)
+                        placed = 1
+        return placed
+
+    # Fase II-B: proyeccin sobre columnas. Retorna 1 si ubic algn nmero
+    def projectColumns(self):
+        Cells = self.Enviroment.Cells
+        Masks = self.Enviroment.Masks
+        placed = 0
+        for c in range(9):
+            for d in range(1,10):
+                bit = 1 << (d - 1)
+                if Masks[9 + c] & bit == 0:
+                    found = -1
+                    count = 0
+                    for cell in range(c,81,9):
+                        if Cells[cell] == 0 and (Masks[CellRow[cell]] | Masks[18 + CellQuadrant[cell]]) & bit == 0:
+                            if count == 0:
+                                found = cell
+                            count = count + 1
+                    if count == 1:
+                        self.Enviroment.placeValue(found,d,3)
+                        placed = 1
+        return placed
+
+    # Fase III: proyeccin expansiva. Como en Agent, los candidatos de todo el
+    # cuadrante se calculan antes de ubicar sus celdas con un solo candidato,
+    # por lo que no se ubica dos veces el mismo nmero en el cuadrante (lo cual
+    # solo ocurre en un tablero sin solucin). Retorna 1 si ubic algn nmero
+    def expandQuadrants(self):
+        Cells = self.Enviroment.Cells
+        placed = 0
+        for q in range(9):
+            Singles = []
+            Written = 0
+            for cell in QuadrantCells[q]:
+                if Cells[cell] == 0:
+                    Candidates = self.Enviroment.getCandidates(cell)
+                    if BitCount[Candidates] == 1 and Candidates & Written == 0:
+                        Singles.append([cell,BitDigits[Candidates][0]])
+                        Written = Written | Candidates
+            for Single in Singles:
+                self.Enviroment.placeValue(Single[0],Single[1],4)
+                placed = 1
+        return placed
+
+    # Fase IV: busca la celda vacia con la menor cantidad de candidatos.
+    # Retorna [celda, mscara de candidatos] o None si no hay celdas vacias. Una
+    # mscara en 0 indica que el tablero no tiene solucin
+    def findMinimumMultiplicity(self):
+        Cells = self.Enviroment.Cells
+        best = 10
+        Choice = None
+        for q in range(9):
+            for cell in QuadrantCells[q]:
+                if Cells[cell] == 0:
+                    Candidates = self.Enviroment.getCandidates(cell)
+                    if BitCount[Candidates] < best:
+                        best = BitCount[Candidates]
+                        Choice = [cell,Candidates]
+                        if best == 0:
+                            return Choice
+        return Choice
\ No newline at end of file
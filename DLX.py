@@ -0,0 +1,186 @@
+# -*- coding: cp1252 -*-
+# Solucin de Sudokus como un problema de cobertura exacta
+#
+# Un Sudoku de 9 x 9 es un problema de cobertura exacta con 324 restricciones
+# (columnas): cada celda tiene un nmero, y cada fila, columna y cuadrante
+# tiene cada nmero una sola vez. Cada posibilidad "nmero d en la celda (f, c)"
+# es una fila que cubre exactamente cuatro restricciones. Resolver el Sudoku es
+# escoger 81 filas que cubran cada restriccin una sola vez.
+#
+# La bsqueda usa el Algoritmo X de Knuth con enlaces danzantes (Dancing
+# Links): la matriz se guarda como listas doblemente enlazadas en arreglos
+# (L, R, U, D), de modo que tapar y destapar una columna son operaciones que no
+# crean ni destruyen objetos. En cada paso se escoge la columna con menos
+# filas, lo cual equivale a la multiplicidad mnima de la fase IV, pero
+# aplicada tambin sobre filas, columnas y cuadrantes.
+#
+# Las restricciones que ya cumplen los nmeros del Sudoku original no se
+# incluyen en la matriz, ni las filas que contradicen a dichos nmeros.
+#
+
+from Classes import *
+
+
+class ExactCover(object):
+
+    # Constructor de la clase. Recibe las 81 celdas del Sudoku (fila por fila,
+    # 0 es una casilla vacia) y arma la matriz de cobertura.
+    def __init__(self,Cells):
+        self.Nodes = 0
+        self.Backtracks = 0
+        self.Solution = []
+        self.Valid = 1
+        Masks = [0]*27
+        for cell in range(81):
+            if Cells[cell] != 0:
+                bit = 1 << (Cells[cell] - 1)
+                for unit in [CellRow[cell],9 + CellColumn[cell],18 + CellQuadrant[cell]]:
+                    if Masks[unit] & bit:
+                        self.Valid = 0
+                    Masks[unit] = Masks[unit] | bit
+        # Nodo 0: raz. Se crea un encabezado por cada restriccin sin cumplir:
+        # celda vacia (0-80), nmero en fila (81-161), en columna (162-242) y en
+        # cuadrante (243-323).
+        self.L = [0]
+        self.R = [0]
+        self.U = [0]
+        self.D = [0]
+        self.C = [0]
+        self.S = [0]
+        self.Row = [None]
+        Header = [0]*324
+        for constraint in range(324):
+            if constraint < 81:
+                satisfied = Cells[constraint] != 0
+            else:
+                satisfied = Masks[(constraint - 81) // 9] & (1 << (constraint % 9))
+            if not satisfied:
+                Header[constraint] = self.addNode(constraint,None)
+        for cell in range(81):
+            if Cells[cell] == 0:
+                row = CellRow[cell]
+                column = CellColumn[cell]
+                quadrant = CellQuadrant[cell]
+                Candidates = 511 & ~(Masks[row] | Masks[9 + column] | Masks[18 + quadrant])
+                for value in BitDigits[Candidates]:
+                    self.addRow([cell,value],[Header[cell],Header[81 + 9 * row + value - 1],Header[162 + 9 * column + value - 1],Header[243 + 9 * quadrant + value - 1]])
+
+    # Agrega un nodo nuevo. Si column es None, el nodo es un encabezado y se
+    # enlaza a la derecha de los dems encabezados; si no, se enlaza al final
+    # de la columna indicada.
+    def addNode(self,column,Row):
+        node = len(self.L)
+        self.Row.append(Row)
+        self.S.append(0)
+        if Row is None:
+            self.C.append(node)
+            self.U.append(node)
+            self.D.append(node)
+            self.L.append(self.L[0])
+            self.R.append(0)
+            self.R[self.L[0]] = node
+            self.L[0] = node
+        else:
+            self.C.append(column)
+            self.U.append(self.U[column])
+            self.D.append(column)
+            self.D[self.U[column]] = node
+            self.U[column] = node
+            self.S[column] = self.S[column] + 1
+            self.L.append(node)
+            self.R.append(node)
+        return node
+
+    # Agrega una fila con un nodo en cada una de las columnas indicadas
+    def addRow(self,Row,Columns):
+        first = -1
+        for column in Columns:
+            node = self.addNode(column,Row)
+            if first == -1:
+                first = node
+            else:
+                self.L[node] = self.L[first]
+                self.R[node] = first
+                self.R[self.L[first]] = node
+                self.L[first] = node
+
+    # Tapa la columna indicada y todas las filas que la cubren
+    def cover(self,column):
+        L = self.L
+        R = self.R
+        U = self.U
+        D = self.D
+        R[L[column]] = R[column]
+        L[R[column]] = L[column]
+        i = D[column]
+        while i != column:
+            j = R[i]
+            while j != i:
+                D[U[j]] = D[j]
+                U[D[j]] = U[j]
+                self.S[self.C[j]] = self.S[self.C[j]] - 1
+                j = R[j]
+            i = D[i]
+
+    # Destapa la columna indicada, en el orden inverso a cover
+    def uncover(self,column):
+        L = self.L
+        R = self.R
+        U = self.U
+        D = self.D
+        i = U[column]
+        while i != column:
+            j = L[i]
+            while j != i:
+                self.S[self.C[j]] = self.S[self.C[j]] + 1
+                D[U[j]] = j
+                U[D[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[column]] = column
+        L[R[column]] = column
+
+    # Algoritmo X. Retorna 1 si encontr una cobertura (queda en Solution)
+    def search(self):
+        R = self.R
+        if R[0] == 0:
+            return 1
+        column = R[0]
+        best = self.S[column]
+        j = R[column]
+        while j != 0 and best > 1:
+            if self.S[j] < best:
+                column = j
+                best = self.S[j]
+            j = R[j]
+        if best == 0:
+            self.Backtracks = self.Backtracks + 1
+            return 0
+        self.cover(column)
+        r = self.D[column]
+        while r != column:
+            self.Nodes = self.Nodes + 1
+            self.Solution.append(self.Row[r])
+            j = R[r]
+            while j != r:
+                self.cover(self.C[j])
+                j = R[j]
+            if self.search() == 1:
+                return 1
+            j = self.L[r]
+            while j != r:
+                self.uncover(self.C[j])
+                j = self.L[j]
+            self.Solution.pop()
+            r = self.D[r]
+        self.uncover(column)
+        return 0
+
+    # Resuelve el Sudoku. Devuelve la lista de pasos [celda, nmero] en el
+    # orden en que fueron escogidos, o None si el Sudoku no tiene solucin
+    def solve(self):
+        if self.Valid == 0:
+            return None
+        if self.search() == 1:
+            return self.Solution
+        return None
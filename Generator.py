@@ -0,0 +1,221 @@
+# -*- coding: cp1252 -*-
+# Generador de Sudokus con solucin nica
+#
+# Cada Sudoku se genera a partir de un tablero lleno al azar: se llenan los
+# cuadrantes de la diagonal (1, 5 y 9) con permutaciones al azar, que no se
+# afectan entre s, y el resto se completa con DepthFirstSearch. Luego se
+# quitan nmeros en orden aleatorio (opcionalmente por pares simtricos
+# respecto al centro), y cada nmero quitado se vuelve a poner si el Sudoku
+# deja de tener solucin nica.
+#
+# La revisin de unicidad es incremental: como el Sudoku antes de quitar la
+# casilla tena solucin nica, cualquier otra solucin tiene que diferir en
+# la casilla quitada. Basta entonces con probar cada uno de los otros
+# candidatos de esa casilla y buscar una solucin; si ninguno tiene solucin,
+# el Sudoku sigue siendo nico. Estas bsquedas suelen terminar en una
+# contradiccin despus de pocas suposiciones.
+#
+# La dificultad se califica segn las fases que se necesitan para resolverlo:
+#   "I-II": basta con las proyecciones sobre cuadrantes, filas y columnas.
+#   "III":  se necesita adems la proyeccin expansiva.
+#   "IV":   se necesita suponer; se informa la cantidad de alternativas que
+#           prob la bsqueda (DepthFirstSearch).
+#
+# Los Sudokus se escriben en el formato de Board, cada uno precedido por una
+# lnea de comentario con su calificacin, por lo que el archivo se puede
+# usar directamente con Batch.py y Bench.py; con -d cada Sudoku se escribe
+# adems en su propio archivo, que se puede abrir con el programa principal.
+#
+# Uso:
+#   python Generator.py [-n 100] [-o Generados.txt] [-g I-II|III|IV] [-s semilla]
+#                       [-p procesos] [--symmetric] [--lines] [-d directorio]
+# Con la misma semilla se generan los mismos Sudokus, con cualquier cantidad
+# de procesos.
+#
+
+import argparse
+import functools
+import itertools
+import multiprocessing
+import os
+import random
+import time
+
+from Classes import *
+from Search import DepthFirstSearch
+
+# Calificaciones de dificultad, de menor a mayor
+Ratings = ["I-II","III","IV"]
+
+
+# Genera un tablero lleno al azar. Devuelve la cadena de 81 caracteres
+def randomGrid(Random):
+    Sudoku = CompactBoard()
+    for q in [0,4,8]:
+        Digits = range(1,10)
+        Random.shuffle(Digits)
+        for i in range(9):
+            Sudoku.setCell(QuadrantCells[q][i],Digits[i])
+    return DepthFirstSearch(Sudoku).solve().toString()
+
+
+# Indica si el Sudoku (cadena de 81 caracteres) tiene alguna solucin en la
+# que la casilla indicada no tenga el nmero value. Retorna 1 si la tiene
+def hasOtherSolution(Puzzle,cell,value):
+    Sudoku = CompactBoard().fromString(Puzzle)
+    Candidates = Sudoku.getCandidates(cell) & ~(1 << (value - 1))
+    while Candidates != 0:
+        bit = Candidates & -Candidates
+        Candidates = Candidates & ~bit
+        Copy = Sudoku.copy()
+        Copy.placeValue(cell,BitDigits[bit][0])
+        if DepthFirstSearch(Copy).solve() is not None:
+            return 1
+    return 0
+
+
+# Quita nmeros de la solucin mientras el Sudoku conserve solucin nica.
+# Si symmetric es 1, las casillas se quitan por pares simtricos respecto al
+# centro. No se quitan ms nmeros si quedan minimum. Devuelve el Sudoku con
+# "*" en las casillas vacias
+def removeGivens(Solution,Random,symmetric=0,minimum=17):
+    Puzzle = list(Solution)
+    Cells = range(81)
+    Random.shuffle(Cells)
+    givens = 81
+    for cell in Cells:
+        if Puzzle[cell] == "*":
+            continue
+        Removed = [cell]
+        if symmetric == 1 and 80 - cell != cell:
+            Removed.append(80 - cell)
+        if givens - len(Removed) < minimum:
+            continue
+        for i in Removed:
+            Puzzle[i] = "*"
+        unique = 1
+        for i in Removed:
+            if hasOtherSolution("".join(Puzzle),i,int(Solution[i])) == 1:
+                unique = 0
+                break
+        if unique == 1:
+            givens = givens - len(Removed)
+        else:
+            for i in Removed:
+                Puzzle[i] = Solution[i]
+    return "".join(Puzzle)
+
+
+# Califica la dificultad del Sudoku segn las fases que necesita. Devuelve
+# [calificacin, alternativas probadas en la fase IV]
+def ratePuzzle(Puzzle):
+    Sudoku = CompactBoard().fromString(Puzzle)
+    Solver = CompactAgent(Sudoku)
+    loop = 1
+    while loop == 1 and Sudoku.isSolved() == 0:
+        loop = Solver.projectQuadrants()
+        if Solver.projectRows() == 1:
+            loop = 1
+        if Solver.projectColumns() == 1:
+            loop = 1
+    if Sudoku.isSolved() == 1:
+        return ["I-II",0]
+    loop = 1
+    while loop == 1 and Sudoku.isSolved() == 0:
+        loop = Solver.expandQuadrants()
+        if Solver.projectQuadrants() == 1:
+            loop = 1
+        if Solver.projectRows() == 1:
+            loop = 1
+        if Solver.projectColumns() == 1:
+            loop = 1
+    if Sudoku.isSolved() == 1:
+        return ["III",0]
+    Search = DepthFirstSearch(CompactBoard().fromString(Puzzle))
+    Search.solve()
+    return ["IV",Search.Nodes - 1]
+
+
+# Genera el Sudoku nmero index de la serie indicada por seed. Cada Sudoku
+# tiene su propio generador de nmeros aleatorios, por lo que la serie es la
+# misma sin importar en qu proceso se genere cada uno. Si se indica rating,
+# se generan Sudokus hasta obtener uno de esa calificacin. Devuelve
+# [Sudoku, calificacin, alternativas]
+def generatePuzzle(index,seed=0,rating=None,symmetric=0):
+    Random = random.Random(seed * 1000003 + index)
+    while True:
+        Puzzle = removeGivens(randomGrid(Random),Random,symmetric)
+        Rating = ratePuzzle(Puzzle)
+        if rating is None or Rating[0] == rating:
+            return [Puzzle,Rating[0],Rating[1]]
+
+
+# Genera count Sudokus con solucin nica (indefinidamente si count es None)
+# y los devuelve uno a uno, en orden. Con ms de un proceso, los Sudokus se
+# reparten en un grupo de procesos
+def generatePuzzles(count=None,seed=0,rating=None,symmetric=0,processes=1):
+    Generator = functools.partial(generatePuzzle,seed=seed,rating=rating,symmetric=symmetric)
+    if count is None:
+        Indexes = itertools.count()
+    else:
+        Indexes = xrange(count)
+    if processes == 1:
+        for index in Indexes:
+            yield Generator(index)
+        return
+    Pool = multiprocessing.Pool(processes)
+    try:
+        for Result in Pool.imap(Generator,Indexes,4):
+            yield Result
+        Pool.close()
+    finally:
+        Pool.terminate()
+        Pool.join()
+
+
+# Escribe el Sudoku (cadena de 81 caracteres) en el formato de Board
+def formatBoard(Puzzle):
+    return "".join([",".join(Puzzle[9 * i:9 * i + 9]) + ";\n" for i in range(9)])
+
+
+if __name__ == "__main__":
+    Parser = argparse.ArgumentParser(description="Generador de Sudokus con solucion unica")
+    Parser.add_argument("-n","--count",type=int,default=100,help="cantidad de Sudokus")
+    Parser.add_argument("-o","--output",default="Generated.txt",help="archivo donde se escriben los Sudokus")
+    Parser.add_argument("-g","--rating",choices=Ratings,help="genera solo Sudokus de esta calificacion")
+    Parser.add_argument("-s","--seed",type=int,default=None,help="semilla de la serie de Sudokus (por defecto, al azar)")
+    Parser.add_argument("-p","--processes",type=int,default=1,help="cantidad de procesos")
+    Parser.add_argument("--symmetric",action="store_true",help="quita los numeros por pares simetricos")
+    Parser.add_argument("--lines",action="store_true",help="escribe cada Sudoku en una linea de 81 caracteres")
+    Parser.add_argument("-d","--directory",help="escribe ademas cada Sudoku en su propio archivo en este directorio")
+    Arguments = Parser.parse_args()
+
+    seed = Arguments.seed
+    if seed is None:
+        seed = random.randrange(1000000)
+    symmetric = 0
+    if Arguments.symmetric:
+        symmetric = 1
+    Counts = {}
+    for Name in Ratings:
+        Counts[Name] = 0
+    start = time.time()
+    InfoFile = open(Arguments.output,"w")
+    i = 0
+    for Result in generatePuzzles(Arguments.count,seed,Arguments.rating,symmetric,Arguments.processes):
+        Counts[Result[1]] = Counts[Result[1]] + 1
+        InfoFile.write("# " + Result[1] + " " + str(Result[2]) + "\n")
+        if Arguments.lines:
+            InfoFile.write(Result[0] + "\n")
+        else:
+            InfoFile.write(formatBoard(Result[0]))
+        if Arguments.directory is not None:
+            PuzzleFile = open(os.path.join(Arguments.directory,"sudoku%04d.txt" % i),"w")
+            PuzzleFile.write(formatBoard(Result[0]))
+            PuzzleFile.close()
+        i = i + 1
+    InfoFile.close()
+    elapsed = time.time() - start
+    print "Sudokus generados: " + str(i) + " (" + ", ".join([Name + ": " + str(Counts[Name]) for Name in Ratings]) + ")"
+    print "Tiempo: %.3f s (%.1f Sudokus/s)" % (elapsed,i / max(elapsed,1e-9))
+    print "Los Sudokus estan registrados en el archivo " + Arguments.output
@@ -0,0 +1,87 @@
+# -*- coding: cp1252 -*-
+# Lmites de tiempo y de tableros para la solucin por fases
+#
+# solveBoard no termina hasta resolver el Sudoku o agotar las alternativas
+# pendientes de la fase IV, lo cual en un Sudoku patolgico (por ejemplo, uno de
+# 25 x 25 con pocos nmeros) puede tardar mucho. SolveLimits indica una hora
+# lmite (deadline, en segundos de time.time()) y/o una cantidad mxima de
+# tableros a examinar (maxNodes, contando el tablero inicial y cada
+# alternativa probada). solveBoard revisa los lmites en cada pasada, y si se
+# supera alguno se detiene y deja en SolveLimits el tablero con el que iba y
+# la cantidad de alternativas que quedaron pendientes.
+#
+# SolveResult es el resultado de Main.solveLimited: el estado ("solved",
+# "unsolvable" o "timeout"), el tablero (la solucin, o el tablero parcial si
+# se super un lmite), los pasos registrados hasta el momento (la pila de
+# Board, como [fila, columna, nmero, fase]) y las estadsticas de la
+# bsqueda (SolveStats).
+#
+# Uso:
+#   Result = solveLimited(Sudoku,time.time() + 0.5,10000)
+#   if Result.Status == "timeout": ...
+#
+
+import time
+
+from Classes import PhaseNames
+
+
+class SolveLimits(object):
+
+    # Constructor de la clase. deadline es la hora lmite (time.time()) y
+    # maxNodes la cantidad mxima de tableros a examinar; None es sin lmite
+    def __init__(self,deadline=None,maxNodes=None):
+        self.Deadline = deadline
+        self.MaxNodes = maxNodes
+        self.Nodes = 0
+        self.Reason = None
+        self.Board = None
+        self.Pending = 0
+
+    # Registra que se tom un tablero o una alternativa pendiente
+    def countNode(self):
+        self.Nodes = self.Nodes + 1
+
+    # Revisa los lmites; el de tableros solo si se va a tomar otro tablero
+    # (branch es 1). Si se super alguno guarda el motivo ("nodes" o
+    # "deadline") y retorna 1; si no, retorna 0
+    def isExceeded(self,branch=0):
+        if branch == 1 and self.MaxNodes is not None and self.Nodes >= self.MaxNodes:
+            self.Reason = "nodes"
+        elif self.Deadline is not None and time.time() >= self.Deadline:
+            self.Reason = "deadline"
+        else:
+            return 0
+        return 1
+
+    # Guarda el tablero con el que se detuvo la bsqueda y la cantidad de
+    # alternativas pendientes
+    def stop(self,Sudoku,pending):
+        self.Board = Sudoku
+        self.Pending = pending
+
+
+class SolveResult(object):
+
+    # Constructor de la clase. Status es "solved", "unsolvable" o "timeout";
+    # Sudoku es la solucin o el tablero parcial (None si no tiene solucin)
+    def __init__(self,Status,Sudoku,Stats,Limits):
+        self.Status = Status
+        self.Board = Sudoku
+        self.Stats = Stats
+        self.Reason = Limits.Reason
+        self.Nodes = Limits.Nodes
+        self.Pending = Limits.Pending
+        self.Steps = []
+        if Sudoku is not None:
+            self.Steps = [Step[:] for Step in Sudoku.Stack[0:Sudoku.Top + 1]]
+
+    # Devuelve el resultado como un diccionario, listo para escribirse en
+    # formato JSON. Las fases de los pasos van con su nombre (PhaseNames)
+    def toDict(self):
+        Result = {"status": self.Status,"reason": self.Reason,"nodes": self.Nodes,"pending": self.Pending,
+                  "board": None,"steps": [[Step[0],Step[1],Step[2],PhaseNames[Step[3]]] for Step in self.Steps],
+                  "stats": self.Stats.toDict()}
+        if self.Board is not None:
+            Result["board"] = self.Board.toString()
+        return Result
@@ -149,152 +149,682 @@
 #
 
 
-from Classes import *
+import argparse
+import sys
+import time
 
-FileName = raw_input("Ingrese la direccion del archivo: ")
-Sudokus = [Board(FileName)]
-loop = 1
-clear = 0
-swIV = 1
-Solve = 0
-print "Calculando, por favor espere..."
+from Classes import *
+from Search import DepthFirstSearch
+from DLX import ExactCover
+from Stats import SolveStats
+from Limits import SolveLimits, SolveResult
+from Techniques import eliminateCandidates, parseTechniques
 
-while loop == 1 and clear == 0:
+# Aplica una vez las fases I, II-A, II-B y III sobre el Sudoku (Board), con el
+# agente indicado, y la fase III-B si se ingresan Techniques y las anteriores
+# no ubicaron nada. Es un generador: devuelve 1 cada vez que se aplica sobre
+# el tablero un cuadrante, fila o columna en la que se ubic algn nmero, o
+# cuando las tcnicas quitan candidatos, de modo que quien lo recorre puede
+# ver cada nmero en cuanto se registra en la pila del tablero.
+# Solo se examinan las unidades y los nmeros marcados en la lista de trabajo
+# del tablero (Board.Dirty y Board.DirtySingles), que se borran al examinar;
+# lo que no est marcado no cambi desde la ltima vez y no ubicara nada, por
+# lo que los nmeros se ubican en el mismo orden que recorriendo todo el
+# tablero. Stats cuenta las examinaciones hechas y las de un barrido completo
+def iterPhases(Sudoku,Solver,Stats=None,Techniques=None):
+    size = Sudoku.Size
+    Geometry = Sudoku.Geometry
+    Digits = Geometry.Digits
+    Bits = Sudoku.Bits
+    Dirty = Sudoku.Dirty
+    examined = 0
+    sweep = 0
     loop = 0
-    if swIV == 1:
-        if len(Sudokus) == 0:
-            loop = 0
-            clear = 1
-            Solve = 0
-        else:
-            Sudoku = Sudokus.pop()
-            print Sudoku
-            Solver = Agent(Sudoku)
-            swIV = 0
     #Fase I: Proyeccion sobre cuadrantes
-    for i in range(9):
+    if Stats is not None:
+        Stats.startPhase(Sudoku)
+    for i in range(size):
+        unit = 2 * size + i
+        if Dirty[unit] == 0:
+            sweep = sweep + size - Geometry.countBits(Sudoku.QuadrantMask[i])
+            continue
         Solver.loadQuadrant(i + 1)
-        for j in range(9):
-            if Solver.isElementInQuadrant(str(j + 1)) == 0:
-                Solver.proyectQuadrant(str(j + 1))
+        for j in range(size):
+            if Solver.isElementInQuadrant(Digits[j]) == 0:
+                sweep = sweep + 1
+                if Dirty[unit] & Bits[Digits[j]] == 0:
+                    continue
+                Dirty[unit] = Dirty[unit] & ~Bits[Digits[j]]
+                examined = examined + 1
+                Solver.proyectQuadrant(Digits[j])
                 if Solver.countQuadrantDash() == 1:
-                    Solver.writeNumberInQuadrant(str(j + 1))
+                    Solver.writeNumberInQuadrant(Digits[j])
+                    Solver.clearQuadrant()
+                    Solver.applyQuadrant()
                     loop = 1
-                Solver.clearQuadrant()
-            Solver.applyQuadrant()
+                    yield 1
+                else:
+                    Solver.clearQuadrant()
+    if Stats is not None:
+        Stats.endPhase("I",Sudoku)
 
 
 
     clear = Sudoku.isSolved()
     if clear == 0:
         #Fase II-A: Proyeccion sobre filas
-        for i in range(9):
+        if Stats is not None:
+            Stats.startPhase(Sudoku)
+        for i in range(size):
+            if Dirty[i] == 0:
+                sweep = sweep + size - Geometry.countBits(Sudoku.RowMask[i])
+                continue
             Solver.loadRow(i)
-            for j in range(9):
-                if Solver.isElementInVector(str(j + 1)) == 0:
-                    Solver.proyectRow(str(j + 1))
+            for j in range(size):
+                if Solver.isElementInVector(Digits[j]) == 0:
+                    sweep = sweep + 1
+                    if Dirty[i] & Bits[Digits[j]] == 0:
+                        continue
+                    Dirty[i] = Dirty[i] & ~Bits[Digits[j]]
+                    examined = examined + 1
+                    Solver.proyectRow(Digits[j])
                     if Solver.countVectorDash() == 1:
-                        Solver.writeNumberInVector(str(j + 1),0)
+                        Solver.writeNumberInVector(Digits[j],0)
+                        Solver.clearVector()
+                        Solver.applyRow()
                         loop = 1
-                    Solver.clearVector()
-                Solver.applyRow()
-    else:
-        Solve = 1
+                        yield 1
+                    else:
+                        Solver.clearVector()
+        if Stats is not None:
+            Stats.endPhase("II-A",Sudoku)
 
 
 
     clear = Sudoku.isSolved()
     if clear == 0:
         #Fase II-B: Proyeccion sobre columnas
-        for i in range(9):
+        if Stats is not None:
+            Stats.startPhase(Sudoku)
+        for i in range(size):
+            unit = size + i
+            if Dirty[unit] == 0:
+                sweep = sweep + size - Geometry.countBits(Sudoku.ColumnMask[i])
+                continue
             Solver.loadColumn(i)
-            for j in range(9):
-                if Solver.isElementInVector(str(j + 1)) == 0:
-                    Solver.proyectColumn(str(j + 1))
+            for j in range(size):
+                if Solver.isElementInVector(Digits[j]) == 0:
+                    sweep = sweep + 1
+                    if Dirty[unit] & Bits[Digits[j]] == 0:
+                        continue
+                    Dirty[unit] = Dirty[unit] & ~Bits[Digits[j]]
+                    examined = examined + 1
+                    Solver.proyectColumn(Digits[j])
                     if Solver.countVectorDash() == 1:
-                        Solver.writeNumberInVector(str(j + 1),1)
+                        Solver.writeNumberInVector(Digits[j],1)
+                        Solver.clearVector()
+                        Solver.applyColumn()
                         loop = 1
-                    Solver.clearVector()
-                Solver.applyColumn()
-    else:
-        Solve = 1
+                        yield 1
+                    else:
+                        Solver.clearVector()
+        if Stats is not None:
+            Stats.endPhase("II-B",Sudoku)
 
 
 
     clear = Sudoku.isSolved()
     if clear == 0:
         #Fase III: Proyeccion expansiva
-        for i in range(9):
+        if Stats is not None:
+            Stats.startPhase(Sudoku)
+        for i in range(size):
+            sweep = sweep + 1
+            if Sudoku.DirtySingles[i] == 0:
+                continue
+            Sudoku.DirtySingles[i] = 0
+            examined = examined + 1
             Solver.loadQuadrant(i + 1)
-            for j in range(9):
-                if Solver.isElementInQuadrant(str(j + 1)) == 0:
-                    Solver.expand(str(j + 1))
-            for j in range(3):
-                for k in range(3):
-                    if len(Solver.getQuadrantValueAt(j,k)) == 2:
-                        Solver.setQuadrantValueAt(j,k,Solver.getQuadrantValueAt(j,k)[1])
-                        loop = 1
-            Solver.clearQuadrant()
-            Solver.applyQuadrant()
-    else:
-        Solve = 1
+            if Solver.writeSinglesInQuadrant() == 1:
+                Solver.applyQuadrant()
+                loop = 1
+                yield 1
+            else:
+                Solver.applyQuadrant()
+        if Stats is not None:
+            Stats.endPhase("III",Sudoku)
+    if Stats is not None:
+        Stats.Examined = Stats.Examined + examined
+        Stats.SweepExaminations = Stats.SweepExaminations + sweep
 
 
 
     clear = Sudoku.isSolved()
-    if loop == 0 and clear == 0:
-        #Fase IV: Multiplicidad minima por supocision
+    if loop == 0 and clear == 0 and Techniques is not None:
+        #Fase III-B: Eliminacion de candidatos
+        if Stats is not None:
+            Stats.startPhase(Sudoku)
+        if eliminateCandidates(Sudoku,Techniques,Stats) > 0:
+            loop = 1
+        if Stats is not None:
+            Stats.endPhase("III-B",Sudoku)
+        if loop == 1:
+            yield 1
+
+
+# Aplica una vez las fases con iterPhases (ver sus parmetros). Retorna 1 si se
+# ubic algn nmero o se quit algn candidato, es decir, si vale la pena
+# volver a aplicarlas
+def applyPhases(Sudoku,Solver,Stats=None,Techniques=None):
+    loop = 0
+    for changed in iterPhases(Sudoku,Solver,Stats,Techniques):
         loop = 1
-        swIV = 1
-        row = 0
-        column = 0
-        cant = 9
-        for i in range(9):
-            Solver.loadQuadrant(i + 1)
-            for j in range(9):
-                if Solver.isElementInQuadrant(str(j + 1)) == 0:
-                    Solver.expand(str(j + 1))
-            for j in range(3):
-                for k in range(3):
-                    if len(Solver.getQuadrantValueAt(j,k)) > 2 and len(Solver.getQuadrantValueAt(j,k)) < cant:
-                        serie = Solver.getQuadrantValueAt(j,k)
-                        cant = len(serie)
-                        row = j
-                        column = k
-                        if i == 1:
-                            column = column + 3
-                        elif i == 2:
-                            column = column + 6
-                        elif i == 3:
-                            row = row + 3
-                        elif i == 4:
-                            row = row + 3
-                            column = column + 3
-                        elif i == 5:
-                            row = row + 3
-                            column = column + 6
-                        elif i == 6:
-                            row = row + 6
-                        elif i == 7:
-                            row = row + 6
-                            column = column + 3
-                        elif i == 8:
-                            row = row + 6
-                            column = column + 6
-        if cant < 9:
-            i = 1
-            while i < cant:
-                Copia = Sudoku.copy()
-                Copia.setValueAt(row,column,serie[i])
-                Copia.inputStackValue(row,column,int(serie[i]))
-                Sudokus.append(Copia)
-                i = i + 1
-
-if Solve == 0:
-    print "El Sudoku ingresado no tiene solucion."
-else:
-    Sudoku.printMatrix()
-    Sudoku.printSolution()
-    cadena = "La solucion paso a paso esta registrada en el archivo "
-    cadena = cadena + FileName[0:len(FileName) - 4] + "Solution.txt"
-    print cadena
+    return loop
+
+
+# Escoge la celda sobre la cual suponer en la fase IV: la primera (recorriendo
+# los cuadrantes en orden) con menos candidatos. Devuelve [fila, columna,
+# candidatos de menor a mayor], o None si no hay sobre qu suponer (el tablero
+# no tiene solucin por este camino)
+def chooseBranch(Sudoku):
+    size = Sudoku.Size
+    Geometry = Sudoku.Geometry
+    cell = 0
+    cant = size + 1
+    i = 0
+    while i < size:
+        for k in Geometry.QuadrantCells[i]:
+            count = Geometry.countBits(Sudoku.Candidates[k])
+            if count > 1 and count < cant:
+                cant = count
+                cell = k
+            elif count == 0 and Sudoku.Matrix[Geometry.CellRow[k]][Geometry.CellColumn[k]] == "*":
+                # Una casilla vacia sin candidatos: el tablero no
+                # tiene solucion por este camino
+                cant = size + 1
+                i = size
+                break
+        i = i + 1
+    if cant > size:
+        return None
+    return [Geometry.CellRow[cell],Geometry.CellColumn[cell],Geometry.getDigits(Sudoku.Candidates[cell])]
+
+
+# Resuelve el Sudoku ingresado (Board) siguiendo las cuatro fases. Es un
+# generador: cada vez que las fases aplican un cuadrante, fila o columna con
+# nmeros nuevos (ver iterPhases), y despus de cada pasada, devuelve el
+# tablero sobre el que se est trabajando (en el que se pueden ver los pasos
+# registrados hasta el momento), y termina cuando el tablero devuelto est
+# resuelto o cuando no quedan alternativas. solveBoard e iterPlacements lo recorren.
+#
+# Si useTrail es 1 (por defecto), la fase IV es una bsqueda en profundidad
+# sobre un solo tablero: la lista Sudokus es una pila explcita de puntos de
+# suposicin, cada uno con la marca del tablero (Board.getMark), la celda
+# supuesta (la de menos candidatos, ver chooseBranch) y los valores que faltan
+# por probar. Para probar el siguiente valor se deshacen las asignaciones hasta
+# la marca (Board.undo), y el punto se quita de la pila al tomar su ltimo
+# valor. Si useTrail es 0 se usa la lista del algoritmo original, con una
+# copia del tablero por cada alternativa.
+#
+# Si se ingresa Stats (SolveStats), en l se registran el tiempo, las pasadas,
+# los nmeros ubicados y los candidatos eliminados por cada fase, junto con
+# las copias, la cantidad mxima de alternativas pendientes, las alternativas
+# probadas (nodos) y los retrocesos de la fase IV. Cada alternativa probada
+# cuenta como un nmero ubicado por la fase IV.
+#
+# Si se ingresa Techniques (lista de nombres, ver Techniques.py), antes de
+# suponer se aplican esas tcnicas de eliminacin de candidatos (fase III-B);
+# si alguna quita candidatos se vuelve a la fase I en lugar de suponer.
+#
+# Si se ingresa Limits (SolveLimits, ver Limits.py), el tablero inicial y cada
+# alternativa tomada de la lista Sudokus cuentan como examinados y antes de
+# cada pasada se revisan los lmites (el de tableros, solo antes de tomar
+# otro); si se supera alguno se termina y en Limits quedan el motivo, el
+# ltimo tablero examinado y la cantidad de alternativas pendientes.
+def iterSolveBoard(Sudoku,useTrail=1,Stats=None,Techniques=None,Limits=None):
+    if useTrail == 1:
+        Sudoku.enableTrail()
+    if Stats is not None:
+        start = time.time()
+        Stats.updateFrontier(1)
+    Root = Sudoku
+    Sudokus = [Sudoku]
+    loop = 1
+    clear = 0
+    swIV = 1
+
+    while loop == 1 and clear == 0:
+        loop = 0
+        if Limits is not None and (swIV == 0 or len(Sudokus) > 0) and Limits.isExceeded(swIV) == 1:
+            Limits.stop(Sudoku,countPending(Sudokus))
+            if Stats is not None:
+                Stats.Time = time.time() - start
+            return
+        if swIV == 1:
+            if len(Sudokus) == 0:
+                if Stats is not None:
+                    Stats.Time = time.time() - start
+                return
+            else:
+                Entry = Sudokus[len(Sudokus) - 1]
+                if Limits is not None:
+                    Limits.countNode()
+                if Stats is not None and Entry is not Root:
+                    Stats.Branches = Stats.Branches + 1
+                    Stats.Phases["IV"]["placed"] = Stats.Phases["IV"]["placed"] + 1
+                if isinstance(Entry,Board):
+                    Sudokus.pop()
+                    Sudoku = Entry
+                    Solver = Agent(Sudoku)
+                else:
+                    #Punto de suposicion: se prueba el siguiente valor
+                    value = Entry[3].pop()
+                    if len(Entry[3]) == 0:
+                        Sudokus.pop()
+                    Sudoku.undo(Entry[0])
+                    Sudoku.setValueAt(Entry[1],Entry[2],value)
+                    Sudoku.inputStackValue(Entry[1],Entry[2],int(value),5)
+                swIV = 0
+        #Fases I a III (y III-B)
+        for changed in iterPhases(Sudoku,Solver,Stats,Techniques):
+            loop = 1
+            yield Sudoku
+
+
+
+        clear = Sudoku.isSolved()
+        yield Sudoku
+        if loop == 0 and clear == 0:
+            #Fase IV: Multiplicidad minima por supocision
+            if Stats is not None:
+                Stats.startPhase(Sudoku)
+            loop = 1
+            swIV = 1
+            Branch = chooseBranch(Sudoku)
+            if Branch is not None and useTrail == 1:
+                # Los valores se toman del final, igual que las copias
+                Sudokus.append([Sudoku.getMark(),Branch[0],Branch[1],Branch[2]])
+            elif Branch is not None:
+                row = Branch[0]
+                column = Branch[1]
+                serie = Branch[2]
+                i = 0
+                while i < len(serie):
+                    Copia = Sudoku.copy()
+                    if Stats is not None:
+                        Stats.Copies = Stats.Copies + 1
+                    Copia.setValueAt(row,column,serie[i])
+                    Copia.inputStackValue(row,column,int(serie[i]),5)
+                    Sudokus.append(Copia)
+                    i = i + 1
+            if Stats is not None:
+                if Branch is None:
+                    Stats.Backtracks = Stats.Backtracks + 1
+                Stats.updateFrontier(countPending(Sudokus))
+                Stats.endPhase("IV",Sudoku)
+
+    if Stats is not None:
+        Stats.Solved = clear
+        Stats.Time = time.time() - start
+
+
+# Cuenta las alternativas pendientes en la lista Sudokus de iterSolveBoard: una
+# por tablero, y los valores por probar de cada punto de suposicin
+def countPending(Sudokus):
+    pending = 0
+    for Entry in Sudokus:
+        if isinstance(Entry,Board):
+            pending = pending + 1
+        else:
+            pending = pending + len(Entry[3])
+    return pending
+
+
+# Resuelve el Sudoku ingresado (Board) con iterSolveBoard (ver sus parmetros).
+# Devuelve el tablero solucionado, o None si el Sudoku no tiene solucion (o si
+# se super alguno de los lmites indicados en Limits)
+def solveBoard(Sudoku,useTrail=1,Stats=None,Techniques=None,Limits=None):
+    Solution = None
+    for Current in iterSolveBoard(Sudoku,useTrail,Stats,Techniques,Limits):
+        Solution = Current
+    if Solution is None or Solution.isSolved() == 0:
+        return None
+    return Solution
+
+
+# Resuelve el Sudoku ingresado (ver loadBoard para los formatos aceptados) con
+# iterSolveBoard y devuelve los nmeros a medida que se ubican, sin esperar a
+# que termine la solucin:
+#   ["place", fila, columna, nmero, fase]: un nmero ubicado; la fase es su
+#       nombre en PhaseNames ("IV" para los nmeros supuestos).
+#   ["undo", n]: la alternativa supuesta no llev a una solucin, y solo los
+#       primeros n nmeros devueltos siguen siendo vlidos; los siguientes
+#       "place" continan desde ah.
+#   ["end", estado]: el ltimo, con el estado "solved", "unsolvable" o
+#       "timeout" (si se super alguno de los lmites indicados en Limits).
+# Los nmeros se devuelven en cuanto las fases aplican la unidad en la que se
+# ubicaron (ver iterPhases), sin esperar a que termine la pasada, en el orden
+# en que se registraron en la pila del tablero (inputStackValue). Los que se
+# devuelven antes del primer "IV" no dependen de ninguna suposicin
+def iterPlacements(grid,useTrail=1,Stats=None,Techniques=None,Limits=None):
+    Sudoku = loadBoard(grid)
+    if Sudoku.isValid() == 0:
+        yield ["end","unsolvable"]
+        return
+    Steps = []
+    for Sudoku in iterSolveBoard(Sudoku,useTrail,Stats,Techniques,Limits):
+        Stack = Sudoku.Stack
+        top = Sudoku.Top + 1
+        common = 0
+        while common < len(Steps) and common < top and Steps[common] == Stack[common]:
+            common = common + 1
+        if common < len(Steps):
+            del Steps[common:]
+            yield ["undo",common]
+        for i in range(common,top):
+            Steps.append(Stack[i][:])
+            yield ["place",Stack[i][0],Stack[i][1],Stack[i][2],PhaseNames[Stack[i][3]]]
+    if Sudoku.isSolved() == 1:
+        yield ["end","solved"]
+    elif Limits is not None and Limits.Reason is not None:
+        yield ["end","timeout"]
+    else:
+        yield ["end","unsolvable"]
+
+
+# Resuelve el Sudoku ingresado (Board) con solveBoard, registrando las
+# estadsticas de cada fase. Devuelve [tablero solucionado o None, SolveStats]
+def solveBoardStats(Sudoku,useTrail=1,Techniques=None):
+    Stats = SolveStats()
+    return [solveBoard(Sudoku,useTrail,Stats,Techniques),Stats]
+
+
+# Resuelve el Sudoku ingresado (ver loadBoard para los formatos aceptados) con
+# solveBoard, detenindose a la hora deadline (time.time()) o al examinar
+# maxNodes tableros, lo que ocurra primero (None es sin lmite). Devuelve un
+# SolveResult con el estado "solved", "unsolvable" o "timeout", el tablero
+# (la solucin o el tablero parcial), los pasos registrados y las
+# estadsticas
+def solveLimited(grid,deadline=None,maxNodes=None,useTrail=1,Techniques=None):
+    Sudoku = loadBoard(grid)
+    Stats = SolveStats()
+    Limits = SolveLimits(deadline,maxNodes)
+    if Sudoku.isValid() == 0:
+        return SolveResult("unsolvable",None,Stats,Limits)
+    Solution = solveBoard(Sudoku,useTrail,Stats,Techniques,Limits)
+    if Solution is not None:
+        return SolveResult("solved",Solution,Stats,Limits)
+    if Limits.Reason is not None:
+        return SolveResult("timeout",Limits.Board,Stats,Limits)
+    return SolveResult("unsolvable",None,Stats,Limits)
+
+
+# Resuelve el Sudoku ingresado (CompactBoard) con DepthFirstSearch: las fases
+# I a III se propagan por lista de trabajo y la fase IV se reemplaza por la
+# bsqueda en profundidad. Es el metodo "compact"; solveBoard (metodo "phases")
+# hace su propia bsqueda sobre Board. Devuelve el tablero solucionado, o None si el
+# Sudoku no tiene solucion.
+def solveCompact(Sudoku):
+    return DepthFirstSearch(Sudoku).solve()
+
+
+# Resuelve el Sudoku ingresado (Board) como un problema de cobertura exacta
+# (ExactCover). El tablero devuelto tiene los mismos pasos registrados que
+# dejaria solveBoard, en el orden en que los escogio la busqueda, por lo que
+# printSolution funciona igual. Devuelve None si el Sudoku no tiene solucion.
+def solveBoardExactCover(Sudoku):
+    Cells = [0]*81
+    for i in range(81):
+        if Sudoku.getValueAt(i // 9,i % 9) in Bits:
+            Cells[i] = int(Sudoku.getValueAt(i // 9,i % 9))
+    Steps = ExactCover(Cells).solve()
+    if Steps is None:
+        return None
+    Sudoku = Sudoku.copy()
+    for Step in Steps:
+        Sudoku.setValueAt(Step[0] // 9,Step[0] % 9,str(Step[1]))
+        Sudoku.inputStackValue(Step[0] // 9,Step[0] % 9,Step[1])
+    return Sudoku
+
+
+# Igual que solveBoardExactCover, pero sobre un CompactBoard
+def solveCompactExactCover(Sudoku):
+    Steps = ExactCover(Sudoku.Cells).solve()
+    if Steps is None:
+        return None
+    Sudoku = Sudoku.copy()
+    for Step in Steps:
+        Sudoku.placeValue(Step[0],Step[1])
+    return Sudoku
+
+
+# Metodos de solucion que acepta solve
+SolveMethods = ["phases","compact","dlx"]
+
+
+# Convierte el Sudoku ingresado en un Board nuevo. Se acepta:
+#  - Un Board o un CompactBoard, del cual se hace una copia.
+#  - Una cadena de 81 caracteres, fila por fila; tambin se acepta el formato
+#    del archivo de Board (valores separados por comas, filas terminadas en
+#    ";"), pues se ignoran los espacios, las comas y los punto y coma.
+#  - Una lista de 81 valores, o de 9 filas de 9 valores. Los valores pueden ser
+#    nmeros o cadenas; 0, None o cualquier valor que no sea un nmero del 1
+#    al 9 es una casilla vacia.
+# Tambin se aceptan tableros de N x N con N = n * n (16 x 16, 25 x 25, ...);
+# como sus nmeros pueden tener ms de un caracter, en una cadena deben ir
+# separados por comas.
+# Si el Sudoku no tiene 81 casillas (o N * N) se lanza ValueError
+def loadBoard(grid):
+    if isinstance(grid,Board):
+        return grid.copy()
+    if isinstance(grid,CompactBoard):
+        return grid.toBoard()
+    if isinstance(grid,basestring):
+        if "," in grid:
+            Cells = [value.strip() for value in grid.replace(";",",").split(",") if value.strip() != ""]
+        else:
+            Cells = [c for c in grid if c not in " \t\r\n;"]
+    else:
+        Cells = []
+        for value in grid:
+            if isinstance(value,(list,tuple)):
+                Cells.extend(value)
+            else:
+                Cells.append(value)
+        Cells = [str(value) if value is not None else "*" for value in Cells]
+    size = int(round(len(Cells) ** 0.5))
+    if size * size != len(Cells) or size < 4:
+        raise ValueError("el Sudoku debe tener 81 casillas, tiene " + str(len(Cells)))
+    return Board(None,getBoxSize(size)).fromString(Cells)
+
+
+# Resuelve el Sudoku ingresado (ver loadBoard para los formatos aceptados) con el
+# metodo indicado, sin modificar el Sudoku original. Devuelve el tablero
+# solucionado (Board, con los pasos registrados), o None si no tiene solucion
+# (incluyendo los Sudokus con nmeros repetidos).
+# Si se ingresa Stats (SolveStats), con el metodo "phases" en el se registran
+# las estadisticas de cada fase. Techniques son las tecnicas de eliminacion que
+# usa el metodo "phases" (ver solveBoard)
+def solve(grid,method="phases",useTrail=1,Stats=None,Techniques=None):
+    Sudoku = loadBoard(grid)
+    if Sudoku.isValid() == 0:
+        return None
+    if method == "phases":
+        return solveBoard(Sudoku,useTrail,Stats,Techniques)
+    if method in SolveMethods and Sudoku.Size != 9:
+        raise ValueError("el metodo " + method + " solo resuelve Sudokus de 9 x 9")
+    if method == "compact":
+        Sudoku = solveCompact(CompactBoard().fromBoard(Sudoku))
+        if Sudoku is None:
+            return None
+        return Sudoku.toBoard()
+    if method == "dlx":
+        return solveBoardExactCover(Sudoku)
+    raise ValueError("metodo desconocido: " + str(method))
+
+
+# Metodo de solucion usado por el programa principal:
+#   "phases": las cuatro fases con Board y Agent (useTrail se aplica aqui)
+#   "compact": las fases I a III con CompactBoard y busqueda en profundidad
+#   "dlx": cobertura exacta con enlaces danzantes (ExactCover)
+Method = "phases"
+useTrail = 1
+
+# Si useCompactTrace es 1, en lugar del archivo con el tablero dibujado paso a
+# paso (printSolution) se genera la traza compacta (printTrace)
+useCompactTrace = 0
+
+# Si useStats es 1 (con el metodo "phases"), se imprimen las estadisticas de
+# cada fase y se escriben en un archivo JSON con el nombre del archivo original
+# concatenado con la palabra "Stats" (ver Stats.py)
+useStats = 0
+
+# Tecnicas de eliminacion de candidatos que usa el metodo "phases" (None para
+# no usar ninguna; ver Techniques.TechniqueNames)
+useTechniques = None
+
+# Lmites del metodo "phases": segundos de tiempo y cantidad de tableros
+# examinados (None para no limitar; ver Limits.py)
+useTimeout = None
+useMaxNodes = None
+
+# Uso:
+#   python Main.py                  (pregunta la direccion del archivo)
+#   python Main.py sudoku1.txt [-m compact|dlx] [--copies] [--trace] [--stats]
+#                  [-t all|naked-pairs,x-wing,...] [--timeout s] [--max-nodes n]
+#   python Main.py -s <81 caracteres> [-m compact|dlx] [-t ...] [--timeout s]
+#   python Main.py sudoku1.txt|-s <81 caracteres> --stream [-t ...] [--timeout s]
+# Con -s solo se imprime la solucion como una cadena de 81 caracteres ("-" si
+# no tiene solucion), sin escribir archivos; si se supera --timeout o
+# --max-nodes se imprime el tablero parcial y se termina con el codigo 2. Con
+# --stream (metodo phases) se imprime cada numero en cuanto se ubica, una linea
+# por evento de iterPlacements ("A1 5 III", "undo n" y al final "end estado").
+# Las opciones que no se indiquen toman los valores definidos arriba.
+if __name__ == "__main__":
+    Parser = argparse.ArgumentParser(description="Solucionador de Sudokus")
+    Parser.add_argument("file",nargs="?",help="archivo con el Sudoku (si no se indica, se pregunta)")
+    Parser.add_argument("-s","--string",help="Sudoku de 81 caracteres (o de N x N valores separados por comas); se imprime solo la solucion, sin escribir archivos")
+    Parser.add_argument("-m","--method",choices=SolveMethods,default=Method,help="metodo de solucion")
+    Parser.add_argument("--trail",action="store_true",default=useTrail == 1,help="usa la traza de deshacer en la fase IV (por defecto)")
+    Parser.add_argument("--copies",action="store_true",help="copia el tablero por cada alternativa de la fase IV en lugar de usar la traza")
+    Parser.add_argument("--trace",action="store_true",default=useCompactTrace == 1,help="escribe la traza compacta en lugar de la solucion paso a paso")
+    Parser.add_argument("--stats",action="store_true",default=useStats == 1,help="imprime y guarda las estadisticas de cada fase")
+    Parser.add_argument("-t","--techniques",help="tecnicas de eliminacion separadas por comas, o all")
+    Parser.add_argument("--timeout",type=float,default=useTimeout,help="segundos maximos de busqueda (metodo phases)")
+    Parser.add_argument("--max-nodes",type=int,default=useMaxNodes,help="tableros maximos a examinar (metodo phases)")
+    Parser.add_argument("--stream",action="store_true",help="imprime cada numero en cuanto se ubica (metodo phases)")
+    Arguments = Parser.parse_args()
+    Method = Arguments.method
+    useTrail = int(Arguments.trail and not Arguments.copies)
+    useCompactTrace = int(Arguments.trace)
+    useStats = int(Arguments.stats)
+    if Arguments.techniques is not None:
+        try:
+            useTechniques = parseTechniques(Arguments.techniques)
+        except ValueError as Error:
+            Parser.error(str(Error))
+    useTimeout = Arguments.timeout
+    useMaxNodes = Arguments.max_nodes
+    Limited = useTimeout is not None or useMaxNodes is not None
+    if Limited and Method != "phases":
+        Parser.error("--timeout y --max-nodes solo se usan con el metodo phases")
+    deadline = None
+    if useTimeout is not None:
+        deadline = time.time() + useTimeout
+
+    if Arguments.stream:
+        if Method != "phases":
+            Parser.error("--stream solo se usa con el metodo phases")
+        try:
+            if Arguments.string is not None:
+                Grid = loadBoard(Arguments.string)
+            else:
+                Grid = Board(Arguments.file if Arguments.file is not None else raw_input("Ingrese la direccion del archivo: "))
+        except ValueError as Error:
+            Parser.error(str(Error))
+        Letters = Grid.Geometry.Letters
+        for Event in iterPlacements(Grid,useTrail,None,useTechniques,SolveLimits(deadline,useMaxNodes)):
+            if Event[0] == "place":
+                print Letters[Event[1]] + str(Event[2] + 1) + " " + str(Event[3]) + " " + Event[4]
+            else:
+                print Event[0] + " " + str(Event[1])
+            sys.stdout.flush()
+        if Event[1] == "solved":
+            sys.exit(0)
+        if Event[1] == "timeout":
+            sys.exit(2)
+        sys.exit(1)
+
+    if Arguments.string is not None and Limited:
+        try:
+            Result = solveLimited(Arguments.string,deadline,useMaxNodes,useTrail,useTechniques)
+        except ValueError as Error:
+            Parser.error(str(Error))
+        if Result.Status == "unsolvable":
+            print "-"
+            sys.exit(1)
+        print Result.Board.toString()
+        if Result.Status == "timeout":
+            sys.exit(2)
+        sys.exit(0)
+
+    if Arguments.string is not None:
+        try:
+            Sudoku = solve(Arguments.string,Method,useTrail,None,useTechniques)
+        except ValueError as Error:
+            Parser.error(str(Error))
+        if Sudoku is None:
+            print "-"
+            sys.exit(1)
+        print Sudoku.toString()
+        sys.exit(0)
+
+    FileName = Arguments.file
+    if FileName is None:
+        FileName = raw_input("Ingrese la direccion del archivo: ")
+    if Method != "phases" and Board(FileName).Size != 9:
+        Parser.error("el metodo " + Method + " solo resuelve Sudokus de 9 x 9")
+    print "Calculando, por favor espere..."
+    Stats = None
+    if Method == "compact":
+        Search = DepthFirstSearch(CompactBoard(FileName))
+        Sudoku = Search.solve()
+        if Sudoku is not None:
+            Sudoku = Sudoku.toBoard()
+        print "Examinaciones: " + str(Search.Examined) + " (barrido completo: " + str(Search.SweepExaminations) + ", ahorradas: " + str(Search.getSaved()) + ")"
+    elif Method == "dlx":
+        Sudoku = solveBoardExactCover(Board(FileName))
+    elif Limited:
+        Result = solveLimited(Board(FileName),deadline,useMaxNodes,useTrail,useTechniques)
+        Sudoku = Result.Board
+        Stats = Result.Stats
+    elif useStats == 1:
+        Result = solveBoardStats(Board(FileName),useTrail,useTechniques)
+        Sudoku = Result[0]
+        Stats = Result[1]
+    else:
+        Sudoku = solveBoard(Board(FileName),useTrail,None,useTechniques)
+
+    if useStats == 1 and Stats is not None:
+        Stats.printStats()
+        Stats.dump(FileName[0:len(FileName) - 4] + "Stats.json")
+        print "Las estadisticas estan registradas en el archivo " + FileName[0:len(FileName) - 4] + "Stats.json"
+    if Limited and Result.Status == "timeout":
+        print "Se alcanzo el limite (" + Result.Reason + ") tras examinar " + str(Result.Nodes) + " tableros, quedaron " + str(Result.Pending) + " pendientes."
+        print "Tablero parcial (" + str(len(Result.Steps)) + " pasos):"
+        Sudoku.printMatrix()
+        sys.exit(2)
+
+    if Sudoku is None:
+        print "El Sudoku ingresado no tiene solucion."
+    else:
+        Sudoku.printMatrix()
+        if useCompactTrace == 1:
+            Sudoku.printTrace()
+            cadena = "La traza de la solucion esta registrada en el archivo "
+            cadena = cadena + FileName[0:len(FileName) - 4] + "Trace.txt"
+        else:
+            Sudoku.printSolution()
+            cadena = "La solucion paso a paso esta registrada en el archivo "
+            cadena = cadena + FileName[0:len(FileName) - 4] + "Solution.txt"
+        print cadena
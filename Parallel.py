@@ -0,0 +1,96 @@
+# -*- coding: cp1252 -*-
+# Solucionador de Sudokus por lotes en varios procesadores
+#
+# Reparte los Sudokus de un archivo (en los formatos aceptados por Batch.py)
+# entre un grupo de procesos. Los Sudokus se envan a los procesos en bloques
+# (chunksize) para reducir la comunicacin entre procesos. Por defecto las
+# soluciones se escriben en el mismo orden del archivo original; en el modo
+# desordenado (-u) se escriben en cuanto cada proceso las termina, lo cual es
+# ms rpido cuando hay Sudokus de dificultades muy distintas. Como cada lnea
+# del archivo de soluciones incluye el Sudoku original, el modo desordenado no
+# pierde la relacin entre Sudoku y solucin.
+#
+# Al terminar se informa cuantos Sudokus resolvi cada proceso, el tiempo que
+# dedic a resolverlos y su rendimiento (Sudokus por segundo).
+#
+# Uso:
+#   python Parallel.py Sudokus.txt [Soluciones.txt] [-p procesos] [-c bloque] [-u]
+#                      [-m compact|dlx]
+#
+
+import argparse
+import functools
+import multiprocessing
+import os
+import time
+
+from Classes import *
+from Batch import Methods, readPuzzles, writeSolutions
+
+
+# Resuelve un Sudoku dentro de un proceso del grupo, con el mtodo indicado.
+# Devuelve el Sudoku, su solucin (None si no tiene), el identificador del
+# proceso y el tiempo usado
+def solvePuzzle(Puzzle,method="compact"):
+    start = time.time()
+    Sudoku = Methods[method](CompactBoard().fromString(Puzzle))
+    if Sudoku is not None:
+        Sudoku = Sudoku.toString()
+    return [Puzzle,Sudoku,os.getpid(),time.time() - start]
+
+
+# Resuelve los Sudokus en un grupo de procesos y devuelve los resultados a
+# medida que llegan. Si se ingresa el diccionario Workers, en l se acumula por
+# cada proceso la cantidad de Sudokus resueltos y el tiempo utilizado.
+def solvePuzzlesParallel(Puzzles,processes=None,chunksize=16,ordered=1,Workers=None,method="compact"):
+    Pool = multiprocessing.Pool(processes)
+    Solver = functools.partial(solvePuzzle,method=method)
+    try:
+        if ordered == 1:
+            Results = Pool.imap(Solver,Puzzles,chunksize)
+        else:
+            Results = Pool.imap_unordered(Solver,Puzzles,chunksize)
+        for Result in Results:
+            if Workers is not None:
+                Worker = Workers.setdefault(Result[2],[0,0.0])
+                Worker[0] = Worker[0] + 1
+                Worker[1] = Worker[1] + Result[3]
+            yield Result
+        Pool.close()
+    finally:
+        Pool.terminate()
+        Pool.join()
+
+
+if __name__ == "__main__":
+    Parser = argparse.ArgumentParser(description="Solucionador de Sudokus por lotes en varios procesadores")
+    Parser.add_argument("file",help="archivo con los Sudokus")
+    Parser.add_argument("solutions",nargs="?",help="archivo donde se escriben las soluciones")
+    Parser.add_argument("-p","--processes",type=int,default=None,help="cantidad de procesos (por defecto, uno por procesador)")
+    Parser.add_argument("-c","--chunksize",type=int,default=16,help="Sudokus enviados a cada proceso por bloque")
+    Parser.add_argument("-u","--unordered",action="store_true",help="escribe las soluciones en el orden en que se terminan")
+    Parser.add_argument("-m","--method",choices=sorted(Methods.keys()),default="compact",help="metodo de solucion")
+    Arguments = Parser.parse_args()
+
+    FileName = Arguments.file
+    SolutionName = Arguments.solutions
+    if SolutionName is None:
+        if FileName[len(FileName) - 4:len(FileName)] == ".txt":
+            SolutionName = FileName[0:len(FileName) - 4] + "Solutions.txt"
+        else:
+            SolutionName = FileName + "Solutions.txt"
+    ordered = 1
+    if Arguments.unordered:
+        ordered = 0
+
+    Workers = {}
+    start = time.time()
+    Results = solvePuzzlesParallel(readPuzzles(FileName),Arguments.processes,Arguments.chunksize,ordered,Workers,Arguments.method)
+    Count = writeSolutions(Results,SolutionName)
+    elapsed = time.time() - start
+    print "Sudokus procesados: " + str(Count[0]) + ", resueltos: " + str(Count[1])
+    print "Tiempo: %.3f s (%.1f Sudokus/s)" % (elapsed,Count[0] / max(elapsed,1e-9))
+    for pid in sorted(Workers.keys()):
+        Worker = Workers[pid]
+        print "  Proceso %d: %d Sudokus, %.3f s, %.1f Sudokus/s" % (pid,Worker[0],Worker[1],Worker[0] / max(Worker[1],1e-9))
+    print "Las soluciones estan registradas en el archivo " + SolutionName
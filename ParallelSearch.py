@@ -0,0 +1,145 @@
+# -*- coding: cp1252 -*-
+# Bsqueda en paralelo de un solo Sudoku
+#
+# En la fase IV cada alternativa de la celda supuesta es un subrbol
+# independiente de la bsqueda, pero solveBoard los recorre uno tras otro en
+# un solo procesador. Para los Sudokus
+# que requieren muchas suposiciones, solveParallel reparte esas alternativas
+# entre un grupo de procesos:
+#
+#  1. El proceso principal divide la bsqueda (splitBoard): aplica las fases I
+#     a III al tablero y lo reemplaza por una copia por cada alternativa de la
+#     celda con menos candidatos, tomando siempre el tablero pendiente ms
+#     antiguo, hasta tener subtrees subrboles por proceso (o hasta resolver
+#     el Sudoku sin necesidad de repartir).
+#  2. Cada subrbol se resuelve con solveBoard en algn proceso del grupo. Los
+#     subrboles se entregan de a uno, por lo que un proceso que termina un
+#     subrbol pequeo toma el siguiente mientras otro sigue con uno grande.
+#  3. En cuanto algn subrbol llega a un tablero resuelto (isSolved) se
+#     detiene el grupo de procesos, cancelando los dems subrboles.
+#
+# Si el Sudoku tiene varias soluciones, la que se obtiene depende de cul
+# subrbol termine primero.
+#
+# Uso:
+#   python ParallelSearch.py sudoku1.txt [-p procesos] [-k subarboles] [-t all|...]
+#   python ParallelSearch.py -s <81 caracteres> [-p procesos] [-k subarboles] [-t ...]
+# Con -s solo se imprime la solucin como una cadena ("-" si no tiene
+# solucin); con un archivo se imprime el tablero y se escribe la solucin paso
+# a paso, igual que el programa principal.
+#
+
+import argparse
+import functools
+import multiprocessing
+import os
+import sys
+import time
+
+from Classes import *
+from Main import applyPhases, chooseBranch, solveBoard, loadBoard
+from Techniques import parseTechniques
+
+
+# Divide la bsqueda del Sudoku (Board) en al menos count subrboles. Devuelve
+# [tablero resuelto, []] si el Sudoku se resolvi al dividirlo, o [None,
+# subrboles] con los tableros pendientes (vacio si no tiene solucin)
+def splitBoard(Sudoku,count,Techniques=None):
+    Frontier = [Sudoku]
+    while len(Frontier) > 0 and len(Frontier) < count:
+        Pending = Frontier.pop(0)
+        Solver = Agent(Pending)
+        while applyPhases(Pending,Solver,None,Techniques) == 1 and Pending.isSolved() == 0:
+            pass
+        if Pending.isSolved() == 1:
+            return [Pending,[]]
+        Branch = chooseBranch(Pending)
+        if Branch is None:
+            continue
+        for value in Branch[2]:
+            Copia = Pending.copy()
+            Copia.setValueAt(Branch[0],Branch[1],value)
+            Copia.inputStackValue(Branch[0],Branch[1],int(value),5)
+            Frontier.append(Copia)
+    return [None,Frontier]
+
+
+# Resuelve un subrbol dentro de un proceso del grupo. Devuelve el tablero
+# resuelto (o None), el identificador del proceso y el tiempo usado
+def solveSubtree(Sudoku,Techniques=None):
+    start = time.time()
+    return [solveBoard(Sudoku,1,None,Techniques),os.getpid(),time.time() - start]
+
+
+# Resuelve el Sudoku ingresado (en cualquiera de los formatos de Main.solve)
+# repartiendo los subrboles de la fase IV en un grupo de processes procesos,
+# con subtrees subrboles por proceso. Devuelve el tablero solucionado (Board)
+# o None si no tiene solucin. Si se ingresa el diccionario Workers, en l se
+# acumula por cada proceso la cantidad de subrboles terminados y el tiempo
+# utilizado
+def solveParallel(grid,processes=None,subtrees=8,Techniques=None,Workers=None):
+    Sudoku = loadBoard(grid)
+    if Sudoku.isValid() == 0:
+        return None
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    Result = splitBoard(Sudoku,processes * subtrees,Techniques)
+    if Result[0] is not None or len(Result[1]) == 0:
+        return Result[0]
+    Pool = multiprocessing.Pool(processes)
+    try:
+        for Solved in Pool.imap_unordered(functools.partial(solveSubtree,Techniques=Techniques),Result[1]):
+            if Workers is not None:
+                Worker = Workers.setdefault(Solved[1],[0,0.0])
+                Worker[0] = Worker[0] + 1
+                Worker[1] = Worker[1] + Solved[2]
+            if Solved[0] is not None:
+                return Solved[0]
+        Pool.close()
+    finally:
+        Pool.terminate()
+        Pool.join()
+    return None
+
+
+if __name__ == "__main__":
+    Parser = argparse.ArgumentParser(description="Busqueda en paralelo de un solo Sudoku")
+    Parser.add_argument("file",nargs="?",help="archivo con el Sudoku")
+    Parser.add_argument("-s","--string",help="Sudoku de 81 caracteres; se imprime solo la solucion")
+    Parser.add_argument("-p","--processes",type=int,default=None,help="cantidad de procesos (por defecto, uno por procesador)")
+    Parser.add_argument("-k","--subtrees",type=int,default=8,help="subarboles por proceso")
+    Parser.add_argument("-t","--techniques",help="tecnicas de eliminacion separadas por comas, o all")
+    Arguments = Parser.parse_args()
+    if Arguments.file is None and Arguments.string is None:
+        Parser.error("se debe indicar un archivo o un Sudoku con -s")
+    Techniques = None
+    try:
+        if Arguments.techniques is not None:
+            Techniques = parseTechniques(Arguments.techniques)
+        if Arguments.string is not None:
+            Grid = Arguments.string
+        else:
+            Grid = Board(Arguments.file)
+    except ValueError as Error:
+        Parser.error(str(Error))
+
+    Workers = {}
+    start = time.time()
+    Sudoku = solveParallel(Grid,Arguments.processes,Arguments.subtrees,Techniques,Workers)
+    elapsed = time.time() - start
+    if Arguments.string is not None:
+        if Sudoku is None:
+            print "-"
+            sys.exit(1)
+        print Sudoku.toString()
+        sys.exit(0)
+    if Sudoku is None:
+        print "El Sudoku ingresado no tiene solucion."
+    else:
+        Sudoku.printMatrix()
+        Sudoku.printSolution()
+        print "La solucion paso a paso esta registrada en el archivo " + Sudoku.SolutionPath + "Solution.txt"
+    print "Tiempo: %.3f s" % elapsed
+    for pid in sorted(Workers.keys()):
+        Worker = Workers[pid]
+        print "  Proceso %d: %d subarboles, %.3f s" % (pid,Worker[0],Worker[1])
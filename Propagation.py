@@ -0,0 +1,140 @@
+# -*- coding: cp1252 -*-
+# Propagacin por lista de trabajo
+#
+# Las fases I a III recorren las 27 unidades (con cada nmero) y las 81 celdas
+# en cada pasada, aunque desde la pasada anterior solo haya cambiado una celda.
+# WorklistPropagator solo vuelve a examinar lo que pudo cambiar:
+#  - Al ubicar el nmero d en una celda, las tres unidades de la celda se
+#    marcan con todos los nmeros (la celda dej de ser una posicin libre para
+#    cualquiera de ellos), y las unidades de cada vecino que tena a d como
+#    candidato se marcan con d.
+#  - Los vecinos que perdieron a d como candidato se marcan para revisar si
+#    quedaron con un solo candidato.
+# Cada unidad marcada guarda la mscara de los nmeros a examinar. Examinar un
+# par (unidad, nmero) es la proyeccin de las fases I y II: si el nmero
+# tiene una sola posicin libre en la unidad, se ubica. Examinar una celda es
+# la proyeccin expansiva de la fase III.
+#
+# La propagacin avanza por rondas: en cada ronda se examina lo marcado en la
+# ronda anterior, primero cuadrantes, luego filas, columnas y celdas. Un barrido
+# completo de una ronda examina 4 elementos por casilla vacia (el nmero que
+# le falta a su fila, a su columna y a su cuadrante, y la celda), por lo que se
+# puede comparar cuantas examinaciones se ahorraron.
+#
+# WorklistPropagator se usa en el mtodo "compact" (DepthFirstSearch, sobre
+# CompactBoard). El mtodo "phases" (Main.applyPhases, sobre Board y Agent)
+# usa las mismas marcas, pero las lleva el propio Board (Board.Dirty y
+# Board.DirtySingles, ver Board.markCell) y las fases conservan su orden:
+# cada pasada recorre las unidades como antes y salta las que no estn
+# marcadas.
+#
+
+from Classes import *
+
+# Orden en que se examinan las unidades en cada ronda (cuadrantes, filas,
+# columnas), igual al orden de las fases
+UnitOrder = range(18,27) + range(0,18)
+
+# Fase a la que corresponde la examinacin de cada unidad (ver PhaseNames)
+UnitPhase = [2]*9 + [3]*9 + [1]*9
+
+
+class WorklistPropagator(object):
+
+    # Constructor de la clase. Recibe el CompactBoard sobre el cual propagar.
+    # Si dirty es 1 todas las unidades y celdas quedan marcadas (como en la
+    # primera pasada de las fases); si es 0 solo se examina lo que marquen los
+    # nmeros ubicados con place.
+    def __init__(self,board,dirty=1):
+        self.Enviroment = board
+        self.Units = array("H",[511 * dirty]*27)
+        self.Cells = bytearray([dirty]*81)
+        self.Placed = 0
+        self.Rounds = 0
+        self.Examined = 0
+        self.SweepExaminations = 0
+
+    # Ubica el nmero en la celda indicada y marca lo que debe revisarse. La
+    # fase se registra en el paso de la solucin
+    def place(self,cell,value,phase=0):
+        Sudoku = self.Enviroment
+        Units = self.Units
+        bit = 1 << (value - 1)
+        for peer in CellPeers[cell]:
+            if Sudoku.Cells[peer] == 0 and Sudoku.getCandidates(peer) & bit:
+                self.Cells[peer] = 1
+                Units[CellRow[peer]] = Units[CellRow[peer]] | bit
+                Units[9 + CellColumn[peer]] = Units[9 + CellColumn[peer]] | bit
+                Units[18 + CellQuadrant[peer]] = Units[18 + CellQuadrant[peer]] | bit
+        Units[CellRow[cell]] = 511
+        Units[9 + CellColumn[cell]] = 511
+        Units[18 + CellQuadrant[cell]] = 511
+        self.Cells[cell] = 0
+        Sudoku.placeValue(cell,value,phase)
+        self.Placed = self.Placed + 1
+
+    # Examina los nmeros marcados de la unidad indicada. Retorna 0 si algn
+    # nmero ya no tiene posicin libre en la unidad, 1 en otro caso
+    def examineUnit(self,unit,Digits):
+        Sudoku = self.Enviroment
+        for value in BitDigits[Digits & ~Sudoku.Masks[unit]]:
+            bit = 1 << (value - 1)
+            self.Examined = self.Examined + 1
+            found = -1
+            count = 0
+            for cell in UnitCells[unit]:
+                if Sudoku.Cells[cell] == 0 and Sudoku.getCandidates(cell) & bit:
+                    found = cell
+                    count = count + 1
+            if count == 0:
+                return 0
+            if count == 1:
+                self.place(found,value,UnitPhase[unit])
+        return 1
+
+    # Examina la celda indicada. Retorna 0 si la celda qued sin candidatos
+    def examineCell(self,cell):
+        Sudoku = self.Enviroment
+        if Sudoku.Cells[cell] != 0:
+            return 1
+        self.Examined = self.Examined + 1
+        Candidates = Sudoku.getCandidates(cell)
+        if Candidates == 0:
+            return 0
+        if BitCount[Candidates] == 1:
+            self.place(cell,BitDigits[Candidates][0],4)
+        return 1
+
+    # Propaga hasta que no queden unidades ni celdas marcadas. Retorna 1 si el
+    # Sudoku qued resuelto, -1 si se encontr una contradiccin y 0 si hay que
+    # suponer
+    def propagate(self):
+        Sudoku = self.Enviroment
+        pending = 1
+        while pending == 1 and Sudoku.isSolved() == 0:
+            self.Rounds = self.Rounds + 1
+            self.SweepExaminations = self.SweepExaminations + 4 * Sudoku.BlankSpaces
+            Units = array("H",self.Units)
+            Cells = self.Cells[:]
+            self.Units = array("H",[0]*27)
+            self.Cells = bytearray(81)
+            for unit in UnitOrder:
+                if Units[unit] != 0 and self.examineUnit(unit,Units[unit]) == 0:
+                    return -1
+            for cell in range(81):
+                if Cells[cell] == 1 and self.examineCell(cell) == 0:
+                    return -1
+            pending = 0
+            for Digits in self.Units:
+                if Digits != 0:
+                    pending = 1
+            if 1 in self.Cells:
+                pending = 1
+        if Sudoku.isSolved() == 1:
+            return 1
+        return 0
+
+    # Retorna cuantas examinaciones se ahorraron frente a barrer todo el
+    # tablero en cada ronda
+    def getSaved(self):
+        return self.SweepExaminations - self.Examined
@@ -0,0 +1,161 @@
+# -*- coding: cp1252 -*-
+# Bsqueda en profundidad para la fase de multiplicidad mnima por suposicin
+#
+# En lugar de crear de una vez un tablero por cada alternativa de la celda
+# supuesta, la bsqueda guarda una pila explcita de puntos de suposicin. Cada
+# punto contiene el tablero en ese momento, la celda escogida y los candidatos
+# que faltan por probar; solo se copia el tablero cuando se prueba un
+# candidato, por lo que la memoria usada crece con la profundidad de la
+# bsqueda y no con la cantidad de alternativas pendientes.
+#
+# La celda supuesta es la que tiene menos candidatos (MRV), y estos se leen de
+# las mscaras de las unidades que mantiene CompactBoard. Despus de cada
+# suposicin se aplican las fases I a III hasta que no ubiquen ms nmeros.
+#
+# La propagacin se hace por defecto con WorklistPropagator, de modo que
+# despus de una suposicin solo se examinan las unidades y celdas afectadas
+# por ella; con useWorklist en 0 se usan los recorridos completos de
+# CompactAgent.
+#
+# Adems de resolver, la bsqueda puede contar las soluciones hasta un lmite
+# (countSolutions), lo cual permite revisar si un Sudoku tiene solucin nica
+# con el mismo esfuerzo que resolverlo (checkUniqueness).
+#
+# La bsqueda lleva la cuenta de los nodos visitados (tableros propagados), de
+# los retrocesos (suposiciones que llevaron a un tablero sin solucin) y, con
+# la lista de trabajo, de las examinaciones hechas frente a las de un barrido
+# completo.
+#
+# Es un motor aparte, sobre CompactBoard: solo lo usa el mtodo "compact"
+# (Main.solveCompact, y a travs de l Batch.py, Parallel.py, Archive.py y el
+# servicio). El mtodo "phases" (Main.iterSolveBoard, sobre Board y Agent)
+# hace la misma bsqueda en profundidad con su propia pila de puntos de
+# suposicin, pero sobre un solo tablero que retrocede con la traza de
+# deshacer (Board.undo) en lugar de copiarse.
+#
+
+from Classes import *
+from Propagation import WorklistPropagator
+
+
+class DepthFirstSearch(object):
+
+    # Constructor de la clase. Recibe el CompactBoard a resolver, el cual no se
+    # modifica.
+    def __init__(self,board,useWorklist=1):
+        self.Root = board
+        self.UseWorklist = useWorklist
+        self.Nodes = 0
+        self.Backtracks = 0
+        self.MaxDepth = 0
+        self.Examined = 0
+        self.SweepExaminations = 0
+        self.Solutions = []
+
+    # Ubica el nmero supuesto en la celda indicada (si cell no es -1) y aplica
+    # las fases I a III sobre el tablero hasta que no se ubiquen ms nmeros.
+    # Retorna [1, None] si el tablero qued resuelto, [-1, None] si no tiene
+    # solucin, o [0, [celda, candidatos]] con la celda a suponer
+    def propagate(self,Sudoku,cell=-1,value=0):
+        self.Nodes = self.Nodes + 1
+        Solver = CompactAgent(Sudoku)
+        if self.UseWorklist == 1:
+            if cell == -1:
+                Propagator = WorklistPropagator(Sudoku,1)
+            else:
+                Propagator = WorklistPropagator(Sudoku,0)
+                Propagator.place(cell,value,5)
+            state = Propagator.propagate()
+            self.Examined = self.Examined + Propagator.Examined
+            self.SweepExaminations = self.SweepExaminations + Propagator.SweepExaminations
+            if state == -1:
+                return [-1,None]
+        else:
+            if cell != -1:
+                Sudoku.placeValue(cell,value,5)
+            loop = 1
+            while loop == 1 and Sudoku.isSolved() == 0:
+                loop = Solver.projectQuadrants()
+                if Solver.projectRows() == 1:
+                    loop = 1
+                if Solver.projectColumns() == 1:
+                    loop = 1
+                if Solver.expandQuadrants() == 1:
+                    loop = 1
+        if Sudoku.isSolved() == 1:
+            for Mask in Sudoku.Masks:
+                if Mask != 511:
+                    return [-1,None]
+            return [1,None]
+        Choice = Solver.findMinimumMultiplicity()
+        if Choice[1] == 0:
+            return [-1,None]
+        return [0,Choice]
+
+    # Recorre el rbol de suposiciones y devuelve, uno a uno, los tableros
+    # resueltos que encuentre. La bsqueda solo avanza cuando se pide la
+    # siguiente solucin
+    def iterSolutions(self):
+        if self.Root.isValid() == 0:
+            return
+        Sudoku = self.Root.copy()
+        State = self.propagate(Sudoku)
+        if State[0] == 1:
+            yield Sudoku
+            return
+        if State[0] == -1:
+            return
+        Stack = [[Sudoku,State[1][0],State[1][1]]]
+        while len(Stack) > 0:
+            if len(Stack) > self.MaxDepth:
+                self.MaxDepth = len(Stack)
+            Frame = Stack[-1]
+            if Frame[2] == 0:
+                Stack.pop()
+                continue
+            bit = Frame[2] & -Frame[2]
+            Frame[2] = Frame[2] & ~bit
+            Child = Frame[0].copy()
+            State = self.propagate(Child,Frame[1],BitDigits[bit][0])
+            if State[0] == 1:
+                yield Child
+            elif State[0] == -1:
+                self.Backtracks = self.Backtracks + 1
+            else:
+                Stack.append([Child,State[1][0],State[1][1]])
+
+    # Resuelve el Sudoku. Devuelve el tablero resuelto (una copia) o None si no
+    # tiene solucin
+    def solve(self):
+        for Sudoku in self.iterSolutions():
+            return Sudoku
+        return None
+
+    # Cuenta las soluciones del Sudoku, deteniendo la bsqueda en cuanto se
+    # llega al lmite indicado. Las soluciones encontradas quedan en Solutions
+    def countSolutions(self,limit=2):
+        self.Solutions = []
+        for Sudoku in self.iterSolutions():
+            self.Solutions.append(Sudoku)
+            if len(self.Solutions) >= limit:
+                break
+        return len(self.Solutions)
+
+    # Retorna cuantas examinaciones de la lista de trabajo se ahorraron frente a
+    # barrer todo el tablero en cada ronda
+    def getSaved(self):
+        return self.SweepExaminations - self.Examined
+
+
+# Revisa si el Sudoku (CompactBoard) tiene solucin nica. Devuelve
+# [resultado, bsqueda], donde resultado es "unique", "multiple" o "none" y la
+# bsqueda (DepthFirstSearch) tiene las soluciones encontradas y el esfuerzo
+# (nodos, retrocesos). La bsqueda se detiene al encontrar la segunda solucin.
+def checkUniqueness(board,useWorklist=1):
+    Search = DepthFirstSearch(board,useWorklist)
+    count = Search.countSolutions(2)
+    if count == 0:
+        return ["none",Search]
+    if count == 1:
+        return ["unique",Search]
+    return ["multiple",Search]
@@ -0,0 +1,277 @@
+# -*- coding: cp1252 -*-
+# Servicio de solucin de Sudokus
+#
+# Mantiene el solucionador cargado en un proceso que atiende conexiones por un
+# socket local (TCP en localhost o socket Unix), de modo que cada Sudoku no
+# tenga que pagar el arranque del intrprete. Cada conexin se atiende en su
+# propio hilo y puede enviar tantos Sudokus como quiera, uno por lnea (en
+# cualquiera de los formatos que acepta Main.solve). Los Sudokus de todas las
+# conexiones se encolan en SolverService, cuyo despachador los agrupa en lotes
+# (hasta batch Sudokus, o los que lleguen durante wait segundos despus del
+# primero) y enva cada lote a un grupo de procesos. As, cuando llegan muchos
+# Sudokus a la vez se usan todos los procesadores con pocos mensajes entre
+# procesos, y cuando llega uno solo no se espera ms de wait segundos.
+#
+# Las respuestas se envan en cuanto su lote termina, no en el orden de
+# llegada, una lnea por Sudoku:
+#
+#   <n> <sudoku> <solucin> <latencia ms> <cola> <tiempo de solucin ms>
+#
+# donde n es la posicin del Sudoku en la conexin (desde 0), la solucin es
+# "-" si el Sudoku no tiene solucin y "?" si no es un Sudoku vlido (o si
+# ocurri un error al resolverlo), la latencia es el tiempo desde que lleg
+# hasta que se respondi y cola es la cantidad de Sudokus que esperaban en la
+# cola cuando lleg. La lnea
+# "#stats" responde con las estadsticas del servicio:
+#
+#   #stats served=<n> batches=<n> mean_batch=<n> queued=<n> in_flight=<n>
+#          mean_latency_ms=<n> max_latency_ms=<n>
+#
+# Uso:
+#   python Service.py [-p puerto | -u socket] [-w procesos] [-b lote] [--wait s]
+#                     [-m phases|compact|dlx]
+#   python Service.py --client Sudokus.txt [-p puerto | -u socket]
+#
+
+import argparse
+import functools
+import multiprocessing
+import Queue
+import socket
+import SocketServer
+import threading
+import time
+
+from Classes import *
+from Main import solve, SolveMethods
+from Batch import readPuzzles
+
+
+# Resuelve un lote de Sudokus dentro de un proceso del grupo. Devuelve, por
+# cada uno, la solucin como cadena ("-" si no tiene, "?" si no es vlido o
+# si fall al resolverlo) y el tiempo usado. Ningn error sale de aqu, pues
+# si el lote fallara sus respuestas nunca se entregaran y las conexiones que
+# las esperan quedaran bloqueadas
+def solveBatch(Puzzles,method="compact"):
+    Results = []
+    for Puzzle in Puzzles:
+        start = time.time()
+        try:
+            Sudoku = solve(Puzzle,method)
+            if Sudoku is None:
+                solution = "-"
+            else:
+                solution = Sudoku.toString()
+        except Exception:
+            solution = "?"
+        Results.append([solution,time.time() - start])
+    return Results
+
+
+class SolverService(object):
+
+    # Constructor de la clase. Crea el grupo de procesos (antes de crear
+    # cualquier hilo) e inicia el despachador
+    def __init__(self,processes=None,method="compact",batch=16,wait=0.005):
+        self.Method = method
+        self.BatchSize = batch
+        self.Wait = wait
+        self.Requests = Queue.Queue()
+        self.Pool = multiprocessing.Pool(processes)
+        self.Lock = threading.Lock()
+        self.Served = 0
+        self.Batches = 0
+        self.InFlight = 0
+        self.Latency = 0.0
+        self.MaxLatency = 0.0
+        self.Dispatcher = threading.Thread(target=self.dispatch)
+        self.Dispatcher.daemon = True
+        self.Dispatcher.start()
+
+    # Encola un Sudoku. La respuesta [n, Sudoku, solucin, latencia, cola,
+    # tiempo] se deja en la cola Reply cuando se resuelva
+    def submit(self,Puzzle,Reply,tag=0):
+        self.Requests.put([tag,Puzzle,Reply,time.time(),self.Requests.qsize()])
+
+    # Toma los Sudokus de la cola, los agrupa en lotes y enva cada lote al
+    # grupo de procesos. Termina al recibir None
+    def dispatch(self):
+        while True:
+            Request = self.Requests.get()
+            if Request is None:
+                return
+            Batch = [Request]
+            deadline = time.time() + self.Wait
+            while len(Batch) < self.BatchSize:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    Request = self.Requests.get(True,remaining)
+                except Queue.Empty:
+                    break
+                if Request is None:
+                    self.Requests.put(None)
+                    break
+                Batch.append(Request)
+            self.Lock.acquire()
+            self.Batches = self.Batches + 1
+            self.InFlight = self.InFlight + len(Batch)
+            self.Lock.release()
+            self.Pool.apply_async(solveBatch,([Item[1] for Item in Batch],self.Method),
+                                  callback=functools.partial(self.deliver,Batch))
+
+    # Entrega las soluciones de un lote a las conexiones que las pidieron
+    def deliver(self,Batch,Results):
+        now = time.time()
+        self.Lock.acquire()
+        for i in range(len(Batch)):
+            Request = Batch[i]
+            latency = now - Request[3]
+            self.Served = self.Served + 1
+            self.InFlight = self.InFlight - 1
+            self.Latency = self.Latency + latency
+            self.MaxLatency = max(self.MaxLatency,latency)
+            Request[2].put([Request[0],Request[1],Results[i][0],latency,Request[4],Results[i][1]])
+        self.Lock.release()
+
+    # Devuelve las estadsticas del servicio como un diccionario
+    def getStats(self):
+        self.Lock.acquire()
+        Stats = {"served": self.Served,"batches": self.Batches,"queued": self.Requests.qsize(),
+                 "in_flight": self.InFlight,"mean_batch": 0.0,"mean_latency_ms": 0.0,
+                 "max_latency_ms": 1000 * self.MaxLatency}
+        if self.Batches > 0:
+            Stats["mean_batch"] = float(self.Served + self.InFlight) / self.Batches
+        if self.Served > 0:
+            Stats["mean_latency_ms"] = 1000 * self.Latency / self.Served
+        self.Lock.release()
+        return Stats
+
+    # Detiene el despachador y espera a que el grupo de procesos termine los
+    # lotes pendientes
+    def close(self):
+        self.Requests.put(None)
+        self.Dispatcher.join()
+        self.Pool.close()
+        self.Pool.join()
+
+
+# Atiende una conexin: lee los Sudokus lnea por lnea y los encola en el
+# servicio, mientras otro hilo escribe las respuestas a medida que llegan
+class SolverHandler(SocketServer.StreamRequestHandler):
+
+    def handle(self):
+        Service = self.server.Service
+        Replies = Queue.Queue()
+        Writer = threading.Thread(target=self.writeReplies,args=(Replies,))
+        Writer.start()
+        count = 0
+        while True:
+            linea = self.rfile.readline()
+            if linea == "":
+                break
+            linea = linea.strip()
+            if linea == "#stats":
+                Replies.put(["stats",Service.getStats()])
+            elif linea != "" and linea[0] != "#":
+                Service.submit(linea,Replies,count)
+                count = count + 1
+        Replies.put(["end",count])
+        Writer.join()
+
+    # Escribe las respuestas de la conexin hasta haber enviado todas las
+    # soluciones pedidas
+    def writeReplies(self,Replies):
+        written = 0
+        expected = -1
+        while written != expected:
+            Reply = Replies.get()
+            if Reply[0] == "end":
+                expected = Reply[1]
+            elif Reply[0] == "stats":
+                Fields = []
+                for Name in sorted(Reply[1].keys()):
+                    if isinstance(Reply[1][Name],float):
+                        Fields.append("%s=%.3f" % (Name,Reply[1][Name]))
+                    else:
+                        Fields.append(Name + "=" + str(Reply[1][Name]))
+                self.wfile.write("#stats " + " ".join(Fields) + "\n")
+                self.wfile.flush()
+            else:
+                self.wfile.write("%d %s %s %.3f %d %.3f\n" % (Reply[0],Reply[1],Reply[2],1000 * Reply[3],Reply[4],1000 * Reply[5]))
+                self.wfile.flush()
+                written = written + 1
+
+
+class TCPSolverServer(SocketServer.ThreadingMixIn,SocketServer.TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class UnixSolverServer(SocketServer.ThreadingMixIn,SocketServer.UnixStreamServer):
+    daemon_threads = True
+
+
+# Crea el servidor para el servicio indicado. Si se ingresa path se usa un
+# socket Unix; si no, TCP en localhost con el puerto indicado
+def createServer(Service,port=8765,path=None):
+    if path is not None:
+        Server = UnixSolverServer(path,SolverHandler)
+    else:
+        Server = TCPSolverServer(("127.0.0.1",port),SolverHandler)
+    Server.Service = Service
+    return Server
+
+
+# Enva los Sudokus al servicio y devuelve las respuestas a medida que llegan,
+# cada una como la lista de campos de la lnea recibida
+def solveRemote(Puzzles,port=8765,path=None):
+    if path is not None:
+        Connection = socket.socket(socket.AF_UNIX,socket.SOCK_STREAM)
+        Connection.connect(path)
+    else:
+        Connection = socket.create_connection(("127.0.0.1",port))
+    Reader = Connection.makefile("r")
+
+    def send():
+        for Puzzle in Puzzles:
+            Connection.sendall(Puzzle + "\n")
+        Connection.sendall("#stats\n")
+        Connection.shutdown(socket.SHUT_WR)
+    Sender = threading.Thread(target=send)
+    Sender.start()
+    for linea in Reader:
+        yield linea.split()
+    Sender.join()
+    Reader.close()
+    Connection.close()
+
+
+if __name__ == "__main__":
+    Parser = argparse.ArgumentParser(description="Servicio de solucion de Sudokus")
+    Parser.add_argument("-p","--port",type=int,default=8765,help="puerto TCP en localhost")
+    Parser.add_argument("-u","--unix",help="direccion del socket Unix (en lugar de TCP)")
+    Parser.add_argument("-w","--processes",type=int,default=None,help="cantidad de procesos (por defecto, uno por procesador)")
+    Parser.add_argument("-b","--batch",type=int,default=16,help="Sudokus por lote")
+    Parser.add_argument("--wait",type=float,default=0.005,help="segundos que se espera para completar un lote")
+    Parser.add_argument("-m","--method",choices=SolveMethods,default="compact",help="metodo de solucion")
+    Parser.add_argument("--client",metavar="SUDOKUS",help="envia los Sudokus del archivo al servicio e imprime las respuestas")
+    Arguments = Parser.parse_args()
+
+    if Arguments.client is not None:
+        for Fields in solveRemote(readPuzzles(Arguments.client),Arguments.port,Arguments.unix):
+            print " ".join(Fields)
+    else:
+        Service = SolverService(Arguments.processes,Arguments.method,Arguments.batch,Arguments.wait)
+        Server = createServer(Service,Arguments.port,Arguments.unix)
+        if Arguments.unix is not None:
+            print "Atendiendo en " + Arguments.unix
+        else:
+            print "Atendiendo en 127.0.0.1:" + str(Arguments.port)
+        try:
+            Server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        Server.server_close()
+        Service.close()
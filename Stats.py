@@ -0,0 +1,110 @@
+# -*- coding: cp1252 -*-
+# Estadsticas de la solucin por fases
+#
+# SolveStats registra, por cada fase del programa principal (I, II-A, II-B,
+# III, III-B y IV), el tiempo empleado, la cantidad de pasadas, los nmeros
+# ubicados y los candidatos eliminados del tablero. La fase III-B (tcnicas de
+# eliminacin, ver Techniques.py) solo se ejecuta si se activa, y por cada
+# tcnica se cuentan las veces que quit candidatos y cuntos quit. Para la fase IV registra adems los
+# tableros creados con Board.copy (sin la traza de deshacer), la cantidad
+# mxima de alternativas pendientes, las alternativas probadas y los
+# retrocesos (tableros que no llevaron a una solucin). Por ltimo cuenta las examinaciones de las
+# fases I a III (un nmero en una unidad, o un cuadrante en la fase III) que
+# hizo Main.applyPhases, y las que habra hecho recorriendo todo el tablero en
+# cada pasada, para ver cuntas se ahorra la lista de trabajo del tablero.
+#
+# solveBoard llena las estadsticas mientras resuelve, y estas se pueden
+# convertir en un diccionario (toDict) o escribir en un archivo JSON (dump)
+# para comparar qu fase domina en cada tipo de Sudoku.
+#
+
+import json
+import time
+
+# Fases que se registran, en el orden en que se ejecutan
+StatsPhases = ["I","II-A","II-B","III","III-B","IV"]
+
+
+class SolveStats(object):
+
+    # Constructor de la clase. Todas las cuentas inician en cero
+    def __init__(self):
+        self.Phases = {}
+        for Name in StatsPhases:
+            self.Phases[Name] = {"time": 0.0,"passes": 0,"placed": 0,"eliminated": 0}
+        self.Techniques = {}
+        self.Copies = 0
+        self.MaxFrontier = 0
+        self.Branches = 0
+        self.Backtracks = 0
+        self.Examined = 0
+        self.SweepExaminations = 0
+        self.Solved = 0
+        self.Time = 0.0
+        self.Start = None
+
+    # Marca el inicio de una fase sobre el tablero indicado (Board): guarda la
+    # hora, la cima de la pila de pasos y la cantidad de candidatos
+    def startPhase(self,Sudoku):
+        self.Start = [time.time(),Sudoku.Top,Sudoku.countCandidates()]
+
+    # Marca el fin de la fase indicada, sumando el tiempo, los nmeros
+    # ubicados y los candidatos eliminados desde startPhase
+    def endPhase(self,name,Sudoku):
+        Phase = self.Phases[name]
+        Phase["time"] = Phase["time"] + time.time() - self.Start[0]
+        Phase["passes"] = Phase["passes"] + 1
+        Phase["placed"] = Phase["placed"] + Sudoku.Top - self.Start[1]
+        Phase["eliminated"] = Phase["eliminated"] + self.Start[2] - Sudoku.countCandidates()
+        self.Start = None
+
+    # Registra que la tcnica indicada quit la cantidad de candidatos indicada
+    def countTechnique(self,name,removed):
+        if name not in self.Techniques:
+            self.Techniques[name] = {"applied": 0,"eliminated": 0}
+        self.Techniques[name]["applied"] = self.Techniques[name]["applied"] + 1
+        self.Techniques[name]["eliminated"] = self.Techniques[name]["eliminated"] + removed
+
+    # Registra la cantidad actual de alternativas pendientes
+    def updateFrontier(self,size):
+        if size > self.MaxFrontier:
+            self.MaxFrontier = size
+
+    # Retorna el nombre de la fase en la que se emple ms tiempo
+    def getDominantPhase(self):
+        dominant = StatsPhases[0]
+        for Name in StatsPhases:
+            if self.Phases[Name]["time"] > self.Phases[dominant]["time"]:
+                dominant = Name
+        return dominant
+
+    # Devuelve las estadsticas como un diccionario, listo para escribirse en
+    # formato JSON
+    def toDict(self):
+        Phases = {}
+        for Name in StatsPhases:
+            Phases[Name] = dict(self.Phases[Name])
+        Techniques = {}
+        for Name in self.Techniques:
+            Techniques[Name] = dict(self.Techniques[Name])
+        return {"phases": Phases,"techniques": Techniques,"copies": self.Copies,"max_frontier": self.MaxFrontier,
+                "branches": self.Branches,"backtracks": self.Backtracks,
+                "examined": self.Examined,"sweep_examinations": self.SweepExaminations,
+                "solved": self.Solved,"time": self.Time,"dominant": self.getDominantPhase()}
+
+    # Escribe las estadsticas en el archivo JSON indicado
+    def dump(self,path):
+        InfoFile = open(path,"w")
+        json.dump(self.toDict(),InfoFile,indent=1,sort_keys=True)
+        InfoFile.close()
+
+    # Imprime un resumen de las estadsticas, una lnea por fase
+    def printStats(self):
+        for Name in StatsPhases:
+            Phase = self.Phases[Name]
+            print "Fase %-5s %8.3f s %6d pasadas %4d ubicados %6d eliminados" % (Name,Phase["time"],Phase["passes"],Phase["placed"],Phase["eliminated"])
+        for Name in sorted(self.Techniques.keys()):
+            Technique = self.Techniques[Name]
+            print "  %-15s %6d veces %6d eliminados" % (Name,Technique["applied"],Technique["eliminated"])
+        print "Copias: " + str(self.Copies) + ", pendientes maximo: " + str(self.MaxFrontier) + ", alternativas: " + str(self.Branches) + ", retrocesos: " + str(self.Backtracks)
+        print "Examinaciones: " + str(self.Examined) + " (barrido completo: " + str(self.SweepExaminations) + ", ahorradas: " + str(self.SweepExaminations - self.Examined) + ")"
@@ -0,0 +1,212 @@
+# -*- coding: cp1252 -*-
+# Tcnicas de eliminacin de candidatos
+#
+# Las fases I a III solo ubican nmeros: la fase I y la fase II ubican un
+# nmero cuando tiene una sola posicin libre en un cuadrante, fila o columna,
+# y la fase III cuando una celda tiene un solo candidato. Cuando ninguna ubica
+# nada, la fase IV supone un nmero y copia el tablero por cada alternativa.
+# Las tcnicas de este mdulo no ubican nmeros, sino que quitan candidatos
+# de las celdas (Board.removeCandidates), de modo que la fase III encuentre
+# nuevas celdas con un solo candidato y la fase IV tenga menos alternativas:
+#
+#   "hidden-singles": un nmero con una sola posicin posible en una unidad
+#       (segn los candidatos) deja a esa celda sin los dems candidatos.
+#   "naked-pairs", "naked-triples": n celdas de una unidad cuyos candidatos
+#       juntos son solo n nmeros; esos nmeros se quitan del resto de la
+#       unidad.
+#   "hidden-pairs", "hidden-triples": n nmeros que en una unidad solo caben
+#       en las mismas n celdas; el resto de candidatos de esas celdas se quita.
+#   "pointing": los candidatos de un nmero en un cuadrante estn todos en
+#       una misma fila (o columna); el nmero se quita del resto de la fila.
+#   "box-line": los candidatos de un nmero en una fila (o columna) estn
+#       todos en un mismo cuadrante; el nmero se quita del resto del
+#       cuadrante.
+#   "x-wing": un nmero con solo dos posiciones en dos filas, en las mismas
+#       dos columnas; el nmero se quita del resto de esas columnas (y lo
+#       mismo cambiando filas por columnas).
+#
+# Las unidades son las filas, columnas y cuadrantes de la geometra del
+# tablero (Geometry.UnitCells), por lo que las tcnicas sirven con cualquier
+# tamao de Sudoku. eliminateCandidates prueba las tcnicas indicadas en el
+# orden de TechniqueNames (de la ms barata a la ms costosa) y se detiene en
+# la primera que quite algn candidato, para que las fases vuelvan a ubicar
+# nmeros antes de probar las ms costosas.
+#
+
+import functools
+import itertools
+
+# Tcnicas en el orden en que se prueban
+TechniqueNames = ["hidden-singles","naked-pairs","pointing","box-line","hidden-pairs",
+                  "naked-triples","hidden-triples","x-wing"]
+
+
+# Devuelve, por cada nmero que falta en la unidad, la lista de celdas vacias
+# de la unidad que lo tienen como candidato (indexada por nmero, desde 0)
+def getPositions(Sudoku,Unit):
+    Candidates = Sudoku.Candidates
+    Positions = [[] for d in range(Sudoku.Size)]
+    for cell in Unit:
+        mask = Candidates[cell]
+        d = 0
+        while mask != 0:
+            if mask & 1:
+                Positions[d].append(cell)
+            mask = mask >> 1
+            d = d + 1
+    return Positions
+
+
+# Subconjuntos desnudos: size celdas de una unidad cuyos candidatos juntos son
+# size nmeros. Retorna la cantidad de candidatos quitados
+def nakedSubsets(Sudoku,size):
+    Geometry = Sudoku.Geometry
+    Candidates = Sudoku.Candidates
+    removed = 0
+    for Unit in Geometry.UnitCells:
+        Empty = [cell for cell in Unit if Candidates[cell] != 0]
+        if len(Empty) <= size:
+            continue
+        Cells = [cell for cell in Empty if Geometry.countBits(Candidates[cell]) <= size]
+        for Group in itertools.combinations(Cells,size):
+            mask = 0
+            for cell in Group:
+                mask = mask | Candidates[cell]
+            if Geometry.countBits(mask) == size:
+                for cell in Empty:
+                    if cell not in Group:
+                        removed = removed + Sudoku.removeCandidates(cell,mask)
+    return removed
+
+
+# Subconjuntos ocultos: size nmeros que en una unidad solo caben en las
+# mismas size celdas. Retorna la cantidad de candidatos quitados
+def hiddenSubsets(Sudoku,size):
+    Geometry = Sudoku.Geometry
+    removed = 0
+    for Unit in Geometry.UnitCells:
+        Positions = getPositions(Sudoku,Unit)
+        Digits = [d for d in range(Sudoku.Size) if len(Positions[d]) > 0 and len(Positions[d]) <= size]
+        for Group in itertools.combinations(Digits,size):
+            Cells = set()
+            mask = 0
+            for d in Group:
+                Cells.update(Positions[d])
+                mask = mask | (1 << d)
+            if len(Cells) == size:
+                for cell in Cells:
+                    removed = removed + Sudoku.removeCandidates(cell,Geometry.Full & ~mask)
+    return removed
+
+
+# Pares sealadores: los candidatos de un nmero en un cuadrante estn en una
+# sola fila o columna, y se quitan del resto de esa fila o columna. Retorna la
+# cantidad de candidatos quitados
+def pointingPairs(Sudoku):
+    Geometry = Sudoku.Geometry
+    size = Sudoku.Size
+    removed = 0
+    for q in range(size):
+        Positions = getPositions(Sudoku,Geometry.QuadrantCells[q])
+        for d in range(size):
+            if len(Positions[d]) < 2:
+                continue
+            Rows = set([Geometry.CellRow[cell] for cell in Positions[d]])
+            Columns = set([Geometry.CellColumn[cell] for cell in Positions[d]])
+            Units = []
+            if len(Rows) == 1:
+                Units.append(Geometry.UnitCells[Rows.pop()])
+            if len(Columns) == 1:
+                Units.append(Geometry.UnitCells[size + Columns.pop()])
+            for Unit in Units:
+                for cell in Unit:
+                    if Geometry.CellQuadrant[cell] != q:
+                        removed = removed + Sudoku.removeCandidates(cell,1 << d)
+    return removed
+
+
+# Reduccin caja-lnea: los candidatos de un nmero en una fila o columna
+# estn en un solo cuadrante, y se quitan del resto del cuadrante. Retorna la
+# cantidad de candidatos quitados
+def boxLineReduction(Sudoku):
+    Geometry = Sudoku.Geometry
+    size = Sudoku.Size
+    removed = 0
+    for Unit in Geometry.UnitCells[0:2 * size]:
+        Positions = getPositions(Sudoku,Unit)
+        for d in range(size):
+            if len(Positions[d]) < 2:
+                continue
+            Quadrants = set([Geometry.CellQuadrant[cell] for cell in Positions[d]])
+            if len(Quadrants) == 1:
+                for cell in Geometry.QuadrantCells[Quadrants.pop()]:
+                    if cell not in Positions[d]:
+                        removed = removed + Sudoku.removeCandidates(cell,1 << d)
+    return removed
+
+
+# X-Wing: un nmero con exactamente dos posiciones en dos filas (o columnas),
+# en las mismas dos columnas (o filas); el nmero se quita del resto de esas
+# columnas (o filas). Retorna la cantidad de candidatos quitados
+def xWing(Sudoku):
+    Geometry = Sudoku.Geometry
+    Candidates = Sudoku.Candidates
+    size = Sudoku.Size
+    removed = 0
+    for d in range(size):
+        bit = 1 << d
+        for base in [0,size]:
+            # Las lneas son las filas (base 0) o las columnas (base size); las
+            # posiciones dentro de cada lnea son las lneas cruzadas
+            Pairs = {}
+            for line in range(size):
+                Cross = tuple([k for k in range(size) if Candidates[Geometry.UnitCells[base + line][k]] & bit])
+                if len(Cross) == 2:
+                    Pairs.setdefault(Cross,[]).append(line)
+            for Cross in Pairs:
+                if len(Pairs[Cross]) != 2:
+                    continue
+                for k in Cross:
+                    for line in range(size):
+                        if line not in Pairs[Cross]:
+                            removed = removed + Sudoku.removeCandidates(Geometry.UnitCells[size - base + k][line],bit)
+    return removed
+
+
+# Funcin que aplica cada tcnica
+Techniques = {"hidden-singles": functools.partial(hiddenSubsets,size=1),
+              "naked-pairs": functools.partial(nakedSubsets,size=2),
+              "naked-triples": functools.partial(nakedSubsets,size=3),
+              "hidden-pairs": functools.partial(hiddenSubsets,size=2),
+              "hidden-triples": functools.partial(hiddenSubsets,size=3),
+              "pointing": pointingPairs,
+              "box-line": boxLineReduction,
+              "x-wing": xWing}
+
+
+# Convierte una lista de tcnicas separadas por comas ("all" son todas) en la
+# lista de nombres. Si alguna no existe se lanza ValueError
+def parseTechniques(text):
+    if text == "all":
+        return TechniqueNames[:]
+    Names = [name.strip() for name in text.split(",") if name.strip() != ""]
+    for name in Names:
+        if name not in Techniques:
+            raise ValueError("tecnica desconocida: " + name)
+    return Names
+
+
+# Prueba las tcnicas indicadas (por defecto todas) en el orden de
+# TechniqueNames y se detiene en la primera que quite candidatos. Si se
+# ingresa Stats (SolveStats), se cuentan las veces que cada tcnica quit
+# candidatos y cuntos. Retorna la cantidad de candidatos quitados
+def eliminateCandidates(Sudoku,Names=None,Stats=None):
+    for name in TechniqueNames:
+        if Names is not None and name not in Names:
+            continue
+        removed = Techniques[name](Sudoku)
+        if removed > 0:
+            if Stats is not None:
+                Stats.countTechnique(name,removed)
+            return removed
+    return 0
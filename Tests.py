@@ -0,0 +1,381 @@
+# -*- coding: cp1252 -*-
+# Pruebas de regresin
+#
+# Casos que alguna vez fallaron, para que no vuelvan a fallar, y pruebas del
+# comportamiento de cada parte del programa: los mtodos de solucin, el cache
+# por forma cannica, las tcnicas de eliminacin, los lmites, la solucin
+# paso a paso (iterPlacements), la traza de deshacer y los tableros de 16 x 16.
+# Cada prueba es corta (menos de un segundo) y no necesita archivos externos.
+#
+# Uso:
+#   python Tests.py
+#   python -m unittest Tests
+#
+
+import time
+import unittest
+
+from Classes import *
+from Batch import Methods
+from Cache import SolutionCache
+from Main import loadBoard, applyPhases, chooseBranch, solve, solveBoard, solveLimited, iterPlacements
+from Search import checkUniqueness
+from Stats import SolveStats
+from Techniques import Techniques, TechniqueNames
+
+# Sudoku con dos unos en la primera fila (sin solucin)
+RepeatedPuzzle = "11" + "*" * 79
+
+# Sudoku difcil (requiere suposiciones aun con las tcnicas de eliminacin)
+HardPuzzle = "**53*****8******2**7**1*5**4****53***1**7***6**32***8**6*5****9**4****3******97**"
+
+
+# Sudoku (generado con Generator.py) en el que la tcnica "x-wing" quita
+# candidatos despus de las fases
+XWingPuzzle = "*5****37*917****8**6**********1*46**8****74**5****2******6*9*****95**8*2*****35*1"
+
+# Sudoku vlido en el que las dos primeras celdas solo pueden ser un 1 (sin
+# solucin): la fase III no debe escribir el 1 en ambas
+TwinSinglesPuzzle = "**2345678" + "9" + "*" * 71
+
+# Por cada tcnica, un tablero (fila por fila) en el que solo ella quita
+# candidatos de cierta forma, la cantidad que quita y, por cada celda
+# afectada, los nmeros que pierde
+TechniqueCases = {
+    "hidden-singles": ["*" * 9 + "****1****" + "*******1*" + "*1*******" + "*" * 18 + "**1******" + "*" * 18,
+                       8,[[0,"23456789"]]],
+    "naked-pairs": ["**3456789" + "*" * 72,
+                    12,[[9,"12"],[10,"12"],[11,"12"],[18,"12"],[19,"12"],[20,"12"]]],
+    "naked-triples": ["***456789" + "*" * 72,
+                      18,[[9,"123"],[10,"123"],[11,"123"],[18,"123"],[19,"123"],[20,"123"]]],
+    "pointing": ["*" * 9 + "234******" + "567******" + "*" * 54,
+                 18,[[3,"189"],[4,"189"],[5,"189"],[6,"189"],[7,"189"],[8,"189"]]],
+    "box-line": ["***234567" + "*" * 72,
+                 18,[[9,"189"],[10,"189"],[11,"189"],[18,"189"],[19,"189"],[20,"189"]]],
+    "hidden-pairs": ["*" * 9 + "****12***" + "*******12" + "*" * 9 + "**2******" + "**1******" + "*" * 27,
+                     14,[[0,"3456789"],[1,"3456789"]]],
+    "hidden-triples": ["*" * 9 + "***123***" + "******123" + "*" * 54,
+                       18,[[0,"456789"],[1,"456789"],[2,"456789"]]]}
+
+
+# Devuelve todo el estado de un Board que undo debe restaurar
+def getState(Sudoku):
+    return [Sudoku.Candidates[:],[Row[:] for Row in Sudoku.Matrix],Sudoku.RowMask[:],Sudoku.ColumnMask[:],
+            Sudoku.QuadrantMask[:],Sudoku.Top,Sudoku.BlankSpaces,Sudoku.Dirty[:],Sudoku.DirtySingles[:],
+            [Step[:] for Step in Sudoku.Stack[0:Sudoku.Top + 1]]]
+
+
+# Aplica las fases (y las tcnicas indicadas) hasta que no cambien nada
+def applyAllPhases(Sudoku,Techniques=None):
+    Solver = Agent(Sudoku)
+    while applyPhases(Sudoku,Solver,None,Techniques) == 1 and Sudoku.isSolved() == 0:
+        pass
+
+
+# Revisa que el tablero resuelto tenga los nmeros del Sudoku original, que
+# sus pasos registrados lleven del Sudoku original a la solucin y que no
+# tenga nmeros repetidos
+def checkSolution(Test,Puzzle,Sudoku):
+    Original = loadBoard(Puzzle)
+    Test.assertEqual(Sudoku.isSolved(),1)
+    Test.assertEqual(Sudoku.isValid(),1)
+    for i in range(Original.Size):
+        for j in range(Original.Size):
+            if Original.getValueAt(i,j) in Original.Bits:
+                Test.assertEqual(Sudoku.getValueAt(i,j),Original.getValueAt(i,j))
+    for Step in Sudoku.Stack[0:Sudoku.Top + 1]:
+        Original.setValueAt(Step[0],Step[1],str(Step[2]))
+    Test.assertEqual(Original.toString(),Sudoku.toString())
+
+
+# Devuelve el Sudoku (cadena de 81 caracteres) traspuesto y con cada nmero v
+# cambiado por v + 1 (el 9 por el 1)
+def transformPuzzle(Puzzle):
+    Result = ""
+    for k in range(81):
+        value = Puzzle[9 * (k % 9) + k // 9]
+        if value in Bits:
+            value = str(int(value) % 9 + 1)
+        Result = Result + value
+    return Result
+
+
+class MethodTests(unittest.TestCase):
+
+    # Un Sudoku con nmeros repetidos no tiene solucin con ningn mtodo. Con
+    # "phases" la fase IV buscaba sin fin sobre el tablero contradictorio
+    def testRepeatedPuzzle(self):
+        for method in sorted(Methods.keys()):
+            self.assertEqual(Methods[method](CompactBoard().fromString(RepeatedPuzzle)),None,method)
+
+    # Los mtodos "dlx", "compact" y "phases" (con y sin la traza, y con las
+    # tcnicas) llegan a la misma solucin, que es nica
+    def testMethodsAgree(self):
+        for Puzzle in [HardPuzzle,XWingPuzzle]:
+            self.assertEqual(checkUniqueness(CompactBoard().fromString(Puzzle))[0],"unique")
+            Expected = solve(Puzzle,"dlx")
+            checkSolution(self,Puzzle,Expected)
+            self.assertEqual(solve(Puzzle,"compact").toString(),Expected.toString())
+            for useTrail in [0,1]:
+                for Names in [None,TechniqueNames]:
+                    Sudoku = solve(Puzzle,"phases",useTrail,None,Names)
+                    checkSolution(self,Puzzle,Sudoku)
+                    self.assertEqual(Sudoku.toString(),Expected.toString())
+
+
+class CacheTests(unittest.TestCase):
+
+    # Un Sudoku equivalente a uno ya resuelto se responde desde el cache, con
+    # la solucin y los pasos llevados de vuelta a su propia apariencia
+    def testTransformedPuzzle(self):
+        Cache = SolutionCache()
+        First = Cache.solve(HardPuzzle)
+        Transformed = transformPuzzle(HardPuzzle)
+        Second = Cache.solve(Transformed)
+        self.assertEqual([Cache.Hits,Cache.Misses],[1,1])
+        checkSolution(self,Transformed,Second)
+        self.assertEqual(Second.toString(),transformPuzzle(First.toString()))
+        self.assertEqual(Second.Top,First.Top)
+
+    # Los Sudokus sin solucin tambin se guardan
+    def testUnsolvable(self):
+        Cache = SolutionCache()
+        self.assertEqual(Cache.solve(TwinSinglesPuzzle),None)
+        self.assertEqual(Cache.solve(transformPuzzle(TwinSinglesPuzzle)),None)
+        self.assertEqual([Cache.Hits,Cache.Misses],[1,1])
+
+
+class PhaseTests(unittest.TestCase):
+
+    # La fase III de Agent no escribe dos veces el mismo nmero en un
+    # cuadrante, aunque dos celdas tengan ese nico candidato
+    def testAgentTwinSingles(self):
+        Sudoku = loadBoard(TwinSinglesPuzzle)
+        Solver = Agent(Sudoku)
+        Solver.loadQuadrant(1)
+        self.assertEqual(Solver.writeSinglesInQuadrant(),1)
+        Solver.applyQuadrant()
+        self.assertEqual(Sudoku.isValid(),1)
+        self.assertEqual(Sudoku.toString()[0:2].count("1"),1)
+
+    # Lo mismo en la fase III de CompactAgent
+    def testCompactAgentTwinSingles(self):
+        Sudoku = CompactBoard().fromString(TwinSinglesPuzzle)
+        self.assertEqual(CompactAgent(Sudoku).expandQuadrants(),1)
+        self.assertEqual(Sudoku.toString()[0:2].count("1"),1)
+
+    # Con la lista de trabajo las fases ubican los mismos nmeros, en el mismo
+    # orden, que recorriendo todo el tablero en cada pasada (markAll), con
+    # menos examinaciones; las de un barrido completo son las que se cuentan
+    # como tales
+    def testWorklistMatchesSweep(self):
+        Boards = []
+        Counts = []
+        for sweep in [0,1]:
+            Sudoku = loadBoard(XWingPuzzle)
+            Solver = Agent(Sudoku)
+            Stats = SolveStats()
+            loop = 1
+            while loop == 1 and Sudoku.isSolved() == 0:
+                if sweep == 1:
+                    Sudoku.markAll()
+                loop = applyPhases(Sudoku,Solver,Stats,TechniqueNames)
+            Boards.append(getState(Sudoku))
+            Counts.append([Stats.Examined,Stats.SweepExaminations])
+        self.assertEqual(Boards[0][0:7] + Boards[0][9:],Boards[1][0:7] + Boards[1][9:])
+        self.assertEqual(Counts[1][0],Counts[1][1])
+        self.assertEqual(Counts[0][1],Counts[1][1])
+        self.assertTrue(Counts[0][0] < Counts[0][1])
+
+
+class TechniqueTests(unittest.TestCase):
+
+    # Cada tcnica quita exactamente los candidatos esperados en su tablero
+    def testConstructedCases(self):
+        for name in TechniqueNames:
+            if name not in TechniqueCases:
+                continue
+            Case = TechniqueCases[name]
+            Sudoku = loadBoard(Case[0])
+            Before = Sudoku.Candidates[:]
+            self.assertEqual(Techniques[name](Sudoku),Case[1],name)
+            Removed = []
+            for cell in range(81):
+                if Before[cell] != Sudoku.Candidates[cell]:
+                    Removed.append([cell,"".join(Sudoku.Geometry.getDigits(Before[cell] & ~Sudoku.Candidates[cell]))])
+            self.assertEqual(Removed,Case[2],name)
+
+    # Sobre Sudokus reales, despus de las fases, cada tcnica solo quita
+    # candidatos que no son parte de la solucin; "x-wing" quita alguno
+    def testEliminationsKeepSolution(self):
+        for Puzzle in [HardPuzzle,XWingPuzzle]:
+            Solution = solve(Puzzle,"dlx").toString()
+            for name in TechniqueNames:
+                Sudoku = loadBoard(Puzzle)
+                removed = 0
+                applyAllPhases(Sudoku)
+                count = Techniques[name](Sudoku)
+                while count > 0 and Sudoku.isSolved() == 0:
+                    removed = removed + count
+                    applyAllPhases(Sudoku)
+                    count = Techniques[name](Sudoku)
+                for cell in range(81):
+                    value = Solution[cell]
+                    if Sudoku.Matrix[cell // 9][cell % 9] == "*":
+                        self.assertTrue(Sudoku.Candidates[cell] & Bits[value],name)
+                    else:
+                        self.assertEqual(Sudoku.Matrix[cell // 9][cell % 9],value,name)
+                if name == "x-wing" and Puzzle == XWingPuzzle:
+                    self.assertTrue(removed > 0)
+
+
+class LimitTests(unittest.TestCase):
+
+    # Con un lmite de tableros la bsqueda se detiene al examinarlos, con el
+    # tablero parcial y las alternativas pendientes
+    def testNodeLimit(self):
+        Result = solveLimited(HardPuzzle,None,5)
+        self.assertEqual([Result.Status,Result.Reason,Result.Nodes],["timeout","nodes",5])
+        self.assertTrue(Result.Pending > 0)
+        self.assertEqual(Result.Board.isValid(),1)
+        self.assertEqual(Result.Board.isSolved(),0)
+        self.assertEqual(len(Result.Steps),Result.Board.Top + 1)
+
+    # Con una hora lmite ya pasada la bsqueda se detiene de inmediato
+    def testDeadline(self):
+        Result = solveLimited(HardPuzzle,time.time() - 1)
+        self.assertEqual([Result.Status,Result.Reason],["timeout","deadline"])
+
+    # Sin superar los lmites se obtiene la solucin; sin solucin, el estado
+    # es "unsolvable"
+    def testWithinLimits(self):
+        Result = solveLimited(HardPuzzle,time.time() + 60,100000)
+        self.assertEqual([Result.Status,Result.Reason],["solved",None])
+        self.assertEqual(Result.Board.toString(),solve(HardPuzzle,"dlx").toString())
+        self.assertEqual(solveLimited(RepeatedPuzzle,None,5).Status,"unsolvable")
+        self.assertEqual(solveLimited(TwinSinglesPuzzle,None,5).Status,"unsolvable")
+
+
+class StreamTests(unittest.TestCase):
+
+    # Al aplicar los eventos de iterPlacements en orden se obtiene la misma
+    # solucin que con solve, con y sin la traza
+    def testReplay(self):
+        for useTrail in [0,1]:
+            Sudoku = loadBoard(HardPuzzle)
+            Placed = []
+            Events = list(iterPlacements(HardPuzzle,useTrail))
+            self.assertEqual(Events[-1],["end","solved"])
+            for Event in Events[0:-1]:
+                if Event[0] == "place":
+                    Placed.append(Event)
+                    Sudoku.setValueAt(Event[1],Event[2],str(Event[3]))
+                else:
+                    self.assertEqual(Event[0],"undo")
+                    for Undone in Placed[Event[1]:]:
+                        Sudoku.setValueAt(Undone[1],Undone[2],"*")
+                    del Placed[Event[1]:]
+            self.assertTrue(len([Event for Event in Events if Event[0] == "undo"]) > 0)
+            self.assertEqual(Sudoku.toString(),solve(HardPuzzle,"phases",useTrail).toString())
+
+    # Los nmeros se devuelven mientras se resuelve: el primero llega antes de
+    # que termine la fase I de la primera pasada
+    def testEventsArriveDuringPass(self):
+        Stats = SolveStats()
+        Placements = iterPlacements(XWingPuzzle,1,Stats)
+        self.assertEqual(Placements.next()[4],"I")
+        self.assertEqual(Stats.Phases["I"]["passes"],0)
+
+    # Un Sudoku sin solucin termina con "unsolvable"
+    def testUnsolvable(self):
+        self.assertEqual(list(iterPlacements(RepeatedPuzzle)),[["end","unsolvable"]])
+        self.assertEqual(list(iterPlacements(TwinSinglesPuzzle))[-1],["end","unsolvable"])
+
+
+class TrailTests(unittest.TestCase):
+
+    # Despus de undo el tablero queda exactamente como en la marca, incluidos
+    # los candidatos que quitaron las tcnicas antes de la marca (antes se
+    # recalculaban a partir de las mscaras y se perdan)
+    def testUndoRestoresCandidates(self):
+        Sudoku = loadBoard(HardPuzzle)
+        Sudoku.enableTrail()
+        Solver = Agent(Sudoku)
+        while applyPhases(Sudoku,Solver,None,TechniqueNames) == 1:
+            pass
+        State = getState(Sudoku)
+        mark = Sudoku.getMark()
+        Branch = chooseBranch(Sudoku)
+        Sudoku.setValueAt(Branch[0],Branch[1],Branch[2][0])
+        Sudoku.inputStackValue(Branch[0],Branch[1],int(Branch[2][0]),5)
+        while applyPhases(Sudoku,Solver,None,TechniqueNames) == 1 and Sudoku.isSolved() == 0:
+            pass
+        self.assertNotEqual(getState(Sudoku),State)
+        Sudoku.undo(mark)
+        self.assertEqual(getState(Sudoku),State)
+
+    # La misma marca se puede usar varias veces: despus de probar cada
+    # alternativa de la celda supuesta el tablero vuelve a quedar igual
+    def testRepeatedUndo(self):
+        Sudoku = loadBoard(XWingPuzzle)
+        Sudoku.enableTrail()
+        applyAllPhases(Sudoku)
+        State = getState(Sudoku)
+        mark = Sudoku.getMark()
+        Branch = chooseBranch(Sudoku)
+        for value in Branch[2]:
+            Sudoku.setValueAt(Branch[0],Branch[1],value)
+            Sudoku.inputStackValue(Branch[0],Branch[1],int(value),5)
+            applyAllPhases(Sudoku,TechniqueNames)
+            Sudoku.undo(mark)
+            self.assertEqual(getState(Sudoku),State)
+
+    # La bsqueda con la traza prueba las mismas alternativas que copiando el
+    # tablero, sin hacer ninguna copia
+    def testTrailMatchesCopies(self):
+        Results = []
+        for useTrail in [0,1]:
+            Stats = SolveStats()
+            Sudoku = solveBoard(loadBoard(HardPuzzle),useTrail,Stats)
+            Results.append([Sudoku.toString(),Stats.Branches,Stats.Backtracks,Stats.MaxFrontier])
+            self.assertEqual(Stats.Copies == 0,useTrail == 1)
+        self.assertEqual(Results[0],Results[1])
+
+
+class LargeBoardTests(unittest.TestCase):
+
+    # Sudoku de 16 x 16 que requiere suposiciones: un tablero lleno con un
+    # patrn, al que se le quitan 152 nmeros
+    def getPuzzle(self):
+        Values = []
+        for k in range(256):
+            value = (4 * (k // 16 % 4) + k // 64 + k % 16) % 16 + 1
+            if (k * 37 + k // 16 * 11) % 10 < 4:
+                Values.append(str(value))
+            else:
+                Values.append("*")
+        return ",".join(Values)
+
+    # Las fases resuelven el Sudoku de 16 x 16, con y sin la traza
+    def testSolve(self):
+        Puzzle = self.getPuzzle()
+        for useTrail in [0,1]:
+            Stats = SolveStats()
+            Sudoku = solve(Puzzle,"phases",useTrail,Stats)
+            self.assertEqual(Sudoku.Size,16)
+            checkSolution(self,Puzzle,Sudoku)
+            self.assertTrue(Stats.Branches > 0)
+
+    # Los mtodos que solo resuelven Sudokus de 9 x 9 lo indican, y el cache
+    # los resuelve sin pasar por la forma cannica
+    def testOtherMethods(self):
+        Puzzle = self.getPuzzle()
+        self.assertRaises(ValueError,solve,Puzzle,"compact")
+        self.assertRaises(ValueError,solve,Puzzle,"dlx")
+        Cache = SolutionCache()
+        checkSolution(self,Puzzle,Cache.solve(Puzzle))
+        self.assertEqual([Cache.Hits,Cache.Misses],[0,0])
+
+
+if __name__ == "__main__":
+    unittest.main()
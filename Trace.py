@@ -0,0 +1,66 @@
+# -*- coding: cp1252 -*-
+# Trazas compactas de la solucin
+#
+# El archivo de solucin paso a paso (printSolution) dibuja el tablero completo
+# por cada nmero ubicado, lo cual es til para leerlo pero costoso de
+# escribir cuando se resuelven muchos Sudokus. La traza compacta guarda por
+# cada Sudoku una lnea con el Sudoku original y una lnea por paso con la
+# posicin, el nmero y la fase que lo ubic:
+#
+#   **6*********2***38347****56*5**2*7*3*6****8**9*3*********65*9****8**7**2*****8***
+#   G6 2 I
+#   G8 8 I
+#   ...
+#
+# En los Sudokus mayores a 9 x 9 los valores de la primera lnea se separan
+# con comas. Los Sudokus se separan con una lnea vacia. TraceWriter escribe las trazas
+# de varios Sudokus en un solo archivo con un buffer grande, y readTraces las
+# vuelve a leer como tableros (Board), de los cuales se puede generar el
+# dibujo paso a paso solo cuando se necesite (Board.iterSolution).
+#
+
+from Classes import *
+
+
+class TraceWriter(object):
+
+    # Constructor de la clase. Abre el archivo donde se escriben las trazas
+    def __init__(self,path,buffering=1048576):
+        self.File = open(path,"w",buffering)
+        self.Count = 0
+
+    # Escribe la traza del Sudoku indicado (Board o CompactBoard)
+    def write(self,Sudoku):
+        self.File.write(Sudoku.getTrace() + "\n")
+        self.Count = self.Count + 1
+
+    # Cierra el archivo
+    def close(self):
+        self.File.close()
+
+
+# Lee las trazas del archivo indicado y devuelve, una a una, un Board con el
+# Sudoku original y los pasos registrados (incluyendo la fase de cada uno)
+def readTraces(path):
+    InfoFile = open(path,"r")
+    Sudoku = None
+    for linea in InfoFile:
+        linea = linea.strip()
+        if linea == "":
+            if Sudoku is not None:
+                yield Sudoku
+            Sudoku = None
+        elif Sudoku is None:
+            if "," in linea:
+                Sudoku = Board().fromString(linea.split(","))
+            else:
+                Sudoku = Board().fromString(linea)
+        else:
+            Step = linea.split(" ")
+            row = Sudoku.Geometry.Letters.index(Step[0][0])
+            column = int(Step[0][1:]) - 1
+            Sudoku.setValueAt(row,column,Step[1])
+            Sudoku.inputStackValue(row,column,int(Step[1]),PhaseNames.index(Step[2]))
+    if Sudoku is not None:
+        yield Sudoku
+    InfoFile.close()
@@ -0,0 +1,148 @@
+# -*- coding: cp1252 -*-
+# Solucionador vectorizado de lotes de Sudokus (requiere NumPy)
+#
+# Mantiene miles de Sudokus a la vez como arreglos: los valores en un arreglo
+# de N x 81 y los candidatos en uno de N x 81 x 9 (booleano). Las fases I a III
+# se aplican a todo el lote con operaciones de arreglos:
+#  - Fases I y II (proyeccin sobre cuadrantes, filas y columnas): un nmero
+#    que falta en una unidad y tiene una sola posicin libre en ella.
+#  - Fase III (proyeccin expansiva): una celda vacia con un solo candidato.
+# En cada iteracin se ubican a la vez todos los nmeros encontrados en todos
+# los Sudokus del lote. Los Sudokus que quedan resueltos o sin solucin salen
+# del lote; los que dejan de avanzar se terminan con la bsqueda en
+# profundidad de DepthFirstSearch, partiendo de lo ya ubicado.
+#
+# A diferencia del resto del programa, este mdulo depende de NumPy. Si NumPy
+# no est instalado el mdulo se puede importar, pero VectorizedSolver no se
+# puede instanciar.
+#
+# Uso:
+#   python Vectorized.py Sudokus.txt [Soluciones.txt] [-b tamao del lote]
+#
+
+import argparse
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from Classes import *
+from Search import DepthFirstSearch
+from Batch import readPuzzles, writeSolutions
+
+
+class VectorizedSolver(object):
+
+    # Constructor de la clase. Arma las matrices de unidades: UnitMatrix indica
+    # las celdas de cada unidad (27 x 81) y CellUnits las unidades de cada
+    # celda (81 x 27).
+    def __init__(self):
+        if numpy is None:
+            raise ImportError("VectorizedSolver requiere NumPy")
+        self.UnitMatrix = numpy.zeros((27,81),numpy.int16)
+        for unit in range(27):
+            for cell in UnitCells[unit]:
+                self.UnitMatrix[unit,cell] = 1
+        self.CellUnits = self.UnitMatrix.T.copy()
+        self.UnitIndex = self.UnitMatrix * numpy.arange(81,dtype=numpy.int16)
+        self.Digits = numpy.arange(1,10,dtype=numpy.int8)
+        self.Iterations = 0
+        self.Propagated = 0
+        self.Searched = 0
+
+    # Convierte un Sudoku (cadena de 81 caracteres, Board o CompactBoard) en
+    # una cadena de 81 caracteres
+    def toPuzzle(self,Sudoku):
+        if isinstance(Sudoku,CompactBoard):
+            return Sudoku.toString()
+        if isinstance(Sudoku,Board):
+            return "".join([Sudoku.getValueAt(i // 9,i % 9) for i in range(81)])
+        return Sudoku
+
+    # Resuelve la lista de Sudokus. Devuelve, en el mismo orden, la solucin de
+    # cada uno como cadena de 81 caracteres, o None si no tiene solucin
+    def solve(self,Sudokus):
+        Puzzles = [self.toPuzzle(Sudoku) for Sudoku in Sudokus]
+        Results = [None]*len(Puzzles)
+        Values = numpy.zeros((len(Puzzles),81),numpy.int8)
+        for n in range(len(Puzzles)):
+            for cell in range(81):
+                if Puzzles[n][cell] in Bits:
+                    Values[n,cell] = int(Puzzles[n][cell])
+        Active = numpy.arange(len(Puzzles))
+        while Active.size > 0:
+            self.Iterations = self.Iterations + 1
+            Empty = Values == 0
+            Placed = (Values[:,:,None] == self.Digits).astype(numpy.int16)
+            UnitCount = numpy.matmul(self.UnitMatrix,Placed)
+            UnitHas = UnitCount > 0
+            Blocked = numpy.matmul(self.CellUnits,UnitHas.astype(numpy.int16)) > 0
+            Candidates = Empty[:,:,None] & ~Blocked
+            CellCount = Candidates.sum(2)
+            Candidates16 = Candidates.astype(numpy.int16)
+            Positions = numpy.matmul(self.UnitMatrix,Candidates16)
+            Dead = (UnitCount > 1).any((1,2)) | (Empty & (CellCount == 0)).any(1) | ((Positions == 0) & ~UnitHas).any((1,2))
+            Solved = ~Empty.any(1) & ~Dead
+            # Fase III: celdas con un solo candidato
+            Naked = Empty & (CellCount == 1)
+            New = numpy.where(Naked,Candidates.argmax(2) + 1,0).astype(numpy.int8)
+            # Fases I y II: nmeros con una sola posicin libre en la unidad
+            Hidden = (Positions == 1) & ~UnitHas
+            n,unit,digit = numpy.nonzero(Hidden)
+            cell = numpy.matmul(self.UnitIndex,Candidates16)[n,unit,digit]
+            New[n,cell] = digit + 1
+            Progress = (New != 0).any(1) & ~Dead & ~Solved
+            for i in numpy.nonzero(Solved)[0]:
+                self.Propagated = self.Propagated + 1
+                Results[Active[i]] = "".join([str(v) for v in Values[i]])
+            for i in numpy.nonzero(~Progress & ~Solved & ~Dead)[0]:
+                self.Searched = self.Searched + 1
+                Partial = "".join([str(v) for v in Values[i]])
+                Sudoku = DepthFirstSearch(CompactBoard().fromString(Partial)).solve()
+                if Sudoku is not None:
+                    Results[Active[i]] = Sudoku.toString()
+            Values = numpy.where(Empty,New,Values)[Progress]
+            Active = Active[Progress]
+        return Results
+
+
+# Resuelve los Sudokus por lotes del tamao indicado, a medida que se leen.
+# Devuelve, por cada uno, el Sudoku y su solucin (None si no tiene solucin)
+def solvePuzzlesVectorized(Puzzles,size=4096,Solver=None):
+    if Solver is None:
+        Solver = VectorizedSolver()
+    Block = []
+    for Puzzle in Puzzles:
+        Block.append(Puzzle)
+        if len(Block) == size:
+            for Result in zip(Block,Solver.solve(Block)):
+                yield list(Result)
+            Block = []
+    if len(Block) > 0:
+        for Result in zip(Block,Solver.solve(Block)):
+            yield list(Result)
+
+
+if __name__ == "__main__":
+    Parser = argparse.ArgumentParser(description="Solucionador vectorizado de lotes de Sudokus")
+    Parser.add_argument("file",help="archivo con los Sudokus")
+    Parser.add_argument("solutions",nargs="?",help="archivo donde se escriben las soluciones")
+    Parser.add_argument("-b","--size",type=int,default=4096,help="Sudokus por lote")
+    Arguments = Parser.parse_args()
+
+    FileName = Arguments.file
+    SolutionName = Arguments.solutions
+    if SolutionName is None:
+        if FileName[len(FileName) - 4:len(FileName)] == ".txt":
+            SolutionName = FileName[0:len(FileName) - 4] + "Solutions.txt"
+        else:
+            SolutionName = FileName + "Solutions.txt"
+    Solver = VectorizedSolver()
+    start = time.time()
+    Count = writeSolutions(solvePuzzlesVectorized(readPuzzles(FileName),Arguments.size,Solver),SolutionName)
+    print "Sudokus procesados: " + str(Count[0]) + ", resueltos: " + str(Count[1])
+    print "Resueltos con las fases I a III: " + str(Solver.Propagated) + ", con busqueda: " + str(Solver.Searched)
+    print "Tiempo: %.3f s" % (time.time() - start)
+    print "Las soluciones estan registradas en el archivo " + SolutionName